@@ -1,11 +1,20 @@
-from flask import Flask, current_app, jsonify, request, render_template, send_from_directory
+from flask import Flask, current_app, jsonify, redirect, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
 from .config import Config
 
 from .db.connection import Database
+from .db.async_connection import AsyncDatabase
+from .db.instrumentation import end_query_log, get_query_log, start_query_log
+from .db.query_registry import QueryRegistry
 
+from .utils import InMemoryPage, TTLCache, add_server_timing, compress_response, init_json_provider, send_static_asset
+from .utils.metrics import Counter, Histogram, MetricsRegistry
+from .jobs import JobQueue
+from .storage import AvatarThumbnailer, LocalAvatarStorage, create_avatar_storage, parse_ipx_size
+
+import atexit
 import os
 
 jwt = JWTManager()
@@ -20,18 +29,116 @@ def create_app() -> Flask:
 
     app.config.from_object(Config)
 
+    init_json_provider(app)
+
     jwt.init_app(app)
     CORS(app, origins=["http://127.0.0.1:3000"], supports_credentials=True)
     
-    from .features import student_bp, program_bp, college_bp, user_bp
+    from .features import student_bp, program_bp, college_bp, user_bp, job_bp, database_bp, metrics_bp
+    from .features.metrics.services import MetricsServices
+    from .features.students.services import StudentServices
+    from .features.students.repository import StudentRepository
+    from .features.programs.repository import ProgramRepository
+    from .features.colleges.repository import CollegeRepository
 
     app.register_blueprint(student_bp, url_prefix='/api/students')
     app.register_blueprint(program_bp, url_prefix='/api/programs')
     app.register_blueprint(college_bp, url_prefix='/api/colleges')
     app.register_blueprint(user_bp, url_prefix='/api/user')
+    app.register_blueprint(job_bp, url_prefix='/api/jobs')
+    app.register_blueprint(database_bp, url_prefix='/api/database')
+    app.register_blueprint(metrics_bp, url_prefix='/metrics')
+
+    api_blueprints = {blueprint.name for blueprint in (student_bp, program_bp, college_bp, user_bp, job_bp, database_bp)}
+
+    @app.before_request
+    def start_api_query_log():
+        if request.blueprint in api_blueprints:
+            start_query_log()
+
+    metrics = MetricsRegistry()
+
+    request_durations = metrics.register(Histogram("http_request_duration_seconds", "Latency of the API requests, in seconds.", 
+                                                   ("method", "route")))
+    request_counts = metrics.register(Counter("http_requests_total", "API requests served.", ("method", "route", "status")))
+
+    # The after_request functions run in reverse order, so this one runs last and times the whole response
+    @app.after_request
+    def record_api_metrics(response):
+        query_log = get_query_log()
+
+        if query_log is None:
+            return response
+
+        # The rule, e.g. "/api/students/<string:id_number>", rather than the path, so that each route is one series
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+
+        request_durations.observe(query_log.elapsed_ms / 1000, request.method, route)
+        request_counts.inc(request.method, route, str(response.status_code))
+
+        return response
+
+    # Registered before compress_api_responses so that it runs after it, and the compression is part of the app time
+    @app.after_request
+    def add_api_server_timing(response):
+        query_log = get_query_log()
+
+        if query_log is None or not app.config["SERVER_TIMING_HEADER"]:
+            return response
+
+        return add_server_timing(response, query_log.db_time_ms, len(query_log.records), query_log.elapsed_ms)
+
+    @app.teardown_request
+    def end_api_query_log(exception):
+        end_query_log(f"{request.method} {request.path}")
+
+    @app.after_request
+    def compress_api_responses(response):
+        if request.blueprint not in api_blueprints:
+            return response
+
+        return compress_response(request, response, 
+                                 min_size=app.config["COMPRESSION_MIN_SIZE"],
+                                 gzip_level=app.config["COMPRESSION_GZIP_LEVEL"],
+                                 brotli_quality=app.config["COMPRESSION_BROTLI_QUALITY"])
 
     with app.app_context():
         current_app.extensions['db'] = Database()
+        current_app.extensions['async_db'] = AsyncDatabase()
+        current_app.extensions['query_registry'] = QueryRegistry(max_size=app.config["QUERY_REGISTRY_MAX_SIZE"])
+
+        for repository in (StudentRepository, ProgramRepository, CollegeRepository):
+            repository.warm_up_queries()
+
+        current_app.extensions['metrics'] = metrics
+
+        current_app.extensions['demographics_cache'] = TTLCache(max_size=app.config["DEMOGRAPHICS_CACHE_MAX_SIZE"], 
+                                                                ttl=app.config["DEMOGRAPHICS_CACHE_TTL"])
+
+        current_app.extensions['storage'] = create_avatar_storage(app)
+
+        if current_app.extensions['storage'] and app.config["AVATAR_THUMBNAIL_SIZES"]:
+            current_app.extensions['avatar_thumbnailer'] = AvatarThumbnailer(current_app.extensions['storage'],
+                                                                             quality=app.config["AVATAR_THUMBNAIL_QUALITY"])
+        else:
+            current_app.extensions['avatar_thumbnailer'] = None
+
+        current_app.extensions['job_queue'] = JobQueue(app, 
+                                                       workers=app.config["JOB_QUEUE_WORKERS"],
+                                                       max_attempts=app.config["JOB_QUEUE_MAX_ATTEMPTS"],
+                                                       backoff=app.config["JOB_QUEUE_BACKOFF"],
+                                                       max_size=app.config["JOB_QUEUE_MAX_SIZE"])
+
+        StudentServices.register_jobs(current_app.extensions['job_queue'])
+
+        MetricsServices.register_collectors(current_app.extensions['metrics'])
+
+        # Jobs still queued at exit are dead-lettered instead of silently dropped
+        atexit.register(current_app.extensions['job_queue'].shutdown)
+
+    from .db.commands import db_cli
+
+    app.cli.add_command(db_cli)
 
     # Override default JWT error messages
     @jwt.unauthorized_loader
@@ -53,29 +160,68 @@ def create_app() -> Flask:
     
     @app.route('/_nuxt/<path:filename>')
     def nuxt_static(filename):
-        return send_from_directory(NUXT_ASSETS_DIR, filename)
+        # Nuxt puts a content hash in every bundle name, so a bundle URL never changes content
+        return send_static_asset(NUXT_ASSETS_DIR, filename, immutable=True)
     
     @app.route("/images/<path:filename>")
     def nuxt_images(filename):
-        return send_from_directory(os.path.join(NUXT_DIST_DIR, "images"), filename)
+        return send_static_asset(os.path.join(NUXT_DIST_DIR, "images"), filename)
 
-    @app.route("/_ipx/<path:path>")
+    @app.route("/_ipx/<path:path>", merge_slashes=False)
     def ipx_passthrough(path):
         """
-        Redirects Nuxt Image IPX optimization URLs (e.g., /_ipx/s_96x96/images/noAvatar.jpg)
-        to serve actual static images.
+        Serves Nuxt Image IPX optimization URLs (e.g., /_ipx/s_96x96/images/noAvatar.jpg).
+
+        Static images are served as they are. Avatars are redirected to their smallest precomputed
+        thumbnail covering the requested size, or to the original until the thumbnail is generated.
         """
         # Example path: "_/images/noAvatar.jpg" → we need everything after "images/"
         parts = path.split("/images/", 1)
         if len(parts) == 2:
             filename = parts[1]
-            return send_from_directory(os.path.join(NUXT_DIST_DIR, "images"), filename)
+            return send_static_asset(os.path.join(NUXT_DIST_DIR, "images"), filename)
+
+        # Example path: "s_96x96/https://<project>.supabase.co/storage/v1/object/public/avatars/<uuid>"
+        modifiers, _, source = path.partition("/")
 
-        return jsonify({"error": "Invalid IPX path"}), 404
+        avatar_storage = app.extensions['storage']
+        avatar_url = avatar_storage.find_avatar_url(source) if avatar_storage else None
+
+        if avatar_url is None:
+            return jsonify({"error": "Invalid IPX path"}), 404
+
+        requested_size = parse_ipx_size(modifiers)
+        size = avatar_storage.best_thumbnail_size(requested_size) if requested_size else None
+
+        if size and avatar_storage.thumbnail_exists(avatar_url, size):
+            response = redirect(avatar_storage.thumbnail_url(avatar_url, size))
+
+            # Avatar names are never reused, so a thumbnail URL always points to the same image
+            response.cache_control.public = True
+            response.cache_control.max_age = 86400
+
+            return response
+
+        # Cached as briefly as the missing thumbnail is, so a list page does not ask again on every render
+        response = redirect(avatar_url)
+        response.cache_control.public = True
+        response.cache_control.max_age = int(app.config["AVATAR_THUMBNAIL_MISS_TTL"])
+
+        return response
     
+    if isinstance(app.extensions['storage'], LocalAvatarStorage):
+        avatar_storage = app.extensions['storage']
+
+        @app.route(f"{avatar_storage.base_url}/<path:filename>")
+        def local_avatars(filename):
+            # Avatar names are never reused, so an avatar URL never changes content
+            return send_static_asset(avatar_storage.root_dir, filename, immutable=True)
+
     @app.route('/favicon.svg')
     def favicon_svg():
-        return send_from_directory(NUXT_DIST_DIR, 'favicon.svg')
+        return send_static_asset(NUXT_DIST_DIR, 'favicon.svg')
+
+    index_page = InMemoryPage('index.html')
 
     # Serve index.html for any non-API route
     @app.route('/', defaults={'path': ''})
@@ -84,6 +230,6 @@ def create_app() -> Flask:
         # Prevent catching API routes
         if path.startswith("api/"):
             return jsonify({"error": "Not Found"}), 404
-        return render_template('index.html')
+        return index_page.response()
 
     return app
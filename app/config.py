@@ -14,6 +14,35 @@ class Config:
     DB_NAME = os.getenv("DB_NAME")
     DB_USER = os.getenv("DB_USER")
     DB_PASS = os.getenv("DB_PASS")
+
+    # Connection pool sizing, timeouts in seconds
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 3600))
+    DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", 600))
+
+    # The async views get their own pool, so a process can hold up to DB_POOL_MAX_SIZE + DB_ASYNC_POOL_MAX_SIZE connections
+    DB_ASYNC_POOL_MIN_SIZE = int(os.getenv("DB_ASYNC_POOL_MIN_SIZE", 1))
+    DB_ASYNC_POOL_MAX_SIZE = int(os.getenv("DB_ASYNC_POOL_MAX_SIZE", 5))
+
+    # Prepared statements kept per pooled connection, and query variants kept by the QueryRegistry
+    DB_PREPARED_MAX = int(os.getenv("DB_PREPARED_MAX", 256))
+    QUERY_REGISTRY_MAX_SIZE = int(os.getenv("QUERY_REGISTRY_MAX_SIZE", 1024))
+
+    # Queries taking at least DB_SLOW_QUERY_MS milliseconds are logged, with their plan unless disabled, 0 turns the log off
+    DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+    DB_SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+
+    # Add a Server-Timing header with the database and app time to the API responses
+    SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "True").lower() == "true"
+
+    # Bearer token a scraper must present to read /metrics, which is open when it is empty
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+    # Demographics cache, TTL in seconds
+    DEMOGRAPHICS_CACHE_TTL = float(os.getenv("DEMOGRAPHICS_CACHE_TTL", 60))
+    DEMOGRAPHICS_CACHE_MAX_SIZE = int(os.getenv("DEMOGRAPHICS_CACHE_MAX_SIZE", 256))
     
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_TOKEN_LOCATION = ["cookies"]
@@ -33,3 +62,39 @@ class Config:
 
     SUPABASE_URL=os.getenv("SUPABASE_URL")
     SUPABASE_SERVICE_KEY=os.getenv("SUPABASE_SERVICE_KEY")
+    SUPABASE_BUCKET_NAME=os.getenv("SUPABASE_BUCKET_NAME", "avatars")
+
+    # Shared storage client, timeout in seconds
+    SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", 10))
+    SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 10))
+    SUPABASE_RETRIES = int(os.getenv("SUPABASE_RETRIES", 2))
+
+    # Avatar storage backend, "supabase" or "local" (files served by the app under LOCAL_STORAGE_URL)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+    LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "")
+    LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "/avatars")
+
+    # Avatar uploads, sizes in bytes
+    AVATAR_MAX_SIZE = int(os.getenv("AVATAR_MAX_SIZE", 5 * 1024 * 1024))
+    STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", 64 * 1024))
+
+    # Avatar thumbnails, sizes in pixels, served for the /_ipx/ URLs of Nuxt Image
+    AVATAR_THUMBNAIL_SIZES = tuple(int(size) for size in os.getenv("AVATAR_THUMBNAIL_SIZES", "48,96,192,400").split(",") if size.strip())
+    AVATAR_THUMBNAIL_QUALITY = int(os.getenv("AVATAR_THUMBNAIL_QUALITY", 80))
+
+    # How long a missing thumbnail is remembered, and the /_ipx/ fallback to the original avatar is cached, in seconds
+    AVATAR_THUMBNAIL_MISS_TTL = float(os.getenv("AVATAR_THUMBNAIL_MISS_TTL", 60))
+
+    # Background jobs (avatar storage operations), backoff in seconds
+    JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", 2))
+    JOB_QUEUE_MAX_ATTEMPTS = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", 5))
+    JOB_QUEUE_BACKOFF = float(os.getenv("JOB_QUEUE_BACKOFF", 1))
+    JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", 1000))
+
+    # Compression of the JSON API responses, min size in bytes
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+    # Encode JSON responses with orjson when it is installed
+    JSON_USE_ORJSON = os.getenv("JSON_USE_ORJSON", "True").lower() == "true"
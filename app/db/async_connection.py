@@ -0,0 +1,160 @@
+from flask import current_app
+
+import asyncio
+from psycopg.rows import dict_row, tuple_row, AsyncRowFactory, TupleRow
+from psycopg import AsyncConnection, Error
+from psycopg_pool import AsyncConnectionPool
+
+from .instrumentation import QueryStats, explain_query, get_query_log, run_with_query_log
+from .query_registry import PreparedStatementStats
+
+from threading import Thread
+from typing import Any, Awaitable, TypeVar
+
+import time
+
+T = TypeVar("T")
+
+class AsyncDatabase:
+    """
+    Singleton class for the async database connection pool.
+
+    Flask runs every async view in its own short-lived event loop, so the pool lives on a
+    dedicated background loop instead. Views await the queries submitted to that loop, which
+    lets a single loop keep many database round trips in flight at once.
+    """
+
+    _instance = None
+
+    def __new__(cls) -> "AsyncDatabase":
+        if cls._instance is None:
+            cls._instance = super(AsyncDatabase, cls).__new__(cls)
+            cls._instance._connect()
+        return cls._instance
+
+    def _connect(self) -> None:
+        # psycopg's async mode does not support the Proactor loop used by default on Windows
+        self._loop = asyncio.SelectorEventLoop()
+        self._thread = Thread(target=self._loop.run_forever, name="async-db-loop", daemon=True)
+        self._thread.start()
+
+        pool_kwargs = {
+            "kwargs": {
+                "dbname": current_app.config["DB_NAME"],
+                "port": current_app.config["DB_PORT"],
+                "user": current_app.config["DB_USER"],
+                "password": current_app.config["DB_PASS"],
+                "host": current_app.config["DB_HOST"],
+                "row_factory": dict_row
+            },
+            "min_size": current_app.config["DB_ASYNC_POOL_MIN_SIZE"],
+            "max_size": current_app.config["DB_ASYNC_POOL_MAX_SIZE"],
+            "timeout": current_app.config["DB_POOL_TIMEOUT"],
+            "max_lifetime": current_app.config["DB_POOL_MAX_LIFETIME"],
+            "max_idle": current_app.config["DB_POOL_MAX_IDLE"],
+            "configure": self._configure_connection,
+        }
+
+        self._prepared_max = current_app.config["DB_PREPARED_MAX"]
+        self.prepared_statements = PreparedStatementStats()
+        self.query_stats = QueryStats(slow_query_ms=current_app.config["DB_SLOW_QUERY_MS"],
+                                      explain_slow_queries=current_app.config["DB_SLOW_QUERY_EXPLAIN"])
+
+        self.pool: AsyncConnectionPool = asyncio.run_coroutine_threadsafe(self._open_pool(pool_kwargs), self._loop).result()
+
+    @staticmethod
+    async def _open_pool(pool_kwargs: dict[str, Any]) -> AsyncConnectionPool:
+        pool = AsyncConnectionPool(check=AsyncConnectionPool.check_connection, name="ssis-async-pool", open=False, **pool_kwargs)
+        await pool.open()
+        return pool
+
+    async def _configure_connection(self, conn: AsyncConnection) -> None:
+        """Size the prepared statement cache of a new pool connection."""
+        conn.prepared_max = self._prepared_max
+
+    async def _run(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the pool's event loop and await its result from the caller's loop."""
+        coro = run_with_query_log(coro, get_query_log())
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def _record_query(self, conn: AsyncConnection, query, params, started_at: float, rows: int) -> None:
+        """Record the time and rows of a query, and log it with its plan if it was slow."""
+
+        record = self.query_stats.record(query, (time.perf_counter() - started_at) * 1000, rows)
+
+        if self.query_stats.is_slow(record.duration_ms):
+            plan = await self._explain(conn, query, params) if self.query_stats.explain_slow_queries else None
+            self.query_stats.log_slow_query(record, plan)
+
+    @staticmethod
+    async def _explain(conn: AsyncConnection, query, params) -> str | None:
+        """Return the plan of a query, or None if it cannot be explained."""
+
+        try:
+            # A savepoint inside an open transaction, so a failed EXPLAIN does not abort it
+            async with conn.transaction():
+                async with conn.cursor(row_factory=tuple_row) as cur:
+                    await cur.execute(explain_query(query), params)
+                    return "\n".join(row[0] for row in await cur.fetchall())
+        except Error:
+            return None
+
+    async def _execute_query(self, query, params=None) -> None:
+        async with self.pool.connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    started_at = time.perf_counter()
+                    await cur.execute(query, params)
+                    await conn.commit()
+                    await self._record_query(conn, query, params, started_at, cur.rowcount)
+            except Exception as e:
+                await conn.rollback()
+                raise e
+
+    async def _fetch_all(self, query, params=None, row_factory: AsyncRowFactory | None = None, prepare: bool | None = None) -> list[TupleRow]:
+        async with self.pool.connection() as conn:
+            async with conn.cursor(row_factory=row_factory) as cur:
+                started_at = time.perf_counter()
+                await cur.execute(query, params, prepare=prepare)
+                rows = await cur.fetchall()
+                await self._record_query(conn, query, params, started_at, len(rows))
+
+                if prepare:
+                    self.prepared_statements.record(conn, query)
+
+                return rows
+
+    async def _fetch_one(self, query, params=None, row_factory: AsyncRowFactory | None = None, prepare: bool | None = None) -> TupleRow | None:
+        async with self.pool.connection() as conn:
+            async with conn.cursor(row_factory=row_factory) as cur:
+                started_at = time.perf_counter()
+                await cur.execute(query, params, prepare=prepare)
+                row = await cur.fetchone()
+                await self._record_query(conn, query, params, started_at, int(row is not None))
+
+                if prepare:
+                    self.prepared_statements.record(conn, query)
+
+                return row
+
+    async def execute_query(self, query, params=None) -> None:
+        """For INSERT, UPDATE, DELETE queries."""
+        return await self._run(self._execute_query(query, params))
+
+    async def fetch_all(self, query, params=None, row_factory: AsyncRowFactory | None = None, prepare: bool | None = None) -> list[TupleRow]:
+        """For SELECT queries returning multiple rows, as dicts unless another row_factory is given."""
+        return await self._run(self._fetch_all(query, params, row_factory, prepare))
+
+    async def fetch_one(self, query, params=None, row_factory: AsyncRowFactory | None = None, prepare: bool | None = None) -> TupleRow | None:
+        """For SELECT queries returning a single row, as a dict unless another row_factory is given."""
+        return await self._run(self._fetch_one(query, params, row_factory, prepare))
+
+    def get_pool_stats(self) -> dict[str, Any]:
+        """Return the async pool usage counters."""
+        return dict(self.pool.get_stats())
+
+    def close(self) -> None:
+        if self.pool:
+            asyncio.run_coroutine_threadsafe(self.pool.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            AsyncDatabase._instance = None
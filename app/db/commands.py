@@ -0,0 +1,160 @@
+from flask import current_app
+from flask.cli import AppGroup
+from psycopg import sql
+
+import click
+import json
+
+from app.db.queries.students import StudentQueries
+from app.db.query_builder import ENTITY_COLUMNS, build_where_clause
+from app.db.search_planner import build_search_conditions
+from app.features.students.services import GENERATE_AVATAR_THUMBNAILS_JOB
+
+db_cli = AppGroup("db", help="Database maintenance commands.")
+
+SEARCH_TYPES = ("Starts With", "Contains", "Ends With")
+
+def _find_seq_scans(plan: dict) -> list[str]:
+    """Walk an EXPLAIN (FORMAT JSON) plan and collect the relations read by a sequential scan."""
+
+    seq_scans = []
+
+    if plan.get("Node Type") == "Seq Scan":
+        seq_scans.append(plan.get("Relation Name", "?"))
+
+    for child in plan.get("Plans", []):
+        seq_scans.extend(_find_seq_scans(child))
+
+    return seq_scans
+
+@db_cli.command("check-search-plans")
+@click.option("--search-value", default="ab", show_default=True, help="Value to plan each search with.")
+def check_search_plans(search_value: str) -> None:
+    """
+    EXPLAIN every search the list endpoints can issue and fail if any of them plans a sequential scan.
+
+    Sequential scans are disabled for the check so that a missing or unusable index shows up as a
+    Seq Scan even on a small development table, where the planner would otherwise prefer one.
+    """
+
+    db = current_app.extensions['db']
+    failures = []
+
+    with db.connection() as conn:
+        for table, entity in ENTITY_COLUMNS.items():
+            for column, expression in entity.columns.items():
+
+                # Enum columns are matched by equality on their labels, not by a pattern
+                if expression is None:
+                    continue
+
+                for search_type in SEARCH_TYPES:
+                    params = {"search_value": search_value, "search_by": column, "search_type": search_type}
+
+                    conditions, values = build_search_conditions(table, params)
+                    query = sql.SQL("EXPLAIN (FORMAT JSON) SELECT * FROM {} {}").format(sql.Identifier(table), build_where_clause(conditions))
+
+                    with conn.transaction():
+                        with conn.cursor() as cur:
+                            cur.execute("SET LOCAL enable_seqscan = off")
+                            cur.execute(query, values)
+                            row = cur.fetchone()
+
+                    plan = row["QUERY PLAN"]
+
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+
+                    seq_scans = _find_seq_scans(plan[0]["Plan"])
+                    status = "FAIL" if seq_scans else "ok"
+
+                    click.echo(f"[{status}] {table}.{column} {search_type}")
+
+                    if seq_scans:
+                        failures.append(f"{table}.{column} ({search_type})")
+
+    if failures:
+        raise click.ClickException(f"Sequential scan planned for: {', '.join(failures)}")
+
+    click.echo("All searches are served by an index.")
+
+@db_cli.command("rebuild-demographics")
+def rebuild_demographics() -> None:
+    """Recompute the student_demographics rollup from the students table."""
+
+    db = current_app.extensions['db']
+
+    with db.connection() as conn:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                # Block student writes so no trigger update lands between the delete and the insert
+                cur.execute("LOCK TABLE students IN SHARE MODE")
+                cur.execute("DELETE FROM student_demographics")
+                cur.execute(StudentQueries.REBUILD_DEMOGRAPHICS)
+                group_count = cur.rowcount
+
+    current_app.extensions['demographics_cache'].invalidate()
+
+    click.echo(f"Rebuilt student_demographics with {group_count} group(s).")
+
+@db_cli.command("generate-avatar-thumbnails")
+@click.option("--force", is_flag=True, help="Regenerate the thumbnails of every avatar, not only of the ones missing one.")
+def generate_avatar_thumbnails(force: bool) -> None:
+    """
+    Queue the thumbnails of the avatars missing one, e.g. uploaded before thumbnails existed, and wait for them.
+
+    Until its thumbnails are stored, every sized /_ipx/ URL of an avatar redirects to the original.
+    """
+
+    storage = current_app.extensions['storage']
+    job_queue = current_app.extensions['job_queue']
+
+    if not current_app.extensions['avatar_thumbnailer']:
+        raise click.ClickException("Avatar thumbnails are disabled, configure a storage backend and AVATAR_THUMBNAIL_SIZES.")
+
+    db = current_app.extensions['db']
+    avatar_urls = [row["avatar_url"] for row in db.fetch_all(StudentQueries.GET_ALL_AVATAR_URLS)]
+    queued_count = 0
+    dead_lettered_before = job_queue.get_stats()["dead_lettered"]
+
+    for avatar_url in avatar_urls:
+        if not force and all(storage.thumbnail_exists(avatar_url, size) for size in storage.thumbnail_sizes):
+            continue
+
+        job_queue.enqueue(GENERATE_AVATAR_THUMBNAILS_JOB, {"avatar_url": avatar_url})
+        queued_count += 1
+
+    click.echo(f"Queued the thumbnails of {queued_count} of {len(avatar_urls)} avatar(s).")
+
+    # The jobs run on this process's workers, and the ones still queued when it exits would be dead-lettered
+    job_queue.wait_until_idle()
+
+    dead_lettered = job_queue.get_stats()["dead_lettered"] - dead_lettered_before
+
+    if dead_lettered:
+        raise click.ClickException(f"{dead_lettered} thumbnail job(s) failed and were written to job_dead_letters.")
+
+    click.echo("Every queued thumbnail was generated.")
+
+@db_cli.command("check-demographics")
+def check_demographics() -> None:
+    """Compare the student_demographics rollup against live counts from the students table."""
+
+    db = current_app.extensions['db']
+
+    with db.connection() as conn:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                # A repeatable read snapshot keeps both sides of the comparison consistent
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cur.execute(StudentQueries.CHECK_DEMOGRAPHICS)
+                mismatches = cur.fetchall()
+
+    for row in mismatches:
+        click.echo(f"[FAIL] ({row['program_code']}, {row['year_level']}, {row['gender']}): "
+                   f"students has {row['live_count']}, rollup has {row['rollup_count']}")
+
+    if mismatches:
+        raise click.ClickException(f"{len(mismatches)} group(s) out of sync, run 'flask db rebuild-demographics'.")
+
+    click.echo("student_demographics matches the students table.")
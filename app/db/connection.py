@@ -1,12 +1,21 @@
 from flask import current_app
 
 import psycopg
-from psycopg.rows import dict_row, TupleRow, DictRow
+from psycopg.rows import dict_row, tuple_row, RowFactory, TupleRow, DictRow
+from psycopg_pool import ConnectionPool
 
-from typing import Any
+from .instrumentation import QueryStats, explain_query
+from .query_registry import PreparedStatementStats
+
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Iterator
+
+import time
+import uuid
 
 class Database:
-    """Singleton class for database connection"""
+    """Singleton class for the database connection pool"""
 
     _instance = None
 
@@ -17,44 +26,182 @@ class Database:
         return cls._instance
 
     def _connect(self) -> None:
-        self.conn = psycopg.connect(
-            dbname=current_app.config["DB_NAME"],
-            port=current_app.config["DB_PORT"],
-            user=current_app.config["DB_USER"],
-            password=current_app.config["DB_PASS"],
-            host=current_app.config["DB_HOST"],
-            row_factory=dict_row # type: ignore[arg-type]
-        ) 
+        # Read here, since the pool configures new connections from its own threads, outside of the app context
+        self._prepared_max = current_app.config["DB_PREPARED_MAX"]
+
+        self.pool = ConnectionPool(
+            kwargs={
+                "dbname": current_app.config["DB_NAME"],
+                "port": current_app.config["DB_PORT"],
+                "user": current_app.config["DB_USER"],
+                "password": current_app.config["DB_PASS"],
+                "host": current_app.config["DB_HOST"],
+                "row_factory": dict_row
+            },
+            min_size=current_app.config["DB_POOL_MIN_SIZE"],
+            max_size=current_app.config["DB_POOL_MAX_SIZE"],
+            timeout=current_app.config["DB_POOL_TIMEOUT"],
+            max_lifetime=current_app.config["DB_POOL_MAX_LIFETIME"],
+            max_idle=current_app.config["DB_POOL_MAX_IDLE"],
+            check=ConnectionPool.check_connection,
+            configure=self._configure_connection,
+            name="ssis-pool",
+            open=True
+        )
+
+        self._wait_lock = Lock()
+        self._wait_count = 0
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+
+        self.prepared_statements = PreparedStatementStats()
+        self.query_stats = QueryStats(slow_query_ms=current_app.config["DB_SLOW_QUERY_MS"],
+                                      explain_slow_queries=current_app.config["DB_SLOW_QUERY_EXPLAIN"])
+
+    def _configure_connection(self, conn: psycopg.Connection) -> None:
+        """Size the prepared statement cache of a new pool connection."""
+        conn.prepared_max = self._prepared_max
+
+    @contextmanager
+    def connection(self) -> Iterator[psycopg.Connection]:
+        """Borrow a connection from the pool, recording how long the checkout waited."""
+
+        started_at = time.perf_counter()
+
+        with self.pool.connection() as conn:
+            self._record_wait((time.perf_counter() - started_at) * 1000)
+            yield conn
+
+    def _record_wait(self, wait_ms: float) -> None:
+        with self._wait_lock:
+            self._wait_count += 1
+            self._wait_total_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def _record_prepared(self, conn: psycopg.Connection, query, prepare: bool | None) -> None:
+        if prepare:
+            self.prepared_statements.record(conn, query)
+
+    def _record_query(self, conn: psycopg.Connection, query, params, started_at: float, rows: int) -> None:
+        """Record the time and rows of a query, and log it with its plan if it was slow."""
+
+        record = self.query_stats.record(query, (time.perf_counter() - started_at) * 1000, rows)
+
+        if self.query_stats.is_slow(record.duration_ms):
+            plan = self._explain(conn, query, params) if self.query_stats.explain_slow_queries else None
+            self.query_stats.log_slow_query(record, plan)
+
+    @staticmethod
+    def _explain(conn: psycopg.Connection, query, params) -> str | None:
+        """Return the plan of a query, or None if it cannot be explained."""
+
+        try:
+            # A savepoint inside an open transaction, so a failed EXPLAIN does not abort it
+            with conn.transaction():
+                with conn.cursor(row_factory=tuple_row) as cur:
+                    cur.execute(explain_query(query), params)
+                    return "\n".join(row[0] for row in cur.fetchall())
+        except psycopg.Error:
+            return None
 
     def execute_query(self, query, params=None) -> None:
         """For INSERT, UPDATE, DELETE queries."""
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, params)
-                self.conn.commit()
-        except Exception as e:
-            self.conn.rollback()
-            raise e
-
-    def fetch_all(self, query, params=None) -> list[TupleRow]:
-        """For SELECT queries returning multiple rows."""
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.fetchall()
-        except Exception as e:
-            raise e
-
-    def fetch_one(self, query, params=None) -> TupleRow | None:
-        """For SELECT queries returning a single row."""
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.fetchone()
-        except Exception as e:
-            raise e
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    started_at = time.perf_counter()
+                    cur.execute(query, params)
+                    conn.commit()
+                    self._record_query(conn, query, params, started_at, cur.rowcount)
+            except Exception as e:
+                conn.rollback()
+                raise e
+
+    def fetch_all(self, query, params=None, row_factory: RowFactory | None = None, prepare: bool | None = None) -> list[TupleRow]:
+        """
+        For SELECT queries returning multiple rows, as dicts unless another row_factory is given.
+
+        With prepare=True the query runs as a server-side prepared statement, prepared on its first
+        execution on each connection. Meant for the queries of the QueryRegistry.
+        """
+        with self.connection() as conn:
+            with conn.cursor(row_factory=row_factory) as cur:
+                started_at = time.perf_counter()
+                cur.execute(query, params, prepare=prepare)
+                rows = cur.fetchall()
+                self._record_query(conn, query, params, started_at, len(rows))
+                self._record_prepared(conn, query, prepare)
+                return rows
+
+    def fetch_one(self, query, params=None, row_factory: RowFactory | None = None, prepare: bool | None = None) -> TupleRow | None:
+        """For SELECT queries returning a single row, as a dict unless another row_factory is given. See fetch_all for prepare."""
+        with self.connection() as conn:
+            with conn.cursor(row_factory=row_factory) as cur:
+                started_at = time.perf_counter()
+                cur.execute(query, params, prepare=prepare)
+                row = cur.fetchone()
+                self._record_query(conn, query, params, started_at, int(row is not None))
+                self._record_prepared(conn, query, prepare)
+                return row
+
+    @contextmanager
+    def transaction(self) -> Iterator[psycopg.Cursor[DictRow]]:
+        """
+        For several statements that must commit or roll back together.
+
+        Yields a cursor whose statements commit when the block exits, or roll back if it raises.
+        """
+        with self.connection() as conn:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    yield cur
+
+    def stream(self, query, params=None, itersize: int = 2000) -> Iterator[DictRow]:
+        """
+        For SELECT queries whose result is too large to hold in memory.
+
+        Rows are read through a named (server-side) cursor, itersize rows per round trip. The pool
+        connection stays checked out until the generator is exhausted or closed.
+
+        The query is recorded once the stream ends, but never logged as slow, since its time includes
+        however long the client took to read the rows.
+        """
+        with self.connection() as conn:
+            with conn.transaction():
+                with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                    cur.itersize = itersize
+                    started_at = time.perf_counter()
+                    rows = 0
+
+                    try:
+                        cur.execute(query, params)
+
+                        for row in cur:
+                            rows += 1
+                            yield row
+                    finally:
+                        self.query_stats.record(query, (time.perf_counter() - started_at) * 1000, rows, streamed=True)
+
+    def get_pool_stats(self) -> dict[str, Any]:
+        """
+        Return the pool usage counters along with checkout wait times.
+
+        Returns:
+            dict: The psycopg_pool stats (pool_size, pool_available, requests_waiting, ...)
+            plus "checkouts", "checkout_wait_avg_ms" and "checkout_wait_max_ms".
+        """
+
+        stats: dict[str, Any] = dict(self.pool.get_stats())
+
+        with self._wait_lock:
+            stats["checkouts"] = self._wait_count
+            stats["checkout_wait_total_ms"] = round(self._wait_total_ms, 3)
+            stats["checkout_wait_avg_ms"] = round(self._wait_total_ms / self._wait_count, 3) if self._wait_count else 0.0
+            stats["checkout_wait_max_ms"] = round(self._wait_max_ms, 3)
+
+        return stats
 
     def close(self) -> None:
-        if self.conn:
-            self.conn.close()
-            Database._instance = None
\ No newline at end of file
+        if self.pool:
+            self.pool.close()
+            Database._instance = None
@@ -0,0 +1,245 @@
+from psycopg import sql
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Awaitable, TypeVar
+
+import hashlib
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Values are replaced by ? in fingerprints, so the same statement with different values shares one
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%(?:\(\w+\))?s")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+@dataclass(slots=True)
+class QueryRecord:
+    """One query run by Database or AsyncDatabase, with its time and the number of rows it returned or changed."""
+
+    fingerprint: str
+    statement: str
+    duration_ms: float
+    rows: int
+
+class QueryLog:
+    """The queries run while serving one request."""
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.records: list[QueryRecord] = []
+
+    @property
+    def db_time_ms(self) -> float:
+        """The summed time of the queries, which exceeds their wall time when they are awaited concurrently."""
+        return sum(record.duration_ms for record in self.records)
+
+    @property
+    def elapsed_ms(self) -> float:
+        """The time since the request started."""
+        return (time.perf_counter() - self.started_at) * 1000
+
+_query_log: ContextVar[QueryLog | None] = ContextVar("query_log", default=None)
+
+def start_query_log() -> QueryLog:
+    """Start recording the queries of the current request."""
+
+    query_log = QueryLog()
+    _query_log.set(query_log)
+
+    return query_log
+
+def get_query_log() -> QueryLog | None:
+    """Return the query log of the current request, or None outside of a request (e.g. in a job worker)."""
+    return _query_log.get()
+
+def end_query_log(label: str) -> QueryLog | None:
+    """
+    Stop recording the queries of the current request, logging them at DEBUG level.
+
+    Args:
+        label (str): What the request was, e.g. "GET /api/students/", to head the log entry with.
+
+    Returns:
+        QueryLog | None: The log that was being recorded, if any.
+    """
+
+    query_log = _query_log.get()
+    _query_log.set(None)
+
+    if query_log is not None and query_log.records and logger.isEnabledFor(logging.DEBUG):
+        lines = [f"{label}: {len(query_log.records)} quer{'y' if len(query_log.records) == 1 else 'ies'} in {query_log.db_time_ms:.1f} ms"]
+        lines.extend(f"  {record.duration_ms:8.2f} ms {record.rows:6d} rows [{record.fingerprint}] {record.statement}"
+                     for record in query_log.records)
+
+        logger.debug("\n".join(lines))
+
+    return query_log
+
+async def run_with_query_log(coro: Awaitable[T], query_log: QueryLog | None) -> T:
+    """
+    Await a coroutine with the query log of a request.
+
+    AsyncDatabase runs its queries on its own event loop, whose tasks do not inherit the context of the
+    request that awaits them, so the log is set again in the task.
+    """
+
+    _query_log.set(query_log)
+    return await coro
+
+def render_query(query: Any) -> str:
+    """Return the SQL of a query given as a str, bytes or psycopg.sql object."""
+
+    if isinstance(query, sql.Composable):
+        return query.as_string(None)
+
+    if isinstance(query, bytes):
+        return query.decode()
+
+    return str(query)
+
+@lru_cache(maxsize=1024)
+def _normalize(statement: str) -> tuple[str, str]:
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(...)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest(), normalized
+
+def fingerprint_query(query: Any) -> tuple[str, str]:
+    """
+    Normalize a query into a fingerprint shared by every execution of the same statement.
+
+    Literals and parameter placeholders are replaced by ?, lists of them by (...), and whitespace is collapsed.
+
+    Returns:
+        tuple[str, str]: A 16 character hash of the normalized statement, and the normalized statement.
+    """
+
+    return _normalize(render_query(query))
+
+def explain_query(query: Any) -> sql.Composable:
+    """Return the EXPLAIN statement of a query, which plans it with the same parameters without running it."""
+
+    if not isinstance(query, sql.Composable):
+        query = sql.SQL(render_query(query))
+
+    return sql.SQL("EXPLAIN {}").format(query)
+
+class QueryStats:
+    """
+    Per-fingerprint totals of the queries run through a connection pool, and its slow query log.
+
+    Every query is also added to the QueryLog of the request that ran it, if any.
+    """
+
+    def __init__(self, slow_query_ms: float = 200, explain_slow_queries: bool = True, max_fingerprints: int = 1000) -> None:
+        """
+        Args:
+            slow_query_ms (float): Queries taking at least this long are logged as slow, 0 to disable the log.
+            explain_slow_queries (bool): Whether slow queries are logged with their EXPLAIN output.
+            max_fingerprints (int): The number of fingerprints totalled. Queries past it are only counted.
+        """
+
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow_queries = explain_slow_queries
+        self.max_fingerprints = max_fingerprints
+
+        self._totals: dict[str, dict[str, Any]] = {}
+        self._lock = Lock()
+
+        self.queries = 0
+        self.slow_queries = 0
+        self.total_ms = 0.0
+
+    def record(self, query: Any, duration_ms: float, rows: int, streamed: bool = False) -> QueryRecord:
+        """
+        Record a query that ran for duration_ms and returned or changed rows rows.
+
+        Args:
+            streamed (bool): Whether the rows were streamed to the client, which makes the query as slow as
+                the client and keeps it out of the slow query count.
+        """
+
+        fingerprint, statement = fingerprint_query(query)
+        record = QueryRecord(fingerprint, statement, duration_ms, rows)
+
+        query_log = _query_log.get()
+
+        if query_log is not None:
+            query_log.records.append(record)
+
+        with self._lock:
+            self.queries += 1
+            self.total_ms += duration_ms
+
+            if not streamed and self.is_slow(duration_ms):
+                self.slow_queries += 1
+
+            totals = self._totals.get(fingerprint)
+
+            if totals is None:
+                if len(self._totals) >= self.max_fingerprints:
+                    return record
+
+                totals = self._totals[fingerprint] = {"statement": statement, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+
+            totals["calls"] += 1
+            totals["total_ms"] += duration_ms
+            totals["max_ms"] = max(totals["max_ms"], duration_ms)
+            totals["rows"] += rows
+
+        return record
+
+    def is_slow(self, duration_ms: float) -> bool:
+        """Whether a query of duration_ms belongs in the slow query log."""
+        return 0 < self.slow_query_ms <= duration_ms
+
+    def log_slow_query(self, record: QueryRecord, plan: str | None = None) -> None:
+        """Log a slow query, with its plan if it could be explained."""
+
+        message = f"Slow query ({record.duration_ms:.1f} ms, {record.rows} rows) [{record.fingerprint}] {record.statement}"
+
+        if plan:
+            message += "\n" + plan
+
+        logger.warning(message)
+
+    def get_stats(self, limit: int = 20) -> dict[str, Any]:
+        """
+        Return the query counters and the limit fingerprints with the most total time.
+
+        Returns:
+            dict: "queries", "slow_queries", "total_ms", "slow_query_ms", and "fingerprints", each including
+            "fingerprint", "statement", "calls", "total_ms", "avg_ms", "max_ms" and "rows".
+        """
+
+        with self._lock:
+            fingerprints = sorted(self._totals.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:limit]
+
+            return {
+                "queries": self.queries,
+                "slow_queries": self.slow_queries,
+                "total_ms": round(self.total_ms, 3),
+                "slow_query_ms": self.slow_query_ms,
+                "fingerprints": [{
+                    "fingerprint": fingerprint,
+                    "statement": totals["statement"],
+                    "calls": totals["calls"],
+                    "total_ms": round(totals["total_ms"], 3),
+                    "avg_ms": round(totals["total_ms"] / totals["calls"], 3),
+                    "max_ms": round(totals["max_ms"], 3),
+                    "rows": totals["rows"],
+                } for fingerprint, totals in fingerprints],
+            }
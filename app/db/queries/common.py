@@ -1,36 +1,37 @@
 
 
 class CommonQueries:
-    """This class contains queries that can be called regardless of feature."""
+    """
+    This class contains queries that can be called regardless of feature.
+
+    The read templates are built through the QueryRegistry (app.db.query_registry), once per variant, and
+    the export templates with psycopg.sql. Both quote every table and column name as an identifier.
+    """
 
 
     INSERT = "INSERT INTO {table} ({columns}) VALUES ({placeholders})"
     GET_TOTAL_COUNT = "SELECT COUNT(*) FROM {table}"
-    GET_TOTAL_COUNT_WITH_SEARCH = "SELECT COUNT(*) FROM {table} WHERE {search_by} ILIKE %s"
-
-    GET_TOTAL_COUNT_STUDENTS = """SELECT COUNT(*) FROM {table} WHERE 
-    gender::text ILIKE %s 
-    AND year_level::text ILIKE %s
-    AND program_code ILIKE %s"""
-
 
-    GET_TOTAL_COUNT_WITH_SEARCH_STUDENTS = """SELECT COUNT(*) FROM {table} WHERE 
-    {search_by}::text ILIKE %s 
-    AND gender::text ILIKE %s 
-    AND year_level::text ILIKE %s
-    AND program_code ILIKE %s"""
+    # {where_clause} is built by app.db.query_builder, and is empty when nothing is searched or filtered
+    GET_TOTAL_COUNT_WHERE = "SELECT COUNT(*) FROM {table} {where_clause}"
 
     GET_BY_ID = "SELECT * FROM {table} WHERE {pk} = %s LIMIT 1"
     GET_ALL = "SELECT * FROM {table}"
-    GET_MANY = "SELECT * FROM {table} WHERE {search_by}::text ILIKE %s ORDER BY {sort_field} {sort_order} LIMIT %s OFFSET %s"
-    
-    GET_MANY_STUDENTS = """SELECT * FROM {table} WHERE {search_by}::text ILIKE %s 
-    AND gender::text ILIKE %s 
-    AND year_level::text ILIKE %s
-    AND program_code ILIKE %s
-    ORDER BY {sort_field} {sort_order} LIMIT %s OFFSET %s"""
+    GET_MANY = "SELECT *{count_column} FROM {table} {where_clause} ORDER BY {sort_field} {sort_order} LIMIT %s OFFSET %s"
+
+    # {count_column} of GET_MANY, returns the page and its total count in one round trip
+    WINDOW_TOTAL_COUNT_COLUMN = ", COUNT(*) OVER () AS total_count"
+
+    # {table} is the name of the table as a sql.Literal, since it is cast to regclass rather than selected from
+    ESTIMATED_TOTAL_COUNT_COLUMN = """, (SELECT CASE WHEN reltuples >= 0 THEN reltuples::bigint END 
+    FROM pg_class WHERE oid = {table}::regclass) AS total_count"""
 
+    # Keyset (cursor) pagination, KEYSET_SEEK is added to {where_clause} for every page after the first
+    GET_MANY_KEYSET = "SELECT * FROM {table} {where_clause} ORDER BY {sort_key} {sort_order}, {pk} {sort_order} LIMIT %s"
+    KEYSET_SEEK = "({sort_key}, {pk}) {comparator} (%s, %s)"
 
+    # Every matching row in a stable order, read through Database.stream by the export endpoints
+    GET_ALL_SORTED = "SELECT * FROM {table} {where_clause} ORDER BY {sort_field} {sort_order}, {pk} {sort_order}"
 
     UPDATE_BY_ID = "UPDATE {table} SET {set_clause} WHERE {pk} = %s"
     DELETE_BY_ID = "DELETE FROM {table} WHERE {pk} = ANY(%s)"
@@ -0,0 +1,9 @@
+
+
+class JobQueries:
+
+    INSERT_DEAD_LETTER = "INSERT INTO job_dead_letters (kind, payload, data, error, attempts) VALUES (%s, %s, %s, %s, %s)"
+
+    GET_DEAD_LETTER_COUNT = "SELECT COUNT(*) FROM job_dead_letters"
+
+    GET_DEAD_LETTER_COUNT_BY_KIND = "SELECT kind, COUNT(*) AS count FROM job_dead_letters GROUP BY kind ORDER BY kind"
@@ -23,65 +23,237 @@ class StudentQueries:
         ) RETURNING id_number
     """
 
+    # Locks the rows so their avatars cannot change between reading them and deleting the students
+    GET_AVATAR_URLS_FOR_DELETE = "SELECT id_number, avatar_url FROM students WHERE id_number = ANY(%s) FOR UPDATE"
+
+    GET_ALL_AVATAR_URLS = "SELECT avatar_url FROM students WHERE avatar_url IS NOT NULL ORDER BY id_number"
+
+    # Sets a new avatar and returns the one it replaced, with the row locked in between so that concurrent
+    # uploads for the same student each get back the avatar they replaced. Returns no row if the student is gone.
+    REPLACE_AVATAR_URL = """UPDATE students s SET avatar_url = %s
+                            FROM (SELECT id_number, avatar_url FROM students WHERE id_number = %s FOR UPDATE) previous
+                            WHERE s.id_number = previous.id_number
+                            RETURNING previous.avatar_url AS previous_avatar_url"""
+
+    # Bulk import: rows are COPY'd into a temporary staging table, checked against students and programs
+    # in a few set-based statements, then merged in one INSERT ... SELECT.
+
+    CREATE_IMPORT_STAGING = """CREATE TEMPORARY TABLE student_import (
+                                    row_number INTEGER NOT NULL,
+                                    id_number CHAR(9) NOT NULL,
+                                    first_name TEXT NOT NULL,
+                                    last_name TEXT NOT NULL,
+                                    year_level year_level_enum NOT NULL,
+                                    gender gender_enum NOT NULL,
+                                    program_code TEXT NOT NULL,
+                                    error TEXT,
+                                    accepted BOOLEAN NOT NULL DEFAULT FALSE
+                                ) ON COMMIT DROP"""
+
+    COPY_IMPORT_STAGING = """COPY student_import (row_number, id_number, first_name, last_name, year_level, gender, program_code) 
+                                FROM STDIN"""
+
+    # Blocks other student writes (but not reads) from the checks until the merge commits, so no row that
+    # passed the checks can conflict by the time it is inserted
+    LOCK_STUDENTS_FOR_IMPORT = "LOCK TABLE students IN SHARE ROW EXCLUSIVE MODE"
+
+    # Temporary tables are never auto-analyzed, and the checks below need statistics to pick hash joins
+    ANALYZE_IMPORT_STAGING = "ANALYZE student_import"
+
+    # Each check only marks rows that have not failed an earlier one, so a row reports its first error
+    MARK_IMPORT_EXISTING_ID_NUMBERS = """UPDATE student_import s SET error = 'students_pkey'
+                                            FROM students st
+                                            WHERE s.error IS NULL AND st.id_number = s.id_number"""
+
+    MARK_IMPORT_EXISTING_FULL_NAMES = """UPDATE student_import s SET error = 'unique_full_name'
+                                            FROM students st
+                                            WHERE s.error IS NULL AND st.first_name = s.first_name AND st.last_name = s.last_name"""
+
+    MARK_IMPORT_MISSING_PROGRAMS = """UPDATE student_import s SET error = 'students_program_code_fkey'
+                                        WHERE s.error IS NULL 
+                                            AND NOT EXISTS (SELECT 1 FROM programs p WHERE p.program_code = s.program_code)"""
+
+    # The duplicate checks run last and decide the remaining rows in file order, as row by row inserts would.
+    # A row is a duplicate when an earlier accepted row has its id number or full name, and it is accepted
+    # once no earlier row that can still be inserted shares either of them. Each round of the three checks
+    # decides at least the first undecided row, and they are repeated until a round changes no row
+    MARK_IMPORT_DUPLICATE_ID_NUMBERS = """UPDATE student_import s SET error = 'duplicate_id_number'
+                                            WHERE s.error IS NULL AND NOT s.accepted
+                                                AND EXISTS (SELECT 1 FROM student_import o 
+                                                            WHERE o.accepted AND o.id_number = s.id_number 
+                                                                AND o.row_number < s.row_number)"""
+
+    MARK_IMPORT_DUPLICATE_FULL_NAMES = """UPDATE student_import s SET error = 'duplicate_full_name'
+                                            WHERE s.error IS NULL AND NOT s.accepted
+                                                AND EXISTS (SELECT 1 FROM student_import o 
+                                                            WHERE o.accepted AND o.first_name = s.first_name AND o.last_name = s.last_name 
+                                                                AND o.row_number < s.row_number)"""
+
+    ACCEPT_IMPORT_ROWS = """UPDATE student_import s SET accepted = TRUE
+                                WHERE s.error IS NULL AND NOT s.accepted
+                                    AND NOT EXISTS (SELECT 1 FROM student_import o 
+                                                    WHERE o.error IS NULL AND o.id_number = s.id_number 
+                                                        AND o.row_number < s.row_number)
+                                    AND NOT EXISTS (SELECT 1 FROM student_import o 
+                                                    WHERE o.error IS NULL AND o.first_name = s.first_name AND o.last_name = s.last_name 
+                                                        AND o.row_number < s.row_number)"""
+
+    MERGE_IMPORT_STAGING = """INSERT INTO students (id_number, first_name, last_name, year_level, gender, program_code)
+                                SELECT id_number, first_name, last_name, year_level, gender, program_code
+                                FROM student_import
+                                WHERE error IS NULL
+                                ORDER BY row_number"""
+
+    GET_IMPORT_ERRORS = """SELECT row_number, id_number, first_name, last_name, program_code, error
+                            FROM student_import
+                            WHERE error IS NOT NULL
+                            ORDER BY row_number"""
+
+    # The demographics queries read the student_demographics rollup, which holds one row per
+    # (program_code, year_level, gender) group, so their cost does not grow with the student count.
+
     GET_YEAR_LEVEL_DEMOGRAPHICS = """SELECT yrlvl.year_level, 
-                                        COUNT(s.year_level) AS count 
+                                        COALESCE(SUM(d.count), 0) AS count 
                                     FROM unnest(enum_range(NULL::year_level_enum)) AS yrlvl(year_level)
-                                    LEFT JOIN students s 
-                                        ON s.year_level = yrlvl.year_level
+                                    LEFT JOIN student_demographics d 
+                                        ON d.year_level = yrlvl.year_level
                                     GROUP BY yrlvl.year_level
                                     ORDER BY yrlvl.year_level;"""
     
     GET_YEAR_LEVEL_DEMOGRAPHICS_FROM_PROGRAM_CODE = """SELECT yrlvl.year_level, 
-                                                            COUNT(s.year_level) AS count 
+                                                            COALESCE(SUM(d.count), 0) AS count 
                                                         FROM unnest(enum_range(NULL::year_level_enum)) AS yrlvl(year_level)
-                                                        LEFT JOIN students s 
-                                                            ON s.year_level = yrlvl.year_level
-                                                            AND s.program_code = %s
+                                                        LEFT JOIN student_demographics d 
+                                                            ON d.year_level = yrlvl.year_level
+                                                            AND d.program_code = %s
                                                         GROUP BY yrlvl.year_level
                                                         ORDER BY yrlvl.year_level;"""
     
     GET_YEAR_LEVEL_DEMOGRAPHICS_FROM_COLLEGE_CODE = """SELECT yrlvl.year_level, 
-                                                            COUNT(s.year_level) AS count 
+                                                            COALESCE(SUM(d.count), 0) AS count 
                                                         FROM unnest(enum_range(NULL::year_level_enum)) AS yrlvl(year_level)
                                                         LEFT JOIN (
-                                                            SELECT s.year_level
-                                                            FROM students s
-                                                            JOIN programs p ON p.program_code = s.program_code
-                                                            JOIN colleges c ON c.college_code = p.college_code
-                                                            WHERE c.college_code = %s
-                                                        ) s ON s.year_level = yrlvl.year_level
+                                                            SELECT d.year_level, d.count
+                                                            FROM student_demographics d
+                                                            JOIN programs p ON p.program_code = d.program_code
+                                                            WHERE p.college_code = %s
+                                                        ) d ON d.year_level = yrlvl.year_level
                                                         GROUP BY yrlvl.year_level
                                                         ORDER BY yrlvl.year_level;"""
     
     GET_GENDER_DEMOGRAPHICS = """SELECT g.gender, 
-                                    COUNT(s.gender) AS count 
+                                    COALESCE(SUM(d.count), 0) AS count 
                                 FROM unnest(enum_range(NULL::gender_enum)) AS g(gender)
-                                LEFT JOIN students s 
-                                    ON s.gender = g.gender
+                                LEFT JOIN student_demographics d 
+                                    ON d.gender = g.gender
                                 GROUP BY g.gender
                                 ORDER BY g.gender;"""
     
     GET_GENDER_DEMOGRAPHICS_FROM_PROGRAM_CODE = """SELECT g.gender, 
-                                                        COUNT(s.gender) AS count 
+                                                        COALESCE(SUM(d.count), 0) AS count 
                                                     FROM unnest(enum_range(NULL::gender_enum)) AS g(gender)
-                                                    LEFT JOIN students s 
-                                                        ON s.gender = g.gender
-                                                        AND s.program_code = %s
+                                                    LEFT JOIN student_demographics d 
+                                                        ON d.gender = g.gender
+                                                        AND d.program_code = %s
                                                     GROUP BY g.gender
                                                     ORDER BY g.gender;"""
     
     GET_GENDER_DEMOGRAPHICS_FROM_COLLEGE_CODE = """SELECT g.gender, 
-                                                        COUNT(s.gender) AS count 
+                                                        COALESCE(SUM(d.count), 0) AS count 
                                                     FROM unnest(enum_range(NULL::gender_enum)) AS g(gender)
                                                     LEFT JOIN (
-                                                            SELECT s.gender
-                                                            FROM students s
-                                                            JOIN programs p ON p.program_code = s.program_code
-                                                            JOIN colleges c ON c.college_code = p.college_code
-                                                            WHERE c.college_code = %s
-                                                        ) s ON s.gender = g.gender
+                                                            SELECT d.gender, d.count
+                                                            FROM student_demographics d
+                                                            JOIN programs p ON p.program_code = d.program_code
+                                                            WHERE p.college_code = %s
+                                                        ) d ON d.gender = g.gender
                                                     GROUP BY g.gender
                                                     ORDER BY g.gender;"""
+
+    # Statistics queries return the total, per year level and per gender counts in one pass over the rollup.
+    # GROUPING(year_level, gender) tells the sets apart: 3 is the total, 1 a year level row, 2 a gender row.
+
+    GET_STATISTICS = """SELECT d.year_level,
+                            d.gender,
+                            COALESCE(SUM(d.count), 0) AS count,
+                            GROUPING(d.year_level, d.gender) AS grouping_set
+                        FROM student_demographics d
+                        GROUP BY GROUPING SETS ((), (d.year_level), (d.gender))"""
+
+    GET_STATISTICS_FROM_PROGRAM_CODE = """SELECT d.year_level,
+                                            d.gender,
+                                            COALESCE(SUM(d.count), 0) AS count,
+                                            GROUPING(d.year_level, d.gender) AS grouping_set
+                                        FROM student_demographics d
+                                        WHERE d.program_code = %s
+                                        GROUP BY GROUPING SETS ((), (d.year_level), (d.gender))"""
+
+    GET_STATISTICS_FROM_COLLEGE_CODE = """SELECT d.year_level,
+                                            d.gender,
+                                            COALESCE(SUM(d.count), 0) AS count,
+                                            GROUPING(d.year_level, d.gender) AS grouping_set
+                                        FROM student_demographics d
+                                        JOIN programs p ON p.program_code = d.program_code
+                                        WHERE p.college_code = %s
+                                        GROUP BY GROUPING SETS ((), (d.year_level), (d.gender))"""
+
+    # Grouped variants repeat the three sets per program or college code on top of the overall ones.
+    # GROUPING(group_code, year_level, gender) adds 4 to the overall rows, so 7, 5 and 6 are the overall
+    # total, year level and gender rows while 3, 1 and 2 are the same per group. Programs and colleges without
+    # students still get a group total of 0 through the FULL JOIN, and students without a program or college
+    # share the NULL group.
+
+    GET_STATISTICS_BY_PROGRAM = """SELECT g.group_code,
+                                        g.year_level,
+                                        g.gender,
+                                        COALESCE(SUM(g.count), 0) AS count,
+                                        GROUPING(g.group_code, g.year_level, g.gender) AS grouping_set
+                                    FROM (
+                                        SELECT COALESCE(p.program_code, d.program_code) AS group_code, d.year_level, d.gender, d.count
+                                        FROM programs p
+                                        FULL JOIN student_demographics d ON d.program_code = p.program_code
+                                    ) g
+                                    GROUP BY GROUPING SETS ((), (g.year_level), (g.gender),
+                                                            (g.group_code), (g.group_code, g.year_level), (g.group_code, g.gender))"""
+
+    GET_STATISTICS_BY_COLLEGE = """SELECT g.group_code,
+                                        g.year_level,
+                                        g.gender,
+                                        COALESCE(SUM(g.count), 0) AS count,
+                                        GROUPING(g.group_code, g.year_level, g.gender) AS grouping_set
+                                    FROM (
+                                        SELECT c.college_code AS group_code, d.year_level, d.gender, d.count
+                                        FROM colleges c
+                                        FULL JOIN (
+                                            student_demographics d
+                                            LEFT JOIN programs p ON p.program_code = d.program_code
+                                        ) ON p.college_code = c.college_code
+                                    ) g
+                                    GROUP BY GROUPING SETS ((), (g.year_level), (g.gender),
+                                                            (g.group_code), (g.group_code, g.year_level), (g.group_code, g.gender))"""
+
+    REBUILD_DEMOGRAPHICS = """INSERT INTO student_demographics (program_code, year_level, gender, count)
+                                SELECT program_code, year_level, gender, COUNT(*)
+                                FROM students
+                                GROUP BY program_code, year_level, gender"""
+
+    # Groups whose rollup count differs from the live count, a missing row on either side counting as 0
+    CHECK_DEMOGRAPHICS = """SELECT COALESCE(live.program_code, d.program_code) AS program_code,
+                                COALESCE(live.year_level, d.year_level) AS year_level,
+                                COALESCE(live.gender, d.gender) AS gender,
+                                COALESCE(live.count, 0) AS live_count,
+                                COALESCE(d.count, 0) AS rollup_count
+                            FROM (
+                                SELECT program_code, year_level, gender, COUNT(*) AS count
+                                FROM students
+                                GROUP BY program_code, year_level, gender
+                            ) live
+                            FULL OUTER JOIN student_demographics d
+                                ON COALESCE(d.program_code, '') = COALESCE(live.program_code, '')
+                                AND d.year_level = live.year_level
+                                AND d.gender = live.gender
+                            WHERE COALESCE(live.count, 0) <> COALESCE(d.count, 0)
+                            ORDER BY 1, 2, 3"""
         
     GET_TOTAL_COUNT_FROM_PROGRAM_CODE = "SELECT COUNT(*) FROM students WHERE program_code = %s"
 
@@ -0,0 +1,6 @@
+
+
+class TableVersionQueries:
+
+    # Counters are bumped by the trg_<table>_version triggers in db/init.sql
+    GET_VERSIONS = "SELECT table_name, version FROM table_versions WHERE table_name = ANY(%s)"
@@ -0,0 +1,120 @@
+from app.db.queries.common import CommonQueries
+from app.exceptions.custom_exceptions import InvalidParameterError
+
+from psycopg import sql
+
+from dataclasses import dataclass
+from typing import Mapping
+
+# Fragments without identifiers, shared by every query built here
+EMPTY = sql.SQL("")
+ASCENDING = (sql.SQL("ASC"), sql.SQL(">"))
+DESCENDING = (sql.SQL("DESC"), sql.SQL("<"))
+
+@dataclass(frozen=True)
+class EntityColumns:
+    """
+    The table of an entity and the columns its list, count and export queries can search and sort by.
+
+    Only the columns listed here are ever put into those queries, and always as a quoted sql.Identifier,
+    so a search or sort field coming from a request can select a column but never inject SQL.
+
+    Attributes:
+        table (str): The table of the entity.
+        pk (str): The primary key column, also used to break ties in every sort.
+        columns (Mapping[str, sql.Composable | None]): The columns, mapped to the expression the search
+            indexes in db/init.sql are built on. Enum columns map to None, since they are searched by
+            equality on the matching labels instead.
+        nullable (frozenset[str]): The columns that can be NULL.
+    """
+
+    table: str
+    pk: str
+    columns: Mapping[str, sql.Composable | None]
+    nullable: frozenset[str] = frozenset()
+
+    def column(self, field: str) -> str:
+        """
+        Resolve a field as sent by the client, e.g. "ID Number", to its column.
+
+        Raises:
+            InvalidParameterError: If the field is not one of the columns of the entity.
+        """
+
+        column = field.lower().replace(' ', '_')
+
+        if column not in self.columns:
+            raise InvalidParameterError(f"Cannot search or sort '{self.table}' by '{field}'.")
+
+        return column
+
+    def sort_key(self, column: str) -> sql.Composable:
+        """Return the keyset sort key of a column, coalesced to '' if it is nullable so the seek predicate never compares NULL."""
+
+        if column in self.nullable:
+            return sql.SQL("COALESCE({}, '')").format(sql.Identifier(column))
+
+        return sql.Identifier(column)
+
+ENTITY_COLUMNS = {
+    "students": EntityColumns(
+        table="students",
+        pk="id_number",
+        columns={
+            "id_number": sql.SQL("{}::text").format(sql.Identifier("id_number")),
+            "first_name": sql.Identifier("first_name"),
+            "last_name": sql.Identifier("last_name"),
+            "program_code": sql.Identifier("program_code"),
+            "year_level": None,
+            "gender": None,
+        },
+        nullable=frozenset({"program_code"}),
+    ),
+    "programs": EntityColumns(
+        table="programs",
+        pk="program_code",
+        columns={
+            "program_code": sql.Identifier("program_code"),
+            "program_name": sql.Identifier("program_name"),
+            "college_code": sql.Identifier("college_code"),
+        },
+        nullable=frozenset({"college_code"}),
+    ),
+    "colleges": EntityColumns(
+        table="colleges",
+        pk="college_code",
+        columns={
+            "college_code": sql.Identifier("college_code"),
+            "college_name": sql.Identifier("college_name"),
+        },
+    ),
+}
+
+def build_sort_order(sort_order: str) -> tuple[sql.SQL, sql.SQL]:
+    """
+    Return the SQL direction of a sort order, and the comparator that seeks past a keyset cursor in it.
+
+    Args:
+        sort_order (str): "Ascending", or anything else for a descending sort.
+    """
+
+    if sort_order == "Ascending":
+        return ASCENDING
+
+    return DESCENDING
+
+def build_where_clause(conditions: list[sql.Composable]) -> sql.Composable:
+    """Join the conditions into a WHERE clause, or an empty fragment if there are none."""
+
+    if not conditions:
+        return EMPTY
+
+    return sql.SQL("WHERE {}").format(sql.SQL(" AND ").join(conditions))
+
+def build_total_count_column(table: str, estimate_count: bool) -> sql.Composable:
+    """Return the {count_column} of CommonQueries.GET_MANY that adds the exact or estimated total count to every row."""
+
+    if estimate_count:
+        return sql.SQL(CommonQueries.ESTIMATED_TOTAL_COUNT_COLUMN).format(table=sql.Literal(table))
+
+    return sql.SQL(CommonQueries.WINDOW_TOTAL_COUNT_COLUMN)
@@ -0,0 +1,162 @@
+from psycopg import sql
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Iterable, Iterator
+from weakref import WeakKeyDictionary
+
+class QueryRegistry:
+    """
+    Builds the SQL of the CommonQueries templates once per variant and keeps it as a psycopg sql.Composed.
+
+    A variant is a template together with the parts filled into it (table, columns, where clause, sort), so
+    the list, count and detail queries are each built once, usually when the app starts, and then reused
+    by every request. Their values are always passed as query parameters, which lets the same statement
+    be prepared once per connection and executed with prepare=True from then on.
+
+    Parts given as str are names and are always quoted as a sql.Identifier, only parts already composed
+    with psycopg.sql (e.g. by app.db.query_builder) are put into the query as they are.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        Args:
+            max_size (int): The number of variants kept. Variants past it are built on every call instead.
+        """
+
+        self.max_size = max_size
+
+        self._queries: dict[tuple, sql.Composed] = {}
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template: str, **parts: str | sql.Composable) -> sql.Composed:
+        """
+        Return the query built from a template and its parts, building it on first use.
+
+        Args:
+            template (str): A CommonQueries template, e.g. CommonQueries.GET_BY_ID.
+            **parts (str | sql.Composable): What is filled into the template's {placeholders}, either the
+                name of a table or column, or a fragment composed with psycopg.sql.
+
+        Returns:
+            sql.Composed: The query, the same object for every call with the same template and parts.
+        """
+
+        key = (template, *sorted((name, _part_key(part)) for name, part in parts.items()))
+
+        with self._lock:
+            query = self._queries.get(key)
+
+            if query is not None:
+                self.hits += 1
+                return query
+
+            self.misses += 1
+
+        query = sql.SQL(template).format(**{name: sql.Identifier(part) if isinstance(part, str) else part
+                                            for name, part in parts.items()})
+
+        with self._lock:
+            if len(self._queries) < self.max_size:
+                query = self._queries.setdefault(key, query)
+
+        return query
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the number of variants built and how often a request found its query already built."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "size": len(self._queries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def _part_key(part: str | sql.Composable) -> tuple[str, str]:
+    """Return a hashable key for a part of a QueryRegistry variant, since psycopg.sql objects are not hashable."""
+
+    if isinstance(part, str):
+        return "identifier", part
+
+    return "sql", part.as_string(None)
+
+class PreparedStatementStats:
+    """
+    Counts how often a statement executed with prepare=True was already prepared on its connection.
+
+    psycopg keeps the prepared statements of each connection in an LRU of prepared_max entries and does
+    not report on it, so the same LRU is mirrored here per connection, keyed by the registry's query objects.
+    """
+
+    def __init__(self) -> None:
+        self._statements: WeakKeyDictionary[Any, OrderedDict[int, None]] = WeakKeyDictionary()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, conn: Any, query: sql.Composable) -> None:
+        """Record the prepared execution of a query on a connection."""
+
+        key = id(query)
+
+        with self._lock:
+            statements = self._statements.setdefault(conn, OrderedDict())
+
+            if key in statements:
+                statements.move_to_end(key)
+                self.hits += 1
+                return
+
+            self.misses += 1
+            statements[key] = None
+
+            if conn.prepared_max is not None and len(statements) > conn.prepared_max:
+                statements.popitem(last=False)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the prepared statement reuse counters."""
+
+        with self._lock:
+            executions = self.hits + self.misses
+
+            return {
+                "connections": len(self._statements),
+                "statements": sum(len(statements) for statements in self._statements.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / executions, 4) if executions else 0.0,
+            }
+
+def iter_unfiltered_list_params(sort_columns: Iterable[str], **params: Any) -> Iterator[dict[str, Any]]:
+    """
+    Yield the params of the first page of an unsearched list for every sort column and order.
+
+    The repositories build their list queries from these when the app starts, so the variants almost
+    every request uses are already in the QueryRegistry.
+
+    Args:
+        sort_columns (Iterable[str]): The columns the list can be sorted by.
+        **params: Other params the list query builders of the repository expect, e.g. its filters.
+    """
+
+    for sort_column in sort_columns:
+        for sort_order in ("Ascending", "Descending"):
+            yield {
+                "search_value": "",
+                "search_by": None,
+                "search_type": None,
+                "sort_field": sort_column.replace("_", " "),
+                "sort_order": sort_order,
+                "page_number": 1,
+                "rows_per_page": 10,
+                "cursor": None,
+                **params,
+            }
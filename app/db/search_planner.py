@@ -0,0 +1,83 @@
+from app.db.query_builder import ENTITY_COLUMNS
+from app.exceptions.custom_exceptions import InvalidParameterError
+from app.utils.entity_validators import ALLOWED_GENDERS, ALLOWED_YEAR_LEVELS
+
+from psycopg import sql
+
+# Enum columns with their Postgres type and allowed labels
+ENUM_COLUMNS = {
+    "year_level": ("year_level_enum", ALLOWED_YEAR_LEVELS),
+    "gender": ("gender_enum", ALLOWED_GENDERS),
+}
+
+def build_search_conditions(table: str, params) -> tuple[list[sql.Composable], list]:
+    """
+    Build the WHERE conditions for a search so that it can be answered by an index.
+
+    "Starts With" compares lower(column) with LIKE, which is served by the text_pattern_ops btree indexes.
+    "Contains" and "Ends With" use ILIKE, which is served by the pg_trgm GIN indexes. Enum columns resolve
+    the search to the matching labels in Python and compare by equality. A blank search value emits no
+    condition at all instead of a no-op ILIKE '%' predicate.
+
+    Args:
+        table (str): The table being searched.
+        params (dict): A dictionary with the "search_value", "search_by" and "search_type" keys.
+
+    Returns:
+        tuple[list[sql.Composable], list]: The conditions to AND together, and their parameter values.
+
+    Raises:
+        InvalidParameterError: If the table cannot be searched by the "search_by" column.
+    """
+
+    search_value = params.get("search_value")
+
+    if not search_value:
+        return [], []
+
+    entity = ENTITY_COLUMNS[table]
+    column = entity.column(params["search_by"])
+    search_type = params["search_type"]
+
+    if column in ENUM_COLUMNS:
+        enum_type, labels = ENUM_COLUMNS[column]
+        lowered_value = search_value.lower()
+
+        if search_type == "Starts With":
+            matching_labels = [label for label in labels if label.lower().startswith(lowered_value)]
+        elif search_type == "Ends With":
+            matching_labels = [label for label in labels if label.lower().endswith(lowered_value)]
+        elif search_type == "Contains":
+            matching_labels = [label for label in labels if lowered_value in label.lower()]
+        else:
+            matching_labels = [label for label in labels if label.lower() == lowered_value]
+
+        return [sql.SQL("{} = ANY(%s::{}[])").format(sql.Identifier(column), sql.Identifier(enum_type))], [sorted(matching_labels)]
+
+    expression = entity.columns[column]
+
+    if search_type == "Starts With":
+        return [sql.SQL("lower({}) LIKE %s").format(expression)], [f"{search_value.lower()}%"]
+    elif search_type == "Ends With":
+        return [sql.SQL("{} ILIKE %s").format(expression)], [f"%{search_value}"]
+    elif search_type == "Contains":
+        return [sql.SQL("{} ILIKE %s").format(expression)], [f"%{search_value}%"]
+
+    return [sql.SQL("{} ILIKE %s").format(expression)], [search_value]
+
+def build_enum_filter_condition(column: str, value: str) -> tuple[sql.Composable, str]:
+    """
+    Build an equality condition on an enum column for a filter value such as "Male" or "1st".
+
+    Raises:
+        InvalidParameterError: If the value is not one of the labels of the enum.
+    """
+
+    enum_type, labels = ENUM_COLUMNS[column]
+
+    label = value.strip().lower() if column == "gender" else value.strip()
+
+    if label not in labels:
+        raise InvalidParameterError(f"Invalid '{column}' filter value: '{value}'. Must be one of: {sorted(labels)}.")
+
+    return sql.SQL("{} = %s::{}").format(sql.Identifier(column), sql.Identifier(enum_type)), label
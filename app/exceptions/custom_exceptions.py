@@ -8,4 +8,15 @@ class EntityNotFoundError(Exception):
 
 class InvalidParameterError(ValidationError):
     """Raised when a query parameter has an invalid or disallowed value."""
-    pass
\ No newline at end of file
+    pass
+
+class PartialDeleteError(Exception):
+    """Raised by an avatar storage when a bulk delete fails part way, with the avatars that are left to delete."""
+
+    def __init__(self, message: str, avatar_urls: list[str]) -> None:
+        super().__init__(message)
+        self.avatar_urls = avatar_urls
+
+class PermanentJobError(Exception):
+    """Raised by a background job handler when retrying the job cannot succeed, e.g. because its input is invalid."""
+    pass
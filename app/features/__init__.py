@@ -2,3 +2,6 @@ from .students.routes import student_bp
 from .programs.routes import program_bp
 from .colleges.routes import college_bp
 from .users.routes import user_bp
+from .jobs.routes import job_bp
+from .database.routes import database_bp
+from .metrics.routes import metrics_bp
@@ -1,5 +1,4 @@
-from flask import request, jsonify, Response
-from dataclasses import asdict
+from flask import request, jsonify, Response, stream_with_context
 
 import traceback
 
@@ -7,12 +6,14 @@ from .services import CollegeServices
 
 from ..common.dataclasses import College
 
-from app.utils import dict_keys_to_camel, validate_college_name, validate_college_code
+from app.utils import EntitySerializer, decode_cursor, validate_college_name, validate_college_code, EXPORT_FORMATS
 
 from app.exceptions.custom_exceptions import EntityNotFoundError, InvalidParameterError, ValidationError
 
 from psycopg.errors import UniqueViolation
 
+COLLEGE_SERIALIZER = EntitySerializer(College)
+
 class CollegeController:
     
     @staticmethod
@@ -24,7 +25,7 @@ class CollegeController:
 
             college_details: College = CollegeServices.get_college_details_service(college_code.strip().upper())
 
-            return jsonify(dict_keys_to_camel(asdict(college_details))), 200
+            return jsonify(COLLEGE_SERIALIZER.serialize(college_details)), 200
         
         except EntityNotFoundError as e:
             traceback.print_exc()
@@ -43,7 +44,7 @@ class CollegeController:
             return jsonify({"error": "An unexpected error occurred."}), 500
     
     @staticmethod
-    def get_total_college_count_controller() -> tuple[Response, int]:
+    async def get_total_college_count_controller() -> tuple[Response, int]:
         """Retrieve the total number of colleges based on optional search filters."""
 
         ALLOWED_SEARCH_BY = {"College Code", "College Name"}
@@ -62,7 +63,7 @@ class CollegeController:
             if params["search_type"] and params["search_type"] not in ALLOWED_SEARCH_TYPE:
                 raise InvalidParameterError(f"Invalid 'searchType' value: '{params["search_type"]}'. Must be one of: ['Starts With', 'Contains', 'Ends With'].")
 
-            total_college_count = CollegeServices.get_total_college_count_service(params)
+            total_college_count = await CollegeServices.get_total_college_count_service(params)
 
             return jsonify({"totalCount": total_college_count}), 200
         
@@ -75,7 +76,7 @@ class CollegeController:
             return jsonify({"error": "An unexpected error occurred."}), 500
 
     @staticmethod
-    def get_many_colleges_controller() -> tuple[Response, int]:
+    async def get_many_colleges_controller() -> tuple[Response, int]:
         "Retrieve details of different colleges based on pagination, optional search and sort filters."
 
         ALLOWED_SEARCH_BY = {"College Code", "College Name"}
@@ -91,7 +92,10 @@ class CollegeController:
                 "search_by": request.args.get("searchBy"),
                 "search_type": request.args.get("searchType"),
                 "sort_field": request.args.get("sortField"),
-                "sort_order":request.args.get("sortOrder")
+                "sort_order":request.args.get("sortOrder"),
+                "cursor": request.args.get("cursor"),
+                "include_total_count": request.args.get("includeTotalCount", "false").lower() == "true",
+                "estimate_count": request.args.get("estimateCount", "false").lower() == "true"
             }
 
             if params['rows_per_page'] < 0:
@@ -112,9 +116,25 @@ class CollegeController:
             if params["sort_order"] not in ALLOWED_SORT_ORDER:
                 raise InvalidParameterError(f"Invalid 'sortOrder' value: '{params["sort_order"]}'. Must be one of: ['Ascending', 'Descending'].")
 
-            colleges = CollegeServices.get_many_colleges_service(params)
+            if params["include_total_count"] and params["cursor"] is not None:
+                raise InvalidParameterError("'includeTotalCount' cannot be combined with 'cursor'.")
+
+            if params["include_total_count"]:
+                colleges, total_count = await CollegeServices.get_many_colleges_with_count_service(params)
+
+                return jsonify({"entities": COLLEGE_SERIALIZER.serialize_many(colleges), "totalCount": total_count}), 200
+
+            # Keyset pagination is opt-in, an empty cursor requests the first page
+            if params["cursor"] is not None:
+                params["cursor"] = decode_cursor(params["cursor"], params["sort_field"], params["sort_order"])
+
+                colleges, next_cursor = await CollegeServices.get_many_colleges_by_cursor_service(params)
+
+                return jsonify({"entities": COLLEGE_SERIALIZER.serialize_many(colleges), "nextCursor": next_cursor}), 200
 
-            return jsonify({"entities": [dict_keys_to_camel(asdict(college_details)) for college_details in colleges]}), 200
+            colleges = await CollegeServices.get_many_colleges_service(params)
+
+            return jsonify({"entities": COLLEGE_SERIALIZER.serialize_many(colleges)}), 200
         
         except InvalidParameterError as e:
             traceback.print_exc()
@@ -286,4 +306,53 @@ class CollegeController:
         except Exception as e:
             traceback.print_exc()
             return jsonify({"error": str(e)}), 500
-        
\ No newline at end of file
+
+    @staticmethod
+    def export_colleges_controller() -> tuple[Response, int]:
+        """Stream every college matching optional search and sort filters as a CSV or NDJSON file."""
+
+        ALLOWED_SEARCH_BY = {"College Code", "College Name"}
+        ALLOWED_SEARCH_TYPE = {"Starts With", "Contains", "Ends With"}
+        ALLOWED_SORT_FIELD = {"College Code", "College Name"}
+        ALLOWED_SORT_ORDER = {"Ascending", "Descending"}
+
+        try:
+            params = {
+                "search_value": (request.args.get("searchValue") or "").strip(),
+                "search_by": request.args.get("searchBy"),
+                "search_type": request.args.get("searchType"),
+                "sort_field": request.args.get("sortField", "College Code"),
+                "sort_order": request.args.get("sortOrder", "Ascending"),
+            }
+
+            export_format = request.args.get("format", "csv").lower()
+
+            if export_format not in EXPORT_FORMATS:
+                raise InvalidParameterError(f"Invalid 'format' value: '{export_format}'. Must be one of: ['csv', 'ndjson'].")
+
+            # searchBy and searchType only matter when there is something to search for
+            if params["search_value"] and params['search_by'] not in ALLOWED_SEARCH_BY:
+                raise InvalidParameterError(f"Invalid 'searchBy' value: '{params['search_by']}'. Must be one of: ['College Code', 'College Name'].")
+
+            if params["search_value"] and params["search_type"] not in ALLOWED_SEARCH_TYPE:
+                raise InvalidParameterError(f"Invalid 'searchType' value: '{params["search_type"]}'. Must be one of: ['Starts With', 'Contains', 'Ends With'].")
+            
+            if params['sort_field'] not in ALLOWED_SORT_FIELD:
+                raise InvalidParameterError(f"Invalid 'sortField' value: '{params['sort_field']}'. Must be one of: ['College Code', 'College Name'].")
+
+            if params["sort_order"] not in ALLOWED_SORT_ORDER:
+                raise InvalidParameterError(f"Invalid 'sortOrder' value: '{params["sort_order"]}'. Must be one of: ['Ascending', 'Descending'].")
+
+            chunks = CollegeServices.export_colleges_service(params, export_format)
+
+            return Response(stream_with_context(chunks), 
+                            mimetype=EXPORT_FORMATS[export_format], 
+                            headers={"Content-Disposition": f"attachment; filename=colleges.{export_format}"}), 200
+
+        except InvalidParameterError as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 400
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred."}), 500
@@ -1,13 +1,30 @@
 from app.db.connection import Database
 from app.db.queries.colleges import CollegeQueries
 from app.db.queries.common import CommonQueries
+from app.db.query_builder import ENTITY_COLUMNS, EMPTY, build_sort_order, build_total_count_column, build_where_clause
+from app.db.query_registry import iter_unfiltered_list_params
+from app.db.row_factories import entity_row
+from app.db.search_planner import build_search_conditions
+
+from app.features.common.dataclasses import College
 
 from flask import current_app
+from psycopg import sql
+from psycopg.abc import Query
+from psycopg.rows import RowFactory
+
+from typing import Iterator
+
+# Colleges are listed as they are stored, so the details and the list pages share a row factory
+COLLEGE_ROW = entity_row(College)
+COLLEGE_WITH_COUNT_ROW = entity_row(College, extra_columns=("total_count",))
+
+COLLEGE_COLUMNS = ENTITY_COLUMNS["colleges"]
 
 class CollegeRepository:
 
     @staticmethod
-    def get_college_by_college_code(college_code: str) -> dict[str, str] | None:
+    def get_college_by_college_code(college_code: str) -> College | None:
         """
         Retrieve a college record from the database by college code.
 
@@ -15,12 +32,37 @@ class CollegeRepository:
             college_code (str): The unique college code of the college.
 
         Returns:
-            dict: A dictionary containing the college's details if found, otherwise None.
+            College | None: The college if found, otherwise None.
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
+
+        return db.fetch_one(queries.get(CommonQueries.GET_BY_ID, table="colleges", pk="college_code"), (college_code, ), COLLEGE_ROW, prepare=True)
+
+    @staticmethod
+    async def get_college_by_college_code_async(college_code: str) -> College | None:
+        """Async variant of get_college_by_college_code."""
+
+        async_db = current_app.extensions['async_db']
+        queries = current_app.extensions['query_registry']
+
+        return await async_db.fetch_one(queries.get(CommonQueries.GET_BY_ID, table="colleges", pk="college_code"), (college_code, ), COLLEGE_ROW, prepare=True)
+
+    @staticmethod
+    def _build_total_college_count_query(params) -> tuple[Query, tuple | None]:
+        """Build the query and its parameters used by get_total_college_count and its async variant."""
 
-        return db.fetch_one(CommonQueries.GET_BY_ID.format(table="colleges", pk="college_code"), (college_code, ))
+        queries = current_app.extensions['query_registry']
+
+        if params["search_value"]:
+            conditions, values = build_search_conditions("colleges", params)
+
+            return (queries.get(CommonQueries.GET_TOTAL_COUNT_WHERE, table="colleges", where_clause=build_where_clause(conditions)),
+                    tuple(values))
+        
+        else:
+            return queries.get(CommonQueries.GET_TOTAL_COUNT, table="colleges"), None
 
     @staticmethod
     def get_total_college_count(params) -> dict[str, int]:
@@ -40,25 +82,50 @@ class CollegeRepository:
 
         db = current_app.extensions['db']
 
-        if params["search_value"]:
+        return db.fetch_one(*CollegeRepository._build_total_college_count_query(params), prepare=True)
 
-            if params["search_type"] == "Starts With":
-                search_pattern = f"{params["search_value"]}%"
-            elif params["search_type"] == "Ends With":
-                search_pattern = f"%{params["search_value"]}"
-            elif params["search_type"] == "Contains":
-                search_pattern = f"%{params["search_value"]}%"
-            else:
-                search_pattern = params["search_value"]
-
-            return db.fetch_one(CommonQueries.GET_TOTAL_COUNT_WITH_SEARCH.format(table="colleges", search_by=f"{params["search_by"].lower().replace(' ', '_')}"),
-                                (search_pattern,))
-        
-        else:
-            return db.fetch_one(CommonQueries.GET_TOTAL_COUNT.format(table="colleges"))
+    @staticmethod
+    async def get_total_college_count_async(params) -> dict[str, int]:
+        """Async variant of get_total_college_count."""
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_one(*CollegeRepository._build_total_college_count_query(params), prepare=True)
 
     @staticmethod
-    def get_many_colleges(params) -> list[dict[str, str]]:
+    def _build_many_colleges_query(params, count_column: sql.Composable = EMPTY) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by get_many_colleges and its async variant."""
+
+        queries = current_app.extensions['query_registry']
+
+        conditions, values = build_search_conditions("colleges", params)
+        sort_order, _ = build_sort_order(params["sort_order"])
+
+        offset = 0 if params["page_number"] <= 0 else (params["page_number"] - 1) * params["rows_per_page"]
+
+        return (queries.get(CommonQueries.GET_MANY,
+                            table="colleges",
+                            count_column=count_column,
+                            where_clause=build_where_clause(conditions),
+                            sort_field=COLLEGE_COLUMNS.column(params["sort_field"]),
+                            sort_order=sort_order),
+                (*values, params["rows_per_page"], offset))
+
+    @staticmethod
+    def warm_up_queries() -> None:
+        """Build the count query and the first-page list queries of every sort into the QueryRegistry."""
+
+        for params in iter_unfiltered_list_params(COLLEGE_COLUMNS.columns):
+            CollegeRepository._build_many_colleges_query(params)
+            CollegeRepository._build_many_colleges_keyset_query(params)
+
+            for estimate_count in (False, True):
+                CollegeRepository._build_many_colleges_query(params, CollegeRepository._get_total_count_column(estimate_count))
+
+        CollegeRepository._build_total_college_count_query(params)
+
+    @staticmethod
+    def get_many_colleges(params) -> list[College]:
         """
         Retrieve a paginated list of colleges based on search and sorting parameters.
 
@@ -73,34 +140,94 @@ class CollegeRepository:
                 - "rows_per_page" (int): Number of records to retrieve per page.
 
         Returns:
-            list[dict]: A list of college records matching the given filters, 
-            where each record is represented as a dictionary.
+            list[College]: The colleges matching the given filters.
         """
 
         db = current_app.extensions['db']
 
-        if params["search_type"] == "Starts With":
-            search_pattern = f"{params["search_value"]}%"
-        elif params["search_type"] == "Ends With":
-            search_pattern = f"%{params["search_value"]}"
-        elif params["search_type"] == "Contains":
-            search_pattern = f"%{params["search_value"]}%"
-        else:
-            search_pattern = params["search_value"]
+        return db.fetch_all(*CollegeRepository._build_many_colleges_query(params), COLLEGE_ROW, prepare=True)
 
-        if params["sort_order"] == "Ascending":
-            sort_order = "ASC"
-        else:
-            sort_order = "DESC"
+    @staticmethod
+    async def get_many_colleges_async(params) -> list[College]:
+        """Async variant of get_many_colleges."""
 
-        offset = 0 if params["page_number"] <= 0 else (params["page_number"] - 1) * params["rows_per_page"]
+        async_db = current_app.extensions['async_db']
 
-        return db.fetch_all(CommonQueries.GET_MANY
-                            .format(table="colleges", 
-                                    search_by=f"{params["search_by"].lower().replace(' ', '_')}",
-                                    sort_field=f"{params["sort_field"].lower().replace(' ', '_')}",
-                                    sort_order=sort_order),
-                            (search_pattern, params["rows_per_page"], offset))
+        return await async_db.fetch_all(*CollegeRepository._build_many_colleges_query(params), COLLEGE_ROW, prepare=True)
+
+    @staticmethod
+    async def get_many_colleges_with_count_async(params, estimate_count: bool = False) -> list[tuple[College, int | None]]:
+        """
+        Retrieve a paginated list of colleges like get_many_colleges, along with the total number of matching colleges.
+
+        Args:
+            params (dict): The same keys as get_many_colleges.
+            estimate_count (bool): Use the planner's row estimate for the table instead of an exact count. 
+            Only accurate when no search or filter is applied.
+
+        Returns:
+            list[tuple[College, int | None]]: The colleges of the page, each paired with the total count. With estimate_count, 
+            the total count is None when the table has never been analyzed.
+        """
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*CollegeRepository._build_many_colleges_query(params, CollegeRepository._get_total_count_column(estimate_count)), COLLEGE_WITH_COUNT_ROW, prepare=True)
+
+    @staticmethod
+    def _get_total_count_column(estimate_count: bool) -> sql.Composable:
+        """Return the extra column that adds the exact or estimated total count to every row of a page."""
+
+        return build_total_count_column("colleges", estimate_count)
+
+    @staticmethod
+    def _build_many_colleges_keyset_query(params) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by get_many_colleges_by_cursor_async."""
+
+        queries = current_app.extensions['query_registry']
+
+        conditions, values = build_search_conditions("colleges", params)
+        sort_order, comparator = build_sort_order(params["sort_order"])
+
+        sort_key = COLLEGE_COLUMNS.sort_key(COLLEGE_COLUMNS.column(params["sort_field"]))
+
+        if params["cursor"]:
+            conditions.append(sql.SQL(CommonQueries.KEYSET_SEEK).format(sort_key=sort_key, pk=sql.Identifier("college_code"), comparator=comparator))
+            values.extend(params["cursor"])
+
+        # Fetch one extra row to find out whether a next page exists
+        return (queries.get(CommonQueries.GET_MANY_KEYSET,
+                            table="colleges",
+                            where_clause=build_where_clause(conditions),
+                            sort_key=sort_key,
+                            pk="college_code",
+                            sort_order=sort_order),
+                (*values, params["rows_per_page"] + 1))
+
+    @staticmethod
+    def _get_keyset_row_factory(params) -> RowFactory:
+        """Return the row factory of a keyset page, which pairs each college with the raw value of its sort column for the next cursor."""
+
+        return entity_row(College, extra_columns=(COLLEGE_COLUMNS.column(params["sort_field"]),))
+
+    @staticmethod
+    async def get_many_colleges_by_cursor_async(params) -> list[tuple[College, str | None]]:
+        """
+        Retrieve a page of colleges using keyset (cursor) pagination instead of OFFSET.
+
+        Args:
+            params (dict): The same keys as get_many_colleges, except "page_number" which is replaced by:
+                - "cursor" (list | None): The [sort_value, college_code] pair of the last row of the previous page, 
+                or None for the first page.
+
+        Returns:
+            list[tuple[College, str | None]]: Up to "rows_per_page" + 1 colleges, each paired with the raw value of its sort column. 
+            The extra college is only present when there is a next page.
+        """
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*CollegeRepository._build_many_colleges_keyset_query(params), CollegeRepository._get_keyset_row_factory(params), prepare=True)
 
     @staticmethod
     def create_college(college_data) -> None:
@@ -162,4 +289,37 @@ class CollegeRepository:
 
         db = current_app.extensions['db']
 
-        return db.fetch_all(CommonQueries.GET_ALL_IDS.format(columns="college_code", table="colleges", order_column="college_code"))   
+        return db.fetch_all(CommonQueries.GET_ALL_IDS.format(columns="college_code", table="colleges", order_column="college_code"))
+
+    @staticmethod
+    def _build_colleges_export_query(params) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by stream_colleges."""
+
+        conditions, values = build_search_conditions("colleges", params)
+        sort_order, _ = build_sort_order(params["sort_order"])
+
+        return (sql.SQL(CommonQueries.GET_ALL_SORTED)
+                .format(table=sql.Identifier("colleges"),
+                        where_clause=build_where_clause(conditions),
+                        sort_field=sql.Identifier(COLLEGE_COLUMNS.column(params["sort_field"])),
+                        pk=sql.Identifier("college_code"),
+                        sort_order=sort_order),
+                tuple(values))
+
+    @staticmethod
+    def stream_colleges(params) -> Iterator[dict[str, str]]:
+        """
+        Lazily retrieve every college matching the search filters, in sort order, through a server-side cursor.
+
+        The query is built right away, so invalid parameters raise here rather than part way through the stream.
+
+        Args:
+            params (dict): The same search and sort keys as get_many_colleges, without the pagination keys.
+
+        Returns:
+            Iterator[dict]: The matching college rows.
+        """
+
+        db = current_app.extensions['db']
+
+        return db.stream(*CollegeRepository._build_colleges_export_query(params))
@@ -3,6 +3,8 @@ from .controllers import CollegeController
 
 from flask_jwt_extended import jwt_required
 
+from app.utils import etag_from_table_versions
+
 college_bp = Blueprint("college_bp", __name__)
 
 @college_bp.route("/<string:college_code>", methods=["GET"])
@@ -38,7 +40,7 @@ def get_college_details(college_code: str) -> tuple[Response, int]:
 
 @college_bp.route("/total-count", methods=["GET"])
 @jwt_required()
-def get_total_college_count() -> tuple[Response, int]:
+async def get_total_college_count() -> tuple[Response, int]:
     """
     Retrieve the total number of colleges based on optional search filters.
 
@@ -64,15 +66,16 @@ def get_total_college_count() -> tuple[Response, int]:
 
         500 if an unexpected error occurs during processing.
     """
-    return CollegeController.get_total_college_count_controller()
+    return await CollegeController.get_total_college_count_controller()
 
 @college_bp.route("/", methods=["GET"])
 @jwt_required()
-def get_many_colleges() -> tuple[Response, int]:
+@etag_from_table_versions("colleges")
+async def get_many_colleges() -> tuple[Response, int]:
     """
     Retrieve details of different colleges based on pagination, optional search and sort filters.
 
-    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns the details of different colleges, filtered by pagination and optionally by search and sort. 
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns the details of different colleges, filtered by pagination and optionally by search and sort. The response carries an ETag, and a request whose If-None-Match matches it gets a 304 without the query being run.
 
     Query parameters:
 
@@ -90,6 +93,12 @@ def get_many_colleges() -> tuple[Response, int]:
 
         sortOrder: The order of sort to perform, such as "Ascending", and "Descending".
 
+        cursor: Opts into keyset pagination when present, replacing pageNumber (optional). Pass an empty value for the first page, then the nextCursor of the previous response.
+
+        includeTotalCount: If "true", totalCount is returned along with the page in a single query (optional, cannot be combined with cursor).
+
+        estimateCount: If "true" together with includeTotalCount, totalCount comes from planner statistics when no search or filter is applied (optional).
+
     Request body:
 
         None. This endpoint does not require any input data.
@@ -102,12 +111,57 @@ def get_many_colleges() -> tuple[Response, int]:
 
             collegeCode: The unique code assigned to the college.
 
+        nextCursor: The cursor of the next page, or null on the last page. Only included when cursor is provided.
+
+        totalCount: The total number of matching records. Only included when includeTotalCount is "true".
+
     Possible errors:
 
+        400 if cursor is malformed or was issued for a different sortField or sortOrder.
+
+        400 if both cursor and includeTotalCount are provided.
+
         500 if an unexpected error occurs during processing.
     """
 
-    return CollegeController.get_many_colleges_controller()
+    return await CollegeController.get_many_colleges_controller()
+
+@college_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_colleges() -> tuple[Response, int]:
+    """
+    Export every college matching optional search and sort filters.
+
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). Rows are read through a 
+    server-side cursor and streamed to the client as they are fetched, so the whole table is never held in memory.
+
+    Query parameters:
+
+        format: "csv" (default) or "ndjson".
+
+        searchValue: The value to search for (optional).
+
+        searchBy: The field to search by, required with searchValue. One of ['College Code', 'College Name'].
+
+        searchType: "Starts With", "Contains" or "Ends With", required with searchValue.
+
+        sortField: The field to sort by (default: "College Code").
+
+        sortOrder: "Ascending" (default) or "Descending".
+
+    Response:
+
+        A file download. CSV exports start with a header row of camelCase column names, which the import accepts 
+        as is. NDJSON exports contain one JSON object per line.
+
+    Possible errors:
+
+        400 if a query parameter is invalid.
+
+        500 if an unexpected error occurs before the export starts.
+    """
+
+    return CollegeController.export_colleges_controller()
 
 @college_bp.route("/", methods=["POST"])
 @jwt_required()
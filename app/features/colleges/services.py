@@ -1,10 +1,17 @@
+from flask import current_app
+
 from .repository import CollegeRepository
 
 from app.features.common.dataclasses import College
 
+from app.utils import encode_cursor, stream_export
+
 from app.exceptions.custom_exceptions import EntityNotFoundError
 
-from typing import Any
+from typing import Iterator
+
+# Columns of the college export, in order
+COLLEGE_EXPORT_COLUMNS = ("college_code", "college_name")
 
 class CollegeServices:
 
@@ -20,15 +27,26 @@ class CollegeServices:
             College: A College dataclass instance if a college has the given college_code, otherwise None.
         """
 
-        row: dict[str, Any] | None = CollegeRepository.get_college_by_college_code(college_code)
+        college = CollegeRepository.get_college_by_college_code(college_code)
 
-        if not row:
+        if not college:
             raise EntityNotFoundError(f"College with the college_code '{college_code}' does not exist.")
 
-        return College(**row)
+        return college
     
     @staticmethod
-    def get_total_college_count_service(params) -> int:
+    async def get_college_details_service_async(college_code: str) -> College:
+        """Async variant of get_college_details_service."""
+
+        college = await CollegeRepository.get_college_by_college_code_async(college_code)
+
+        if not college:
+            raise EntityNotFoundError(f"College with the college_code '{college_code}' does not exist.")
+
+        return college
+
+    @staticmethod
+    async def get_total_college_count_service(params) -> int:
         """
         Retrieve the total college count, with optional search filters.
 
@@ -43,10 +61,10 @@ class CollegeServices:
             int: The total college count, with search filters being optionally applied.
         """
 
-        return CollegeRepository.get_total_college_count(params)["count"]
+        return (await CollegeRepository.get_total_college_count_async(params))["count"]
 
     @staticmethod
-    def get_many_colleges_service(params) -> list[College]:
+    async def get_many_colleges_service(params) -> list[College]:
         """
         Retrieve details of different colleges based on pagination, optional search and sort filters.
         
@@ -65,14 +83,64 @@ class CollegeServices:
             list[College]: A list of college dataclass instances representing rowsPerPage colleges.
         """
 
-        colleges = CollegeRepository.get_many_colleges(params)
+        return await CollegeRepository.get_many_colleges_async(params)
 
-        college_dataclasses = []
+    @staticmethod
+    async def get_many_colleges_with_count_service(params) -> tuple[list[College], int]:
+        """
+        Retrieve a page of colleges together with the total number of matching colleges in a single query.
 
-        for college in colleges:
-            college_dataclasses.append(College(**college))
+        Args:
+            params (dict): The same keys as get_many_colleges_service, plus:
+                - "estimate_count" (bool): Use the planner's row estimate instead of an exact count when no search or filter is applied.
 
-        return college_dataclasses
+        Returns:
+            tuple[list[College], int]: The college dataclass instances of the page, and the total college count.
+        """
+
+        # The planner estimate only stands in for the count when nothing is filtered out
+        estimate_count = params["estimate_count"] and not (params["search_value"])
+
+        rows = await CollegeRepository.get_many_colleges_with_count_async(params, estimate_count)
+
+        if rows and rows[0][1] is not None:
+            total_count = rows[0][1]
+
+        else:
+            # Past the last page, or no planner statistics yet, so count exactly using the first row instead
+            first_row = await CollegeRepository.get_many_colleges_with_count_async({**params, "page_number": 1, "rows_per_page": 1})
+
+            total_count = first_row[0][1] if first_row else 0
+
+        return [college for college, _ in rows], total_count
+
+    @staticmethod
+    async def get_many_colleges_by_cursor_service(params) -> tuple[list[College], str | None]:
+        """
+        Retrieve a page of colleges using keyset (cursor) pagination.
+
+        Args:
+            params (dict): The same keys as get_many_colleges_service, with "cursor" (list | None) in place of "page_number".
+
+        Returns:
+            tuple[list[College], str | None]: The college dataclass instances of the page, and the cursor of the 
+            next page (None if this is the last page).
+        """
+
+        rows = await CollegeRepository.get_many_colleges_by_cursor_async(params)
+
+        has_next_page = len(rows) > params["rows_per_page"]
+
+        rows = rows[:params["rows_per_page"]]
+
+        next_cursor = None
+
+        if has_next_page and rows:
+            # The raw sort value is used (the college itself is formatted for display) so the next page can seek on it
+            last_college, last_sort_value = rows[-1]
+            next_cursor = encode_cursor(params["sort_field"], params["sort_order"], [last_sort_value or "", last_college.college_code])
+
+        return [college for college, _ in rows], next_cursor
 
     @staticmethod
     def create_college_service(college_data) -> None:
@@ -99,6 +167,9 @@ class CollegeServices:
 
         CollegeRepository.delete_colleges(college_codes)
 
+        # College demographics are computed through the programs that reference this college
+        current_app.extensions['demographics_cache'].invalidate()
+
     @staticmethod
     def edit_college_details_service(college_code: str, new_college_data) -> None:
         """
@@ -114,6 +185,9 @@ class CollegeServices:
 
         CollegeRepository.edit_college_details(college_code, new_college_data)
 
+        # College demographics are computed through the programs that reference this college
+        current_app.extensions['demographics_cache'].invalidate()
+
     @staticmethod
     def get_college_codes_service() -> list[dict[str, str]]:
         """
@@ -130,3 +204,18 @@ class CollegeServices:
             college_code_details["collegeCode"] = college_code_details.pop('college_code')
 
         return college_codes_details
+
+    @staticmethod
+    def export_colleges_service(params, export_format: str) -> Iterator[str]:
+        """
+        Export every college matching the search filters, in sort order, as a stream of CSV or NDJSON chunks.
+
+        Args:
+            params (dict): The same search and sort keys as get_many_colleges_service, without the pagination keys.
+            export_format (str): "csv" or "ndjson".
+
+        Returns:
+            Iterator[str]: The chunks of the export. Values are exported as stored, not as formatted for display.
+        """
+
+        return stream_export(CollegeRepository.stream_colleges(params), COLLEGE_EXPORT_COLUMNS, export_format)
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 from werkzeug.security import check_password_hash
 
-@dataclass
+@dataclass(slots=True)
 class User:
     user_id: str
     username: str
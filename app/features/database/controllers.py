@@ -0,0 +1,18 @@
+from flask import jsonify, Response
+
+import traceback
+
+from .services import DatabaseServices
+
+class DatabaseController:
+
+    @staticmethod
+    def get_database_stats_controller() -> tuple[Response, int]:
+        """Retrieve the connection pool and query cache stats."""
+
+        try:
+            return jsonify(DatabaseServices.get_database_stats_service()), 200
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 500
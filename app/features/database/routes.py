@@ -0,0 +1,68 @@
+from flask import Blueprint, Response
+from .controllers import DatabaseController
+
+from flask_jwt_extended import jwt_required
+
+database_bp = Blueprint("database_bp", __name__)
+
+@database_bp.route("/stats", methods=["GET"])
+@jwt_required()
+def get_database_stats() -> tuple[Response, int]:
+    """
+    Retrieve the usage of the database connection pools and how well their queries are reused.
+
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). The pools and caches 
+    are in-process, so the stats are those of the worker process that serves the request.
+
+    Request body:
+
+        None. This endpoint does not require any input data.
+
+    Response JSON:
+
+        pool: The psycopg_pool stats of the connection pool (poolSize, poolAvailable, requestsWaiting, ...) 
+        with the checkout wait times, and under preparedStatements:
+
+            connections: The number of connections that prepared a statement.
+
+            statements: The number of statements prepared across these connections.
+
+            hits: The executions of a statement that was already prepared on its connection.
+
+            misses: The executions that prepared their statement first.
+
+            hitRate: hits / (hits + misses).
+
+        and under queries:
+
+            queries: The number of queries run.
+
+            slowQueries: The queries that took at least slowQueryMs, each logged with its plan.
+
+            totalMs: The time spent in queries.
+
+            slowQueryMs: The slow query threshold, in milliseconds.
+
+            fingerprints: The 20 statements with the most total time, each with its fingerprint, its statement
+            normalized with ? in place of its values, and its calls, totalMs, avgMs, maxMs and rows.
+
+        asyncPool: The same for the pool of the async views, without the checkout wait times.
+
+        queryRegistry: 
+
+            size: The number of query variants built.
+
+            maxSize: The number of query variants kept.
+
+            hits: The lookups that found their query already built.
+
+            misses: The lookups that built their query.
+
+            hitRate: hits / (hits + misses).
+
+    Possible errors:
+
+        500 if an unexpected error occurs during processing.
+    """
+
+    return DatabaseController.get_database_stats_controller()
@@ -0,0 +1,40 @@
+from flask import current_app
+
+from app.db.instrumentation import QueryStats
+from app.utils import dict_keys_to_camel
+
+from typing import Any
+
+class DatabaseServices:
+
+    @staticmethod
+    def get_database_stats_service() -> dict[str, Any]:
+        """
+        Retrieve the connection pool, query registry, prepared statement and query stats of this process.
+
+        Returns:
+            dict: The "pool" and "asyncPool" stats, each with its "preparedStatements" reuse counters and
+            its "queries" totals, and the "queryRegistry" stats.
+        """
+
+        db = current_app.extensions['db']
+        async_db = current_app.extensions['async_db']
+
+        return {
+            "pool": {**dict_keys_to_camel(db.get_pool_stats()),
+                     "preparedStatements": dict_keys_to_camel(db.prepared_statements.get_stats()),
+                     "queries": DatabaseServices._get_query_stats(db.query_stats)},
+            "asyncPool": {**dict_keys_to_camel(async_db.get_pool_stats()),
+                          "preparedStatements": dict_keys_to_camel(async_db.prepared_statements.get_stats()),
+                          "queries": DatabaseServices._get_query_stats(async_db.query_stats)},
+            "queryRegistry": dict_keys_to_camel(current_app.extensions['query_registry'].get_stats()),
+        }
+
+    @staticmethod
+    def _get_query_stats(query_stats: QueryStats) -> dict[str, Any]:
+        """Return the query totals of a pool with camelCased keys, including those of each fingerprint."""
+
+        stats = query_stats.get_stats()
+        stats["fingerprints"] = [dict_keys_to_camel(fingerprint) for fingerprint in stats["fingerprints"]]
+
+        return dict_keys_to_camel(stats)
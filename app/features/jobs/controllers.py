@@ -0,0 +1,18 @@
+from flask import jsonify, Response
+
+import traceback
+
+from .services import JobServices
+
+class JobController:
+
+    @staticmethod
+    def get_queue_stats_controller() -> tuple[Response, int]:
+        """Retrieve the depth of the background job queue."""
+
+        try:
+            return jsonify(JobServices.get_queue_stats_service()), 200
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 500
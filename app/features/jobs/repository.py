@@ -0,0 +1,18 @@
+from app.db.queries.jobs import JobQueries
+
+from flask import current_app
+
+class JobRepository:
+
+    @staticmethod
+    def get_dead_letter_counts() -> list[dict[str, str | int]]:
+        """
+        Retrieve the number of dead-lettered jobs per kind.
+
+        Returns:
+            list[dict]: A list of dictionaries with the "kind" and "count" keys.
+        """
+
+        db = current_app.extensions['db']
+
+        return db.fetch_all(JobQueries.GET_DEAD_LETTER_COUNT_BY_KIND)
@@ -0,0 +1,50 @@
+from flask import Blueprint, Response
+from .controllers import JobController
+
+from flask_jwt_extended import jwt_required
+
+job_bp = Blueprint("job_bp", __name__)
+
+@job_bp.route("/queue", methods=["GET"])
+@jwt_required()
+def get_queue_stats() -> tuple[Response, int]:
+    """
+    Retrieve the depth of the background job queue that runs avatar storage operations.
+
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). The queue is in-process, 
+    so the depth and counters are those of the worker process that serves the request.
+
+    Request body:
+
+        None. This endpoint does not require any input data.
+
+    Response JSON:
+
+        queued: The number of jobs waiting for a free worker.
+
+        scheduledRetries: The number of failed jobs waiting for their backoff before being retried.
+
+        running: The number of jobs being run.
+
+        workers: The number of worker threads.
+
+        maxSize: The number of jobs held before new jobs run within the request instead.
+
+        completed: The number of jobs that succeeded since the process started.
+
+        retried: The number of retries scheduled since the process started.
+
+        deadLettered: The number of jobs this process gave up on since it started.
+
+        ranInline: The number of jobs run within the request because the queue was full.
+
+        deadLetterCount: The number of jobs in the job_dead_letters table.
+
+        deadLetters: The number of jobs in the job_dead_letters table per kind, as a list of {kind, count}.
+
+    Possible errors:
+
+        500 if an unexpected error occurs during processing.
+    """
+
+    return JobController.get_queue_stats_controller()
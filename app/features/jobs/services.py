@@ -0,0 +1,29 @@
+from flask import current_app
+
+from .repository import JobRepository
+
+from app.utils import dict_keys_to_camel
+
+from typing import Any
+
+class JobServices:
+
+    @staticmethod
+    def get_queue_stats_service() -> dict[str, Any]:
+        """
+        Retrieve the depth and counters of the background job queue of this process, and the dead-lettered
+        jobs of every process.
+
+        Returns:
+            dict: The queue stats, with a "deadLetters" list of {kind, count} and their "deadLetterCount" total.
+        """
+
+        queue_stats = dict_keys_to_camel(current_app.extensions['job_queue'].get_stats())
+
+        dead_letters = [{"kind": row["kind"], "count": row["count"]} for row in JobRepository.get_dead_letter_counts()]
+
+        return {
+            **queue_stats,
+            "deadLetterCount": sum(row["count"] for row in dead_letters),
+            "deadLetters": dead_letters,
+        }
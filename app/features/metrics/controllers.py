@@ -0,0 +1,26 @@
+from flask import current_app, jsonify, request, Response
+
+import hmac
+import traceback
+
+from app.utils.metrics import EXPOSITION_CONTENT_TYPE
+
+from .services import MetricsServices
+
+class MetricsController:
+
+    @staticmethod
+    def get_metrics_controller() -> tuple[Response, int]:
+        """Render the metrics, for a scraper presenting the METRICS_TOKEN if one is configured."""
+
+        try:
+            token = current_app.config["METRICS_TOKEN"]
+
+            if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+                return jsonify({"error": "A valid metrics token is required."}), 401
+
+            return Response(MetricsServices.get_metrics_service(), content_type=EXPOSITION_CONTENT_TYPE), 200
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 500
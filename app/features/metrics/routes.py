@@ -0,0 +1,42 @@
+from flask import Blueprint, Response
+from .controllers import MetricsController
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+@metrics_bp.route("", methods=["GET"])
+def get_metrics() -> tuple[Response, int]:
+    """
+    Expose the metrics of this process in the Prometheus text exposition format, for a Prometheus scraper.
+
+    The endpoint does not use the login cookie, scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>"
+    when METRICS_TOKEN is set, and it is open otherwise. The metrics are in-process, so each worker process
+    reports its own.
+
+    Metrics:
+
+        http_request_duration_seconds: Histogram of the latency of the API requests, by method and route.
+
+        http_requests_total: The API requests served, by method, route and status.
+
+        db_pool_size, db_pool_available, db_pool_max_size, db_pool_requests_waiting, db_pool_utilization:
+        The size and usage of the "sync" and "async" connection pools.
+
+        db_pool_requests_total, db_pool_checkout_wait_seconds_total: The connections requested from each pool,
+        and the time spent waiting for them (sync pool only).
+
+        db_queries_total, db_query_duration_seconds_total, db_slow_queries_total: The queries run through each pool.
+
+        cache_hits_total, cache_misses_total, cache_hit_ratio: The lookups of the query registry, the prepared
+        statements of each pool and the demographics cache.
+
+        storage_call_duration_seconds: Histogram of the latency of the avatar storage operations, by backend,
+        operation and outcome. Only present when avatar storage is configured.
+
+    Possible errors:
+
+        401 if METRICS_TOKEN is set and the request does not present it.
+
+        500 if an unexpected error occurs during processing.
+    """
+
+    return MetricsController.get_metrics_controller()
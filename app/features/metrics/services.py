@@ -0,0 +1,106 @@
+from flask import current_app
+
+from app.utils.metrics import MetricFamily, MetricsRegistry
+
+from typing import Any
+
+class MetricsServices:
+
+    @staticmethod
+    def get_metrics_service() -> str:
+        """Render the metrics of this process in the Prometheus text exposition format."""
+
+        return current_app.extensions['metrics'].render()
+
+    @staticmethod
+    def register_collectors(metrics: MetricsRegistry) -> None:
+        """
+        Add the pool, query, cache and storage metrics of the app to its metrics.
+
+        Must be called in the app context, once the databases, caches and storage are created.
+        """
+
+        db = current_app.extensions['db']
+        async_db = current_app.extensions['async_db']
+        query_registry = current_app.extensions['query_registry']
+        demographics_cache = current_app.extensions['demographics_cache']
+        storage = current_app.extensions['storage']
+
+        pools = (("sync", db), ("async", async_db))
+
+        caches = (
+            ("query_registry", query_registry),
+            ("prepared_statements_sync", db.prepared_statements),
+            ("prepared_statements_async", async_db.prepared_statements),
+            ("demographics", demographics_cache),
+        )
+
+        metrics.add_collector(lambda: MetricsServices._collect_pool_metrics(pools))
+        metrics.add_collector(lambda: MetricsServices._collect_query_metrics(pools))
+        metrics.add_collector(lambda: MetricsServices._collect_cache_metrics(caches))
+
+        if storage is not None:
+            metrics.register(storage.call_durations)
+
+    @staticmethod
+    def _collect_pool_metrics(pools: tuple[tuple[str, Any], ...]) -> list[MetricFamily]:
+        """Read the size and usage of the connection pools."""
+
+        size = MetricFamily("db_pool_size", "gauge", "Connections open in the pool.")
+        available = MetricFamily("db_pool_available", "gauge", "Idle connections in the pool.")
+        max_size = MetricFamily("db_pool_max_size", "gauge", "Connections the pool can open.")
+        waiting = MetricFamily("db_pool_requests_waiting", "gauge", "Requests waiting for a connection.")
+        utilization = MetricFamily("db_pool_utilization", "gauge", "Connections in use over the connections the pool can open.")
+        requests = MetricFamily("db_pool_requests_total", "counter", "Connections requested from the pool.")
+        wait = MetricFamily("db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a connection, in seconds.")
+
+        for pool, database in pools:
+            stats = database.get_pool_stats()
+            in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+
+            size.add(stats.get("pool_size", 0), pool=pool)
+            available.add(stats.get("pool_available", 0), pool=pool)
+            max_size.add(stats.get("pool_max", 0), pool=pool)
+            waiting.add(stats.get("requests_waiting", 0), pool=pool)
+            utilization.add(round(in_use / stats["pool_max"], 4) if stats.get("pool_max") else 0, pool=pool)
+            requests.add(stats.get("requests_num", 0), pool=pool)
+
+            # Only the sync pool times its checkouts
+            if "checkout_wait_total_ms" in stats:
+                wait.add(stats["checkout_wait_total_ms"] / 1000, pool=pool)
+
+        return [size, available, max_size, waiting, utilization, requests, wait]
+
+    @staticmethod
+    def _collect_query_metrics(pools: tuple[tuple[str, Any], ...]) -> list[MetricFamily]:
+        """Read the query counters of the connection pools."""
+
+        queries = MetricFamily("db_queries_total", "counter", "Queries run.")
+        duration = MetricFamily("db_query_duration_seconds_total", "counter", "Time spent in queries, in seconds.")
+        slow = MetricFamily("db_slow_queries_total", "counter", "Queries that took at least the slow query threshold.")
+
+        for pool, database in pools:
+            stats = database.query_stats.get_stats(limit=0)
+
+            queries.add(stats["queries"], pool=pool)
+            duration.add(stats["total_ms"] / 1000, pool=pool)
+            slow.add(stats["slow_queries"], pool=pool)
+
+        return [queries, duration, slow]
+
+    @staticmethod
+    def _collect_cache_metrics(caches: tuple[tuple[str, Any], ...]) -> list[MetricFamily]:
+        """Read the hit and miss counters of the in-process caches."""
+
+        hits = MetricFamily("cache_hits_total", "counter", "Lookups that found their entry in the cache.")
+        misses = MetricFamily("cache_misses_total", "counter", "Lookups that missed the cache.")
+        hit_ratio = MetricFamily("cache_hit_ratio", "gauge", "Hits over lookups since the process started.")
+
+        for cache, counters in caches:
+            lookups = counters.hits + counters.misses
+
+            hits.add(counters.hits, cache=cache)
+            misses.add(counters.misses, cache=cache)
+            hit_ratio.add(round(counters.hits / lookups, 4) if lookups else 0, cache=cache)
+
+        return [hits, misses, hit_ratio]
@@ -1,5 +1,4 @@
-from flask import request, jsonify, Response
-from dataclasses import asdict
+from flask import request, jsonify, Response, stream_with_context
 
 import traceback
 
@@ -9,12 +8,14 @@ from .services import ProgramServices
 
 from ..common.dataclasses import Program
 
-from app.utils import dict_keys_to_camel, validate_program_code, validate_program_name, validate_college_code
+from app.utils import EntitySerializer, decode_cursor, validate_program_code, validate_program_name, validate_college_code, EXPORT_FORMATS
 
 from app.exceptions.custom_exceptions import EntityNotFoundError, InvalidParameterError, ValidationError
 
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
 
+PROGRAM_SERIALIZER = EntitySerializer(Program)
+
 class ProgramController:
     
     @staticmethod
@@ -26,7 +27,7 @@ class ProgramController:
 
             program_details: Program = ProgramServices.get_program_details_service(program_code.strip())
 
-            return jsonify(dict_keys_to_camel(asdict(program_details))), 200
+            return jsonify(PROGRAM_SERIALIZER.serialize(program_details)), 200
         
         except EntityNotFoundError as e:
             traceback.print_exc()
@@ -45,7 +46,7 @@ class ProgramController:
             return jsonify({"error": "An unexpected error occurred."}), 500
     
     @staticmethod
-    def get_total_program_count_controller() -> tuple[Response, int]:
+    async def get_total_program_count_controller() -> tuple[Response, int]:
         """Retrieve the total number of programs based on optional search filters."""
 
         ALLOWED_SEARCH_BY = {"Program Code", "Program Name", "College Code"}
@@ -104,7 +105,7 @@ class ProgramController:
             if sum(bool(x) for x in [params["search_value"], params["college_code"]]) > 1:
                 raise InvalidParameterError("Only one should exist at a time between 'searchValue', and 'collegeCode'.")
 
-            total_program_count = ProgramServices.get_total_program_count_service(params)
+            total_program_count = await ProgramServices.get_total_program_count_service(params)
 
             return jsonify({"totalCount": total_program_count}), 200
         
@@ -117,7 +118,7 @@ class ProgramController:
             return jsonify({"error": "An unexpected error occurred."}), 500
 
     @staticmethod
-    def get_many_programs_controller() -> tuple[Response, int]:
+    async def get_many_programs_controller() -> tuple[Response, int]:
         """Retrieve details of different programs based on pagination, optional search and sort filters."""
 
         ALLOWED_SEARCH_BY = {"Program Code", "Program Name", "College Code"}
@@ -134,7 +135,10 @@ class ProgramController:
                 "search_by": request.args.get("searchBy"),
                 "search_type": request.args.get("searchType"),
                 "sort_field": request.args.get("sortField"),
-                "sort_order":request.args.get("sortOrder")
+                "sort_order":request.args.get("sortOrder"),
+                "cursor": request.args.get("cursor"),
+                "include_total_count": request.args.get("includeTotalCount", "false").lower() == "true",
+                "estimate_count": request.args.get("estimateCount", "false").lower() == "true"
             }
 
             if params['rows_per_page'] < 0:
@@ -155,9 +159,25 @@ class ProgramController:
             if params["sort_order"] not in ALLOWED_SORT_ORDER:
                 raise InvalidParameterError(f"Invalid 'sortOrder' value: '{params["sort_order"]}'. Must be one of: ['Ascending', 'Descending'].")
             
-            programs = ProgramServices.get_many_programs_service(params)
+            if params["include_total_count"] and params["cursor"] is not None:
+                raise InvalidParameterError("'includeTotalCount' cannot be combined with 'cursor'.")
+
+            if params["include_total_count"]:
+                programs, total_count = await ProgramServices.get_many_programs_with_count_service(params)
+
+                return jsonify({"entities": PROGRAM_SERIALIZER.serialize_many(programs), "totalCount": total_count}), 200
+
+            # Keyset pagination is opt-in, an empty cursor requests the first page
+            if params["cursor"] is not None:
+                params["cursor"] = decode_cursor(params["cursor"], params["sort_field"], params["sort_order"])
+
+                programs, next_cursor = await ProgramServices.get_many_programs_by_cursor_service(params)
+
+                return jsonify({"entities": PROGRAM_SERIALIZER.serialize_many(programs), "nextCursor": next_cursor}), 200
 
-            return jsonify({"entities": [dict_keys_to_camel(asdict(program_details)) for program_details in programs]}), 200
+            programs = await ProgramServices.get_many_programs_service(params)
+
+            return jsonify({"entities": PROGRAM_SERIALIZER.serialize_many(programs)}), 200
         
         except InvalidParameterError as e:
             traceback.print_exc()
@@ -351,4 +371,53 @@ class ProgramController:
         except Exception as e:
             traceback.print_exc()
             return jsonify({"error": str(e)}), 500
-        
\ No newline at end of file
+
+    @staticmethod
+    def export_programs_controller() -> tuple[Response, int]:
+        """Stream every program matching optional search and sort filters as a CSV or NDJSON file."""
+
+        ALLOWED_SEARCH_BY = {"Program Code", "Program Name", "College Code"}
+        ALLOWED_SEARCH_TYPE = {"Starts With", "Contains", "Ends With"}
+        ALLOWED_SORT_FIELD = {"Program Code", "Program Name", "College Code"}
+        ALLOWED_SORT_ORDER = {"Ascending", "Descending"}
+
+        try:
+            params = {
+                "search_value": (request.args.get("searchValue") or "").strip(),
+                "search_by": request.args.get("searchBy"),
+                "search_type": request.args.get("searchType"),
+                "sort_field": request.args.get("sortField", "Program Code"),
+                "sort_order": request.args.get("sortOrder", "Ascending"),
+            }
+
+            export_format = request.args.get("format", "csv").lower()
+
+            if export_format not in EXPORT_FORMATS:
+                raise InvalidParameterError(f"Invalid 'format' value: '{export_format}'. Must be one of: ['csv', 'ndjson'].")
+
+            # searchBy and searchType only matter when there is something to search for
+            if params["search_value"] and params['search_by'] not in ALLOWED_SEARCH_BY:
+                raise InvalidParameterError(f"Invalid 'searchBy' value: '{params['search_by']}'. Must be one of: ['Program Code', 'Program Name', 'College Code'].")
+
+            if params["search_value"] and params["search_type"] not in ALLOWED_SEARCH_TYPE:
+                raise InvalidParameterError(f"Invalid 'searchType' value: '{params["search_type"]}'. Must be one of: ['Starts With', 'Contains', 'Ends With'].")
+            
+            if params['sort_field'] not in ALLOWED_SORT_FIELD:
+                raise InvalidParameterError(f"Invalid 'sortField' value: '{params['sort_field']}'. Must be one of: ['Program Code', 'Program Name', 'College Code'].")
+
+            if params["sort_order"] not in ALLOWED_SORT_ORDER:
+                raise InvalidParameterError(f"Invalid 'sortOrder' value: '{params["sort_order"]}'. Must be one of: ['Ascending', 'Descending'].")
+
+            chunks = ProgramServices.export_programs_service(params, export_format)
+
+            return Response(stream_with_context(chunks), 
+                            mimetype=EXPORT_FORMATS[export_format], 
+                            headers={"Content-Disposition": f"attachment; filename=programs.{export_format}"}), 200
+
+        except InvalidParameterError as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 400
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred."}), 500
@@ -1,13 +1,33 @@
 from app.db.connection import Database
 from app.db.queries.programs import ProgramQueries
 from app.db.queries.common import CommonQueries
+from app.db.query_builder import ENTITY_COLUMNS, EMPTY, build_sort_order, build_total_count_column, build_where_clause
+from app.db.query_registry import iter_unfiltered_list_params
+from app.db.row_factories import entity_row
+from app.db.search_planner import build_search_conditions
+
+from app.features.common.dataclasses import Program
 
 from flask import current_app
+from psycopg import sql
+from psycopg.abc import Query
+from psycopg.rows import RowFactory
+
+from typing import Iterator
+
+# Programs are listed with "N/A" in place of a missing college
+PROGRAM_LIST_NORMALIZERS = {"college_code": lambda college_code: college_code or "N/A"}
+
+PROGRAM_ROW = entity_row(Program)
+PROGRAM_LIST_ROW = entity_row(Program, PROGRAM_LIST_NORMALIZERS)
+PROGRAM_LIST_WITH_COUNT_ROW = entity_row(Program, PROGRAM_LIST_NORMALIZERS, extra_columns=("total_count",))
+
+PROGRAM_COLUMNS = ENTITY_COLUMNS["programs"]
 
 class ProgramRepository:
 
     @staticmethod
-    def get_program_by_program_code(program_code: str) -> dict[str, str] | None:
+    def get_program_by_program_code(program_code: str) -> Program | None:
         """
         Retrieve a program record from the database by program code.
 
@@ -15,12 +35,40 @@ class ProgramRepository:
             program_code (str): The unique program code of the program.
 
         Returns:
-            dict: A dictionary containing the program's details if found, otherwise None.
+            Program | None: The program if found, otherwise None.
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
+
+        return db.fetch_one(queries.get(CommonQueries.GET_BY_ID, table="programs", pk="program_code"), (program_code, ), PROGRAM_ROW, prepare=True)
 
-        return db.fetch_one(CommonQueries.GET_BY_ID.format(table="programs", pk="program_code"), (program_code, ))
+    @staticmethod
+    async def get_program_by_program_code_async(program_code: str) -> Program | None:
+        """Async variant of get_program_by_program_code."""
+
+        async_db = current_app.extensions['async_db']
+        queries = current_app.extensions['query_registry']
+
+        return await async_db.fetch_one(queries.get(CommonQueries.GET_BY_ID, table="programs", pk="program_code"), (program_code, ), PROGRAM_ROW, prepare=True)
+
+    @staticmethod
+    def _build_total_program_count_query(params) -> tuple[Query, tuple | None]:
+        """Build the query and its parameters used by get_total_program_count and its async variant."""
+
+        queries = current_app.extensions['query_registry']
+
+        if params["search_value"]:
+            conditions, values = build_search_conditions("programs", params)
+
+            return (queries.get(CommonQueries.GET_TOTAL_COUNT_WHERE, table="programs", where_clause=build_where_clause(conditions)),
+                    tuple(values))
+        
+        elif params["college_code"]:
+            return ProgramQueries.GET_TOTAL_COUNT_FROM_COLLEGE_CODE, (params["college_code"],)
+        
+        else:
+            return queries.get(CommonQueries.GET_TOTAL_COUNT, table="programs"), None
 
     @staticmethod
     def get_total_program_count(params) -> dict[str, int]:
@@ -46,28 +94,50 @@ class ProgramRepository:
 
         db = current_app.extensions['db']
 
-        if params["search_value"]:
+        return db.fetch_one(*ProgramRepository._build_total_program_count_query(params), prepare=True)
 
-            if params["search_type"] == "Starts With":
-                search_pattern = f"{params["search_value"]}%"
-            elif params["search_type"] == "Ends With":
-                search_pattern = f"%{params["search_value"]}"
-            elif params["search_type"] == "Contains":
-                search_pattern = f"%{params["search_value"]}%"
-            else:
-                search_pattern = params["search_value"]
-
-            return db.fetch_one(CommonQueries.GET_TOTAL_COUNT_WITH_SEARCH.format(table="programs", search_by=f"{params["search_by"].lower().replace(' ', '_')}"),
-                                (search_pattern,))
-        
-        elif params["college_code"]:
-            return db.fetch_one(ProgramQueries.GET_TOTAL_COUNT_FROM_COLLEGE_CODE, (params["college_code"],))
-        
-        else:
-            return db.fetch_one(CommonQueries.GET_TOTAL_COUNT.format(table="programs"))
+    @staticmethod
+    async def get_total_program_count_async(params) -> dict[str, int]:
+        """Async variant of get_total_program_count."""
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_one(*ProgramRepository._build_total_program_count_query(params), prepare=True)
+
+    @staticmethod
+    def _build_many_programs_query(params, count_column: sql.Composable = EMPTY) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by get_many_programs and its async variant."""
+
+        queries = current_app.extensions['query_registry']
+
+        conditions, values = build_search_conditions("programs", params)
+        sort_order, _ = build_sort_order(params["sort_order"])
+
+        offset = 0 if params["page_number"] <= 0 else (params["page_number"] - 1) * params["rows_per_page"]
+
+        return (queries.get(CommonQueries.GET_MANY,
+                            table="programs",
+                            count_column=count_column,
+                            where_clause=build_where_clause(conditions),
+                            sort_field=PROGRAM_COLUMNS.column(params["sort_field"]),
+                            sort_order=sort_order),
+                (*values, params["rows_per_page"], offset))
 
     @staticmethod
-    def get_many_programs(params) -> list[dict[str, str]]:
+    def warm_up_queries() -> None:
+        """Build the count query and the first-page list queries of every sort into the QueryRegistry."""
+
+        for params in iter_unfiltered_list_params(PROGRAM_COLUMNS.columns, college_code=""):
+            ProgramRepository._build_many_programs_query(params)
+            ProgramRepository._build_many_programs_keyset_query(params)
+
+            for estimate_count in (False, True):
+                ProgramRepository._build_many_programs_query(params, ProgramRepository._get_total_count_column(estimate_count))
+
+        ProgramRepository._build_total_program_count_query(params)
+
+    @staticmethod
+    def get_many_programs(params) -> list[Program]:
         """
         Retrieve a paginated list of programs based on search and sorting parameters.
 
@@ -82,34 +152,95 @@ class ProgramRepository:
                 - "rows_per_page" (int): Number of records to retrieve per page.
 
         Returns:
-            list[dict]: A list of program records matching the given filters, 
-            where each record is represented as a dictionary.
+            list[Program]: The programs matching the given filters, with "N/A" for a missing college.
         """
 
         db = current_app.extensions['db']
 
-        if params["search_type"] == "Starts With":
-            search_pattern = f"{params["search_value"]}%"
-        elif params["search_type"] == "Ends With":
-            search_pattern = f"%{params["search_value"]}"
-        elif params["search_type"] == "Contains":
-            search_pattern = f"%{params["search_value"]}%"
-        else:
-            search_pattern = params["search_value"]
+        return db.fetch_all(*ProgramRepository._build_many_programs_query(params), PROGRAM_LIST_ROW, prepare=True)
 
-        if params["sort_order"] == "Ascending":
-            sort_order = "ASC"
-        else:
-            sort_order = "DESC"
+    @staticmethod
+    async def get_many_programs_async(params) -> list[Program]:
+        """Async variant of get_many_programs."""
 
-        offset = 0 if params["page_number"] <= 0 else (params["page_number"] - 1) * params["rows_per_page"]
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*ProgramRepository._build_many_programs_query(params), PROGRAM_LIST_ROW, prepare=True)
+
+    @staticmethod
+    async def get_many_programs_with_count_async(params, estimate_count: bool = False) -> list[tuple[Program, int | None]]:
+        """
+        Retrieve a paginated list of programs like get_many_programs, along with the total number of matching programs.
+
+        Args:
+            params (dict): The same keys as get_many_programs.
+            estimate_count (bool): Use the planner's row estimate for the table instead of an exact count. 
+            Only accurate when no search or filter is applied.
+
+        Returns:
+            list[tuple[Program, int | None]]: The programs of the page, each paired with the total count. With estimate_count, 
+            the total count is None when the table has never been analyzed.
+        """
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*ProgramRepository._build_many_programs_query(params, ProgramRepository._get_total_count_column(estimate_count)), PROGRAM_LIST_WITH_COUNT_ROW, prepare=True)
+
+    @staticmethod
+    def _get_total_count_column(estimate_count: bool) -> sql.Composable:
+        """Return the extra column that adds the exact or estimated total count to every row of a page."""
+
+        return build_total_count_column("programs", estimate_count)
+
+    @staticmethod
+    def _build_many_programs_keyset_query(params) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by get_many_programs_by_cursor_async."""
+
+        queries = current_app.extensions['query_registry']
+
+        conditions, values = build_search_conditions("programs", params)
+        sort_order, comparator = build_sort_order(params["sort_order"])
+
+        # college_code is nullable, so it is coalesced and the row comparison in the seek predicate never sees NULL
+        sort_key = PROGRAM_COLUMNS.sort_key(PROGRAM_COLUMNS.column(params["sort_field"]))
+
+        if params["cursor"]:
+            conditions.append(sql.SQL(CommonQueries.KEYSET_SEEK).format(sort_key=sort_key, pk=sql.Identifier("program_code"), comparator=comparator))
+            values.extend(params["cursor"])
+
+        # Fetch one extra row to find out whether a next page exists
+        return (queries.get(CommonQueries.GET_MANY_KEYSET,
+                            table="programs",
+                            where_clause=build_where_clause(conditions),
+                            sort_key=sort_key,
+                            pk="program_code",
+                            sort_order=sort_order),
+                (*values, params["rows_per_page"] + 1))
+
+    @staticmethod
+    def _get_keyset_row_factory(params) -> RowFactory:
+        """Return the row factory of a keyset page, which pairs each program with the raw value of its sort column for the next cursor."""
+
+        return entity_row(Program, PROGRAM_LIST_NORMALIZERS, extra_columns=(PROGRAM_COLUMNS.column(params["sort_field"]),))
+
+    @staticmethod
+    async def get_many_programs_by_cursor_async(params) -> list[tuple[Program, str | None]]:
+        """
+        Retrieve a page of programs using keyset (cursor) pagination instead of OFFSET.
+
+        Args:
+            params (dict): The same keys as get_many_programs, except "page_number" which is replaced by:
+                - "cursor" (list | None): The [sort_value, program_code] pair of the last row of the previous page, 
+                or None for the first page.
+
+        Returns:
+            list[tuple[Program, str | None]]: Up to "rows_per_page" + 1 programs, each paired with the raw value of its sort column. 
+            The extra program is only present when there is a next page.
+        """
 
-        return db.fetch_all(CommonQueries.GET_MANY
-                            .format(table="programs", 
-                                    search_by=f"{params["search_by"].lower().replace(' ', '_')}",
-                                    sort_field=f"{params["sort_field"].lower().replace(' ', '_')}",
-                                    sort_order=sort_order),
-                            (search_pattern, params["rows_per_page"], offset))
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*ProgramRepository._build_many_programs_keyset_query(params), ProgramRepository._get_keyset_row_factory(params), prepare=True)
 
     @staticmethod
     def create_program(program_data) -> None:
@@ -175,4 +306,37 @@ class ProgramRepository:
 
         db = current_app.extensions['db']
 
-        return db.fetch_all(CommonQueries.GET_ALL_IDS.format(columns="program_code, college_code", table="programs", order_column="college_code"))   
+        return db.fetch_all(CommonQueries.GET_ALL_IDS.format(columns="program_code, college_code", table="programs", order_column="college_code"))
+
+    @staticmethod
+    def _build_programs_export_query(params) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by stream_programs."""
+
+        conditions, values = build_search_conditions("programs", params)
+        sort_order, _ = build_sort_order(params["sort_order"])
+
+        return (sql.SQL(CommonQueries.GET_ALL_SORTED)
+                .format(table=sql.Identifier("programs"),
+                        where_clause=build_where_clause(conditions),
+                        sort_field=sql.Identifier(PROGRAM_COLUMNS.column(params["sort_field"])),
+                        pk=sql.Identifier("program_code"),
+                        sort_order=sort_order),
+                tuple(values))
+
+    @staticmethod
+    def stream_programs(params) -> Iterator[dict[str, str]]:
+        """
+        Lazily retrieve every program matching the search filters, in sort order, through a server-side cursor.
+
+        The query is built right away, so invalid parameters raise here rather than part way through the stream.
+
+        Args:
+            params (dict): The same search and sort keys as get_many_programs, without the pagination keys.
+
+        Returns:
+            Iterator[dict]: The matching program rows.
+        """
+
+        db = current_app.extensions['db']
+
+        return db.stream(*ProgramRepository._build_programs_export_query(params))
@@ -3,6 +3,8 @@ from .controllers import ProgramController
 
 from flask_jwt_extended import jwt_required
 
+from app.utils import etag_from_table_versions
+
 program_bp = Blueprint("program_bp", __name__)
 
 @program_bp.route("/<string:program_code>", methods=["GET"])
@@ -39,7 +41,7 @@ def get_program_details(program_code: str) -> tuple[Response, int]:
 
 @program_bp.route("/total-count", methods=["GET"])
 @jwt_required()
-def get_total_program_count() -> tuple[Response, int]:
+async def get_total_program_count() -> tuple[Response, int]:
     """
     Retrieve the total number of programs based on optional search filters.
 
@@ -66,15 +68,16 @@ def get_total_program_count() -> tuple[Response, int]:
         500 if an unexpected error occurs during processing.
     """
     
-    return ProgramController.get_total_program_count_controller()
+    return await ProgramController.get_total_program_count_controller()
 
 @program_bp.route("/", methods=["GET"])
 @jwt_required()
-def get_many_programs() -> tuple[Response, int]:
+@etag_from_table_versions("programs")
+async def get_many_programs() -> tuple[Response, int]:
     """
     Retrieve details of different programs based on pagination, optional search and sort filters.
 
-    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns the details of different programs, filtered by pagination and optionally by search and sort. 
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns the details of different programs, filtered by pagination and optionally by search and sort. The response carries an ETag, and a request whose If-None-Match matches it gets a 304 without the query being run.
 
     Query parameters:
 
@@ -92,6 +95,12 @@ def get_many_programs() -> tuple[Response, int]:
 
         sortOrder: The order of sort to perform, such as "Ascending", and "Descending".
 
+        cursor: Opts into keyset pagination when present, replacing pageNumber (optional). Pass an empty value for the first page, then the nextCursor of the previous response.
+
+        includeTotalCount: If "true", totalCount is returned along with the page in a single query (optional, cannot be combined with cursor).
+
+        estimateCount: If "true" together with includeTotalCount, totalCount comes from planner statistics when no search or filter is applied (optional).
+
     Request body:
 
         None. This endpoint does not require any input data.
@@ -106,12 +115,57 @@ def get_many_programs() -> tuple[Response, int]:
 
             collegeCode: The identifier of the program in which this program belongs to.
 
+        nextCursor: The cursor of the next page, or null on the last page. Only included when cursor is provided.
+
+        totalCount: The total number of matching records. Only included when includeTotalCount is "true".
+
     Possible errors:
 
+        400 if cursor is malformed or was issued for a different sortField or sortOrder.
+
+        400 if both cursor and includeTotalCount are provided.
+
         500 if an unexpected error occurs during processing.
     """
 
-    return ProgramController.get_many_programs_controller()
+    return await ProgramController.get_many_programs_controller()
+
+@program_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_programs() -> tuple[Response, int]:
+    """
+    Export every program matching optional search and sort filters.
+
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). Rows are read through a 
+    server-side cursor and streamed to the client as they are fetched, so the whole table is never held in memory.
+
+    Query parameters:
+
+        format: "csv" (default) or "ndjson".
+
+        searchValue: The value to search for (optional).
+
+        searchBy: The field to search by, required with searchValue. One of ['Program Code', 'Program Name', 'College Code'].
+
+        searchType: "Starts With", "Contains" or "Ends With", required with searchValue.
+
+        sortField: The field to sort by (default: "Program Code").
+
+        sortOrder: "Ascending" (default) or "Descending".
+
+    Response:
+
+        A file download. CSV exports start with a header row of camelCase column names, which the import accepts 
+        as is. NDJSON exports contain one JSON object per line.
+
+    Possible errors:
+
+        400 if a query parameter is invalid.
+
+        500 if an unexpected error occurs before the export starts.
+    """
+
+    return ProgramController.export_programs_controller()
 
 @program_bp.route("/", methods=["POST"])
 @jwt_required()
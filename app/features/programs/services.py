@@ -1,9 +1,18 @@
+from flask import current_app
+
 from .repository import ProgramRepository
 
 from app.features.common.dataclasses import Program
 
+from app.utils import encode_cursor, stream_export
+
 from app.exceptions.custom_exceptions import EntityNotFoundError
 
+from typing import Iterator
+
+# Columns of the program export, in order
+PROGRAM_EXPORT_COLUMNS = ("program_code", "program_name", "college_code")
+
 class ProgramServices:
 
     @staticmethod
@@ -18,15 +27,26 @@ class ProgramServices:
             Program: A Program dataclass instance if a program has the given program_code, otherwise None.
         """
 
-        row = ProgramRepository.get_program_by_program_code(program_code)
+        program = ProgramRepository.get_program_by_program_code(program_code)
+
+        if not program:
+            raise EntityNotFoundError(f"Program with the program_code '{program_code}' does not exist.")
+
+        return program
+
+    @staticmethod
+    async def get_program_details_service_async(program_code: str) -> Program:
+        """Async variant of get_program_details_service."""
+
+        program = await ProgramRepository.get_program_by_program_code_async(program_code)
 
-        if not row:
+        if not program:
             raise EntityNotFoundError(f"Program with the program_code '{program_code}' does not exist.")
 
-        return Program(**row)
+        return program
 
     @staticmethod
-    def get_total_program_count_service(params) -> int:
+    async def get_total_program_count_service(params) -> int:
         """
         Retrieve the total program count, with optional search filters.
 
@@ -41,10 +61,10 @@ class ProgramServices:
             int: The total program count, with search filters being optionally applied.
         """
 
-        return ProgramRepository.get_total_program_count(params)["count"]
+        return (await ProgramRepository.get_total_program_count_async(params))["count"]
 
     @staticmethod
-    def get_many_programs_service(params) -> list[Program]:
+    async def get_many_programs_service(params) -> list[Program]:
         """
         Retrieve details of different programs based on pagination, optional search and sort filters.
         
@@ -63,17 +83,64 @@ class ProgramServices:
             list[Program]: A list of program dataclass instances representing rowsPerPage programs.
         """
 
-        programs = ProgramRepository.get_many_programs(params)
+        return await ProgramRepository.get_many_programs_async(params)
 
-        program_dataclasses = []
+    @staticmethod
+    async def get_many_programs_with_count_service(params) -> tuple[list[Program], int]:
+        """
+        Retrieve a page of programs together with the total number of matching programs in a single query.
 
-        for program in programs:
-            if not program['college_code']:
-                program['college_code'] = 'N/A'
+        Args:
+            params (dict): The same keys as get_many_programs_service, plus:
+                - "estimate_count" (bool): Use the planner's row estimate instead of an exact count when no search or filter is applied.
+
+        Returns:
+            tuple[list[Program], int]: The program dataclass instances of the page, and the total program count.
+        """
+
+        # The planner estimate only stands in for the count when nothing is filtered out
+        estimate_count = params["estimate_count"] and not (params["search_value"])
+
+        rows = await ProgramRepository.get_many_programs_with_count_async(params, estimate_count)
 
-            program_dataclasses.append(Program(**program))
+        if rows and rows[0][1] is not None:
+            total_count = rows[0][1]
 
-        return program_dataclasses
+        else:
+            # Past the last page, or no planner statistics yet, so count exactly using the first row instead
+            first_row = await ProgramRepository.get_many_programs_with_count_async({**params, "page_number": 1, "rows_per_page": 1})
+
+            total_count = first_row[0][1] if first_row else 0
+
+        return [program for program, _ in rows], total_count
+
+    @staticmethod
+    async def get_many_programs_by_cursor_service(params) -> tuple[list[Program], str | None]:
+        """
+        Retrieve a page of programs using keyset (cursor) pagination.
+
+        Args:
+            params (dict): The same keys as get_many_programs_service, with "cursor" (list | None) in place of "page_number".
+
+        Returns:
+            tuple[list[Program], str | None]: The program dataclass instances of the page, and the cursor of the 
+            next page (None if this is the last page).
+        """
+
+        rows = await ProgramRepository.get_many_programs_by_cursor_async(params)
+
+        has_next_page = len(rows) > params["rows_per_page"]
+
+        rows = rows[:params["rows_per_page"]]
+
+        next_cursor = None
+
+        if has_next_page and rows:
+            # The raw sort value is used (the program itself is formatted for display) so the next page can seek on it
+            last_program, last_sort_value = rows[-1]
+            next_cursor = encode_cursor(params["sort_field"], params["sort_order"], [last_sort_value or "", last_program.program_code])
+
+        return [program for program, _ in rows], next_cursor
 
     @staticmethod
     def create_program_service(program_data) -> None:
@@ -101,6 +168,9 @@ class ProgramServices:
 
         ProgramRepository.delete_programs(program_codes)
 
+        # Students follow their program through ON UPDATE CASCADE / ON DELETE SET NULL
+        current_app.extensions['demographics_cache'].invalidate()
+
     @staticmethod
     def edit_program_details_service(program_code: str, new_program_data) -> None:
         """
@@ -117,6 +187,9 @@ class ProgramServices:
 
         ProgramRepository.edit_program_details(program_code, new_program_data)
 
+        # Students follow their program through ON UPDATE CASCADE / ON DELETE SET NULL
+        current_app.extensions['demographics_cache'].invalidate()
+
     @staticmethod
     def get_program_codes_service() -> list[dict[str, str | list[str]]]:
         """
@@ -156,4 +229,18 @@ class ProgramServices:
         
         # Return list of values of the dict
         return list(grouped_program_codes.values())
-    
\ No newline at end of file
+
+    @staticmethod
+    def export_programs_service(params, export_format: str) -> Iterator[str]:
+        """
+        Export every program matching the search filters, in sort order, as a stream of CSV or NDJSON chunks.
+
+        Args:
+            params (dict): The same search and sort keys as get_many_programs_service, without the pagination keys.
+            export_format (str): "csv" or "ndjson".
+
+        Returns:
+            Iterator[str]: The chunks of the export. Values are exported as stored, not as formatted for display.
+        """
+
+        return stream_export(ProgramRepository.stream_programs(params), PROGRAM_EXPORT_COLUMNS, export_format)
@@ -1,5 +1,5 @@
-from flask import request, jsonify, Response
-from dataclasses import asdict
+from flask import current_app, request, jsonify, Response, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 
 import traceback
 
@@ -13,13 +13,35 @@ from ..colleges.services import CollegeServices
 
 from ..common.dataclasses.student import Student
 
-from app.utils import dict_keys_to_camel, validate_id_number, validate_name, validate_year_level, validate_gender, validate_program_code, validate_college_code
+from app.utils import EntitySerializer, decode_cursor, validate_id_number, validate_name, validate_year_level, validate_gender, validate_program_code, validate_college_code, validate_avatar_size, validate_avatar_image, EXPORT_FORMATS
 
 from app.exceptions.custom_exceptions import EntityNotFoundError, InvalidParameterError, ValidationError
 
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
 
+STUDENT_SERIALIZER = EntitySerializer(Student)
+
+# Room left in a student form request for the text fields and multipart headers around the avatar, in bytes
+AVATAR_FORM_OVERHEAD = 64 * 1024
+
 class StudentController:
+
+    @staticmethod
+    def _limit_avatar_request_size() -> None:
+        """
+        Cap the size of a student form request by the largest avatar accepted.
+
+        Must run before request.form or request.files is accessed, so that werkzeug rejects an oversized
+        body from its Content-Length before parsing, and stops reading a chunked body once it goes over.
+        """
+
+        request.max_content_length = current_app.config["AVATAR_MAX_SIZE"] + AVATAR_FORM_OVERHEAD
+
+    @staticmethod
+    def _avatar_too_large_response() -> tuple[Response, int]:
+        """Build the response for a student form request over the size limit."""
+
+        return jsonify({"error": f"Avatar must not be larger than {current_app.config['AVATAR_MAX_SIZE'] // 1024} KB."}), 413
  
     @staticmethod
     def get_student_details_controller(id_number: str) -> tuple[Response, int]:
@@ -30,7 +52,7 @@ class StudentController:
 
             student_details: Student = StudentServices.get_student_details_service(id_number.strip())
 
-            return jsonify(dict_keys_to_camel(asdict(student_details))), 200
+            return jsonify(STUDENT_SERIALIZER.serialize(student_details)), 200
 
         except EntityNotFoundError as e:
             traceback.print_exc()
@@ -49,7 +71,7 @@ class StudentController:
             return jsonify({"error": "An unexpected error occurred."}), 500
     
     @staticmethod
-    def get_total_student_count_controller() -> tuple[Response, int]:
+    async def get_total_student_count_controller() -> tuple[Response, int]:
         """Retrieve the total number of students based on optional search filters."""
 
         ALLOWED_SEARCH_BY = {"ID Number", "First Name", "Last Name", "Gender", "Year Level", "Program Code"}
@@ -119,7 +141,7 @@ class StudentController:
             if sum(bool(x) for x in [params["search_value"], params["program_code"], params["college_code"]]) > 1:
                 raise InvalidParameterError("Only one should exist at a time between 'searchValue', 'programCode', and 'collegeCode'.")
 
-            total_student_count: int = StudentServices.get_total_student_count_service(params)
+            total_student_count: int = await StudentServices.get_total_student_count_service(params)
 
             return jsonify({"totalCount": total_student_count}), 200
         
@@ -132,7 +154,7 @@ class StudentController:
             return jsonify({"error": "An unexpected error occurred."}), 500
 
     @staticmethod
-    def get_many_students_controller() -> tuple[Response, int]:
+    async def get_many_students_controller() -> tuple[Response, int]:
         """Retrieve details of different students based on pagination, optional search and sort filters."""
 
         ALLOWED_SEARCH_BY = {"ID Number", "First Name", "Last Name", "Year Level", "Gender", "Program Code"}
@@ -151,7 +173,10 @@ class StudentController:
             "filter_by_year_level": request.args.get("filterByYearLevel"),
             "filter_by_program_code": request.args.get("filterByProgramCode"),
             "sort_field": request.args.get("sortField"),
-            "sort_order":request.args.get("sortOrder")
+            "sort_order":request.args.get("sortOrder"),
+            "cursor": request.args.get("cursor"),
+            "include_total_count": request.args.get("includeTotalCount", "false").lower() == "true",
+            "estimate_count": request.args.get("estimateCount", "false").lower() == "true"
             }
 
             if params['rows_per_page'] < 0:
@@ -172,9 +197,25 @@ class StudentController:
             if params["sort_order"] not in ALLOWED_SORT_ORDER:
                 raise InvalidParameterError(f"Invalid 'sortOrder' value: '{params["sort_order"]}'. Must be one of: ['Ascending', 'Descending'].")
 
-            students = StudentServices.get_many_students_service(params)
+            if params["include_total_count"] and params["cursor"] is not None:
+                raise InvalidParameterError("'includeTotalCount' cannot be combined with 'cursor'.")
+
+            if params["include_total_count"]:
+                students, total_count = await StudentServices.get_many_students_with_count_service(params)
+
+                return jsonify({"entities": STUDENT_SERIALIZER.serialize_many(students), "totalCount": total_count}), 200
+
+            # Keyset pagination is opt-in, an empty cursor requests the first page
+            if params["cursor"] is not None:
+                params["cursor"] = decode_cursor(params["cursor"], params["sort_field"], params["sort_order"])
+
+                students, next_cursor = await StudentServices.get_many_students_by_cursor_service(params)
+
+                return jsonify({"entities": STUDENT_SERIALIZER.serialize_many(students), "nextCursor": next_cursor}), 200
+
+            students = await StudentServices.get_many_students_service(params)
 
-            return jsonify({"entities": [dict_keys_to_camel(asdict(student_details)) for student_details in students]}), 200
+            return jsonify({"entities": STUDENT_SERIALIZER.serialize_many(students)}), 200
         
         except InvalidParameterError as e:
             traceback.print_exc()
@@ -196,6 +237,8 @@ class StudentController:
         new_student_data = {}
 
         try:
+            StudentController._limit_avatar_request_size()
+
             new_student_data = {
                 "id_number": request.form.get("idNumber", "-"),
                 "first_name": request.form.get("firstName", "-"),
@@ -206,6 +249,10 @@ class StudentController:
             }
 
             student_avatar = request.files.get('avatar')
+
+            if student_avatar:
+                validate_avatar_size(student_avatar, current_app.config["AVATAR_MAX_SIZE"])
+                validate_avatar_image(student_avatar)
             
             validate_id_number(new_student_data['id_number'])
 
@@ -230,6 +277,10 @@ class StudentController:
 
             return jsonify({"message": "Student added successfully."}), 200
 
+        except RequestEntityTooLarge:
+            traceback.print_exc()
+            return StudentController._avatar_too_large_response()
+
         except UniqueViolation as e:
             traceback.print_exc()
 
@@ -260,6 +311,39 @@ class StudentController:
             traceback.print_exc()
             return jsonify({"error": "An unexpected error occurred."}), 500
 
+    @staticmethod
+    def import_students_controller() -> tuple[Response, int]:
+        """Bulk import students from an uploaded CSV file."""
+
+        try:
+            csv_file = request.files.get("file")
+
+            if csv_file:
+                csv_stream = csv_file.stream
+
+            # A raw text/csv body is read straight from the socket without being spooled first
+            elif request.mimetype == "text/csv":
+                csv_stream = request.stream
+
+            else:
+                raise ValidationError("A CSV file must be uploaded in the 'file' field, or sent as a text/csv body.")
+
+            import_summary = StudentServices.import_students_service(csv_stream)
+
+            return jsonify(import_summary), 200
+
+        except UnicodeDecodeError as e:
+            traceback.print_exc()
+            return jsonify({"error": "The CSV file must be UTF-8 encoded."}), 400
+
+        except ValidationError as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 400
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred."}), 500
+
     @staticmethod
     def delete_students_controller() -> tuple[Response, int]:
         """Delete student record(s) given a single ID or a list of IDs."""
@@ -300,6 +384,8 @@ class StudentController:
         new_student_data = {}
 
         try:
+            StudentController._limit_avatar_request_size()
+
             new_student_data = {
                 "existing_avatar_url": request.form.get("existingAvatarUrl"),
                 "id_number": request.form.get("idNumber", "-"),
@@ -312,6 +398,10 @@ class StudentController:
 
             new_student_avatar = request.files.get('avatar')
 
+            if new_student_avatar:
+                validate_avatar_size(new_student_avatar, current_app.config["AVATAR_MAX_SIZE"])
+                validate_avatar_image(new_student_avatar)
+
             validate_id_number(id_number)
 
             id_number = id_number.strip()
@@ -342,6 +432,10 @@ class StudentController:
 
             return jsonify({"message": "Student edited successfully."}), 200
         
+        except RequestEntityTooLarge:
+            traceback.print_exc()
+            return StudentController._avatar_too_large_response()
+
         except UniqueViolation as e:
             traceback.print_exc()
 
@@ -377,7 +471,7 @@ class StudentController:
             return jsonify({"error": str(e)}), 500
         
     @staticmethod
-    def get_year_level_demographics_controller() -> tuple[Response, int]:
+    async def get_year_level_demographics_controller() -> tuple[Response, int]:
         """Retrieve student year-level demographics."""
 
         try:
@@ -391,17 +485,17 @@ class StudentController:
 
             if params['program_code']:
                 params['program_code'] = params['program_code'].strip().upper()
-                ProgramServices.get_program_details_service(params['program_code'])
+                await ProgramServices.get_program_details_service_async(params['program_code'])
             
             if params['college_code']:
                 params['college_code'] = params['college_code'].strip().upper()
-                CollegeServices.get_college_details_service(params['college_code'])
+                await CollegeServices.get_college_details_service_async(params['college_code'])
 
             # Only one of these should be present at a time
             if sum(bool(x) for x in [params["program_code"], params["college_code"]]) > 1:
                 raise InvalidParameterError("Only one should exist at a time between 'programCode', and 'collegeCode'.")
 
-            year_level_demographics = StudentServices.get_year_level_demographics_service(params)
+            year_level_demographics = await StudentServices.get_year_level_demographics_service(params)
 
             return jsonify(year_level_demographics), 200
         
@@ -422,7 +516,7 @@ class StudentController:
             return jsonify({"error": "An unexpected error occurred."}), 500
         
     @staticmethod
-    def get_gender_demographics_controller() -> tuple[Response, int]:
+    async def get_gender_demographics_controller() -> tuple[Response, int]:
         """Retrieve student gender demographics."""
 
         try:
@@ -436,17 +530,17 @@ class StudentController:
 
             if params['program_code']:
                 params['program_code'] = params['program_code'].strip().upper()
-                ProgramServices.get_program_details_service(params['program_code'])
+                await ProgramServices.get_program_details_service_async(params['program_code'])
             
             if params['college_code']:
                 params['college_code'] = params['college_code'].strip().upper()
-                CollegeServices.get_college_details_service(params['college_code'])
+                await CollegeServices.get_college_details_service_async(params['college_code'])
 
             # Only one of these should be present at a time
             if sum(bool(x) for x in [params["program_code"], params["college_code"]]) > 1:
                 raise InvalidParameterError("Only one should exist at a time between 'programCode', and 'collegeCode'.")
 
-            gender_demographics = StudentServices.get_gender_demographics_service(params)
+            gender_demographics = await StudentServices.get_gender_demographics_service(params)
 
             return jsonify(gender_demographics), 200
 
@@ -465,4 +559,107 @@ class StudentController:
         except Exception as e:
             traceback.print_exc()
             return jsonify({"error": "An unexpected error occurred."}), 500
-        
\ No newline at end of file
+                
+    @staticmethod
+    async def get_statistics_controller() -> tuple[Response, int]:
+        """Retrieve the total, year-level and gender student counts in a single response."""
+
+        ALLOWED_GROUP_BY = {"program", "college"}
+
+        try:
+            params = {
+                "program_code": request.args.get("programCode") or "",
+                "college_code": request.args.get("collegeCode") or "",
+                "group_by": request.args.get("groupBy") or "",
+            }
+
+            if params["group_by"] and params["group_by"] not in ALLOWED_GROUP_BY:
+                raise InvalidParameterError(f"Invalid 'groupBy' value: '{params["group_by"]}'. Must be one of: ['program', 'college'].")
+
+            validate_program_code(params["program_code"], can_be_none=True)
+            validate_college_code(params["college_code"], can_be_none=True)
+
+            # Only one of these should be present at a time
+            if sum(bool(x) for x in [params["program_code"], params["college_code"], params["group_by"]]) > 1:
+                raise InvalidParameterError("Only one should exist at a time between 'programCode', 'collegeCode', and 'groupBy'.")
+
+            if params['program_code']:
+                params['program_code'] = params['program_code'].strip().upper()
+                await ProgramServices.get_program_details_service_async(params['program_code'])
+            
+            if params['college_code']:
+                params['college_code'] = params['college_code'].strip().upper()
+                await CollegeServices.get_college_details_service_async(params['college_code'])
+
+            statistics = await StudentServices.get_statistics_service(params)
+
+            return jsonify(statistics), 200
+
+        except EntityNotFoundError as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 400
+
+        except InvalidParameterError as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 400
+        
+        except ValidationError as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 400
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred."}), 500
+
+    @staticmethod
+    def export_students_controller() -> tuple[Response, int]:
+        """Stream every student matching optional search and sort filters as a CSV or NDJSON file."""
+
+        ALLOWED_SEARCH_BY = {"ID Number", "First Name", "Last Name", "Year Level", "Gender", "Program Code"}
+        ALLOWED_SEARCH_TYPE = {"Starts With", "Contains", "Ends With"}
+        ALLOWED_SORT_FIELD = {"ID Number", "First Name", "Last Name", "Year Level", "Gender", "Program Code"}
+        ALLOWED_SORT_ORDER = {"Ascending", "Descending"}
+
+        try:
+            params = {
+                "search_value": (request.args.get("searchValue") or "").strip(),
+                "search_by": request.args.get("searchBy"),
+                "search_type": request.args.get("searchType"),
+                "filter_by_gender": request.args.get("filterByGender"),
+                "filter_by_year_level": request.args.get("filterByYearLevel"),
+                "filter_by_program_code": request.args.get("filterByProgramCode"),
+                "sort_field": request.args.get("sortField", "ID Number"),
+                "sort_order": request.args.get("sortOrder", "Ascending"),
+            }
+
+            export_format = request.args.get("format", "csv").lower()
+
+            if export_format not in EXPORT_FORMATS:
+                raise InvalidParameterError(f"Invalid 'format' value: '{export_format}'. Must be one of: ['csv', 'ndjson'].")
+
+            # searchBy and searchType only matter when there is something to search for
+            if params["search_value"] and params['search_by'] not in ALLOWED_SEARCH_BY:
+                raise InvalidParameterError(f"Invalid 'searchBy' value: '{params['search_by']}'. Must be one of: ['ID Number', 'First Name', 'Last Name', 'Year Level', 'Gender', 'Program Code'].")
+
+            if params["search_value"] and params["search_type"] not in ALLOWED_SEARCH_TYPE:
+                raise InvalidParameterError(f"Invalid 'searchType' value: '{params["search_type"]}'. Must be one of: ['Starts With', 'Contains', 'Ends With'].")
+            
+            if params['sort_field'] not in ALLOWED_SORT_FIELD:
+                raise InvalidParameterError(f"Invalid 'sortField' value: '{params['sort_field']}'. Must be one of: ['ID Number', 'First Name', 'Last Name', 'Year Level', 'Gender', 'Program Code'].")
+
+            if params["sort_order"] not in ALLOWED_SORT_ORDER:
+                raise InvalidParameterError(f"Invalid 'sortOrder' value: '{params["sort_order"]}'. Must be one of: ['Ascending', 'Descending'].")
+
+            chunks = StudentServices.export_students_service(params, export_format)
+
+            return Response(stream_with_context(chunks), 
+                            mimetype=EXPORT_FORMATS[export_format], 
+                            headers={"Content-Disposition": f"attachment; filename=students.{export_format}"}), 200
+
+        except InvalidParameterError as e:
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 400
+
+        except Exception as e:
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred."}), 500
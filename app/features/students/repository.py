@@ -1,13 +1,34 @@
 from app.db.connection import Database
 from app.db.queries.students import StudentQueries
 from app.db.queries.common import CommonQueries
+from app.db.query_builder import ENTITY_COLUMNS, EMPTY, build_sort_order, build_total_count_column, build_where_clause
+from app.db.query_registry import iter_unfiltered_list_params
+from app.db.row_factories import entity_row
+from app.db.search_planner import build_search_conditions, build_enum_filter_condition
+
+from app.features.common.dataclasses import Student
 
 from flask import current_app
+from psycopg import Cursor, sql
+from psycopg.abc import Query
+from psycopg.rows import RowFactory
+
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+# Students are listed with a capitalized gender, and with "N/A" in place of a missing program
+STUDENT_LIST_NORMALIZERS = {"gender": str.capitalize, "program_code": lambda program_code: program_code or "N/A"}
+
+STUDENT_ROW = entity_row(Student)
+STUDENT_LIST_ROW = entity_row(Student, STUDENT_LIST_NORMALIZERS)
+STUDENT_LIST_WITH_COUNT_ROW = entity_row(Student, STUDENT_LIST_NORMALIZERS, extra_columns=("total_count",))
+
+STUDENT_COLUMNS = ENTITY_COLUMNS["students"]
 
 class StudentRepository:
 
     @staticmethod
-    def get_student_by_id(id_number: str) -> dict[str, str] | None:
+    def get_student_by_id(id_number: str) -> Student | None:
         """
         Retrieve a student record from the database by ID number.
 
@@ -15,12 +36,52 @@ class StudentRepository:
             id_number (str): The unique ID number of the student.
 
         Returns:
-            dict: A dictionary containing the student's details if found, otherwise None.
+            Student | None: The student if found, otherwise None.
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
+
+        return db.fetch_one(queries.get(CommonQueries.GET_BY_ID, table="students", pk="id_number"), (id_number, ), STUDENT_ROW, prepare=True)
+
+    @staticmethod
+    def _build_student_conditions(params) -> tuple[list[sql.Composable], list]:
+        """Build the search and filter conditions shared by the student list and count queries."""
+
+        conditions, values = build_search_conditions("students", params)
+
+        if params["filter_by_gender"]:
+            condition, value = build_enum_filter_condition("gender", params["filter_by_gender"])
+            conditions.append(condition)
+            values.append(value)
+
+        if params["filter_by_year_level"]:
+            condition, value = build_enum_filter_condition("year_level", params["filter_by_year_level"])
+            conditions.append(condition)
+            values.append(value)
+
+        if params["filter_by_program_code"]:
+            conditions.append(sql.SQL("{} = %s").format(sql.Identifier("program_code")))
+            values.append(params["filter_by_program_code"].strip().upper())
 
-        return db.fetch_one(CommonQueries.GET_BY_ID.format(table="students", pk="id_number"), (id_number, ))
+        return conditions, values
+
+    @staticmethod
+    def _build_total_student_count_query(params) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by get_total_student_count and its async variant."""
+
+        if params["program_code"]:
+            return StudentQueries.GET_TOTAL_COUNT_FROM_PROGRAM_CODE, (params["program_code"],)
+        
+        elif params["college_code"]:
+            return StudentQueries.GET_TOTAL_COUNT_FROM_COLLEGE_CODE, (params["college_code"],)
+
+        queries = current_app.extensions['query_registry']
+
+        conditions, values = StudentRepository._build_student_conditions(params)
+
+        return (queries.get(CommonQueries.GET_TOTAL_COUNT_WHERE, table="students", where_clause=build_where_clause(conditions)),
+                tuple(values))
 
     @staticmethod
     def get_total_student_count(params) -> dict[str, int]:
@@ -41,45 +102,51 @@ class StudentRepository:
 
         db = current_app.extensions['db']
 
-        if params["search_value"]:
+        return db.fetch_one(*StudentRepository._build_total_student_count_query(params), prepare=True)
 
-            if params["search_type"] == "Starts With":
-                search_pattern = f"{params["search_value"]}%"
-            elif params["search_type"] == "Ends With":
-                search_pattern = f"%{params["search_value"]}"
-            elif params["search_type"] == "Contains":
-                search_pattern = f"%{params["search_value"]}%"
-            else:
-                search_pattern = params["search_value"]
+    @staticmethod
+    async def get_total_student_count_async(params) -> dict[str, int]:
+        """Async variant of get_total_student_count."""
 
-            gender = params["filter_by_gender"] or "%"
-            year = params["filter_by_year_level"] or "%"
-            program_code = params["filter_by_program_code"] or "%"
+        async_db = current_app.extensions['async_db']
 
-            return db.fetch_one(CommonQueries.GET_TOTAL_COUNT_WITH_SEARCH_STUDENTS.format(table="students", search_by=f"{params["search_by"].lower().replace(' ', '_')}"),
-                                (search_pattern, gender, year, program_code))
-        
-        elif params["program_code"]:
-            return db.fetch_one(StudentQueries.GET_TOTAL_COUNT_FROM_PROGRAM_CODE, (params["program_code"],))
-        
-        elif params["college_code"]:
-            return db.fetch_one(StudentQueries.GET_TOTAL_COUNT_FROM_COLLEGE_CODE, (params["college_code"],))
+        return await async_db.fetch_one(*StudentRepository._build_total_student_count_query(params), prepare=True)
+
+    @staticmethod
+    def _build_many_students_query(params, count_column: sql.Composable = EMPTY) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by get_many_students and its async variant."""
+
+        queries = current_app.extensions['query_registry']
+
+        conditions, values = StudentRepository._build_student_conditions(params)
+        sort_order, _ = build_sort_order(params["sort_order"])
 
-        else:
+        offset = 0 if params["page_number"] <= 0 else (params["page_number"] - 1) * params["rows_per_page"]
+
+        return (queries.get(CommonQueries.GET_MANY,
+                            table="students",
+                            count_column=count_column,
+                            where_clause=build_where_clause(conditions),
+                            sort_field=STUDENT_COLUMNS.column(params["sort_field"]),
+                            sort_order=sort_order),
+                (*values, params["rows_per_page"], offset))
+
+    @staticmethod
+    def warm_up_queries() -> None:
+        """Build the count query and the first-page list queries of every sort into the QueryRegistry."""
 
-            gender = params["filter_by_gender"] or "%"
-            year = params["filter_by_year_level"] or "%"
-            program_code = params["filter_by_program_code"] or "%"
+        for params in iter_unfiltered_list_params(STUDENT_COLUMNS.columns, filter_by_gender=None, filter_by_year_level=None, filter_by_program_code=None,
+                                                  program_code="", college_code=""):
+            StudentRepository._build_many_students_query(params)
+            StudentRepository._build_many_students_keyset_query(params)
 
-            print("----------------------------------")
-            print(gender)
-            print(year)
-            print(program_code)
+            for estimate_count in (False, True):
+                StudentRepository._build_many_students_query(params, StudentRepository._get_total_count_column(estimate_count))
 
-            return db.fetch_one(CommonQueries.GET_TOTAL_COUNT_STUDENTS.format(table="students"), (gender, year, program_code))
+        StudentRepository._build_total_student_count_query(params)
 
     @staticmethod
-    def get_many_students(params) -> list[dict[str, str]]:
+    def get_many_students(params) -> list[Student]:
         """
         Retrieve a paginated list of students based on search and sorting parameters.
 
@@ -94,39 +161,95 @@ class StudentRepository:
                 - "rows_per_page" (int): Number of records to retrieve per page.
 
         Returns:
-            list[dict]: A list of student records matching the given filters, 
-            where each record is represented as a dictionary.
+            list[Student]: The students matching the given filters, with the gender capitalized and "N/A" for a missing program.
         """
             
         db = current_app.extensions['db']
 
-        if params["search_type"] == "Starts With":
-            search_pattern = f"{params["search_value"]}%"
-        elif params["search_type"] == "Ends With":
-            search_pattern = f"%{params["search_value"]}"
-        elif params["search_type"] == "Contains":
-            search_pattern = f"%{params["search_value"]}%"
-        else:
-            search_pattern = params["search_value"]
+        return db.fetch_all(*StudentRepository._build_many_students_query(params), STUDENT_LIST_ROW, prepare=True)
 
-        if params["sort_order"] == "Ascending":
-            sort_order = "ASC"
-        else:
-            sort_order = "DESC"
+    @staticmethod
+    async def get_many_students_async(params) -> list[Student]:
+        """Async variant of get_many_students."""
 
-        offset = 0 if params["page_number"] <= 0 else (params["page_number"] - 1) * params["rows_per_page"]
+        async_db = current_app.extensions['async_db']
 
-        gender = params["filter_by_gender"] or "%"
-        year = params["filter_by_year_level"] or "%"
-        program_code = params["filter_by_program_code"] or "%"
+        return await async_db.fetch_all(*StudentRepository._build_many_students_query(params), STUDENT_LIST_ROW, prepare=True)
 
+    @staticmethod
+    async def get_many_students_with_count_async(params, estimate_count: bool = False) -> list[tuple[Student, int | None]]:
+        """
+        Retrieve a paginated list of students like get_many_students, along with the total number of matching students.
+
+        Args:
+            params (dict): The same keys as get_many_students.
+            estimate_count (bool): Use the planner's row estimate for the table instead of an exact count. 
+            Only accurate when no search or filter is applied.
+
+        Returns:
+            list[tuple[Student, int | None]]: The students of the page, each paired with the total count. With estimate_count, 
+            the total count is None when the table has never been analyzed.
+        """
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*StudentRepository._build_many_students_query(params, StudentRepository._get_total_count_column(estimate_count)), STUDENT_LIST_WITH_COUNT_ROW, prepare=True)
 
-        return db.fetch_all(CommonQueries.GET_MANY_STUDENTS
-                            .format(table="students", 
-                                    search_by=f"{params["search_by"].lower().replace(' ', '_')}",
-                                    sort_field=f"{params["sort_field"].lower().replace(' ', '_')}",
-                                    sort_order=sort_order),
-                            (search_pattern, gender, year, program_code, params["rows_per_page"], offset))
+    @staticmethod
+    def _get_total_count_column(estimate_count: bool) -> sql.Composable:
+        """Return the extra column that adds the exact or estimated total count to every row of a page."""
+
+        return build_total_count_column("students", estimate_count)
+
+    @staticmethod
+    def _build_many_students_keyset_query(params) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by get_many_students_by_cursor_async."""
+
+        queries = current_app.extensions['query_registry']
+
+        conditions, values = StudentRepository._build_student_conditions(params)
+        sort_order, comparator = build_sort_order(params["sort_order"])
+
+        # program_code is nullable, so it is coalesced and the row comparison in the seek predicate never sees NULL
+        sort_key = STUDENT_COLUMNS.sort_key(STUDENT_COLUMNS.column(params["sort_field"]))
+
+        if params["cursor"]:
+            conditions.append(sql.SQL(CommonQueries.KEYSET_SEEK).format(sort_key=sort_key, pk=sql.Identifier("id_number"), comparator=comparator))
+            values.extend(params["cursor"])
+
+        # Fetch one extra row to find out whether a next page exists
+        return (queries.get(CommonQueries.GET_MANY_KEYSET,
+                            table="students",
+                            where_clause=build_where_clause(conditions),
+                            sort_key=sort_key,
+                            pk="id_number",
+                            sort_order=sort_order),
+                (*values, params["rows_per_page"] + 1))
+
+    @staticmethod
+    def _get_keyset_row_factory(params) -> RowFactory:
+        """Return the row factory of a keyset page, which pairs each student with the raw value of its sort column for the next cursor."""
+
+        return entity_row(Student, STUDENT_LIST_NORMALIZERS, extra_columns=(STUDENT_COLUMNS.column(params["sort_field"]),))
+
+    @staticmethod
+    async def get_many_students_by_cursor_async(params) -> list[tuple[Student, str | None]]:
+        """
+        Retrieve a page of students using keyset (cursor) pagination instead of OFFSET.
+
+        Args:
+            params (dict): The same keys as get_many_students, except "page_number" which is replaced by:
+                - "cursor" (list | None): The [sort_value, id_number] pair of the last row of the previous page, 
+                or None for the first page.
+
+        Returns:
+            list[tuple[Student, str | None]]: Up to "rows_per_page" + 1 students, each paired with the raw value of its sort column. 
+            The extra student is only present when there is a next page.
+        """
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*StudentRepository._build_many_students_keyset_query(params), StudentRepository._get_keyset_row_factory(params), prepare=True)
 
     @staticmethod
     def create_student(student_data) -> None:
@@ -153,20 +276,6 @@ class StudentRepository:
                                                      (student_data["id_number"], student_data["first_name"], student_data["last_name"],
                                                       student_data["year_level"], student_data["gender"], student_data["program_code"]))
 
-    @staticmethod
-    def delete_students(id_numbers: list[str]) -> None:
-        """
-        Delete student records from the database using their ID numbers.
-
-        Args:
-            id_numbers (list[str]): A list of unique ID numbers of the students to delete.
-
-        """
-
-        db = current_app.extensions['db']
-
-        db.execute_query(CommonQueries.DELETE_BY_ID.format(table="students", pk="id_number"), (id_numbers, ))
-
     @staticmethod
     def edit_student_details(id_number: str, new_student_data) -> None:
         """
@@ -195,7 +304,31 @@ class StudentRepository:
                                                             id_number))  
 
     @staticmethod
-    def get_year_level_demographics(params) -> list[dict[str, str]]:
+    def _build_year_level_demographics_query(params) -> tuple[str, tuple | None]:
+        """Build the query and its parameters used by get_year_level_demographics_async."""
+
+        if params["program_code"]:
+            return StudentQueries.GET_YEAR_LEVEL_DEMOGRAPHICS_FROM_PROGRAM_CODE, (params["program_code"], )
+        
+        elif params["college_code"]:
+            return StudentQueries.GET_YEAR_LEVEL_DEMOGRAPHICS_FROM_COLLEGE_CODE, (params["college_code"], )
+        
+        return StudentQueries.GET_YEAR_LEVEL_DEMOGRAPHICS, None
+
+    @staticmethod
+    def _build_gender_demographics_query(params) -> tuple[str, tuple | None]:
+        """Build the query and its parameters used by get_gender_demographics_async."""
+
+        if params["program_code"]:
+            return StudentQueries.GET_GENDER_DEMOGRAPHICS_FROM_PROGRAM_CODE, (params["program_code"], )
+        
+        elif params["college_code"]:
+            return StudentQueries.GET_GENDER_DEMOGRAPHICS_FROM_COLLEGE_CODE, (params["college_code"], )
+
+        return StudentQueries.GET_GENDER_DEMOGRAPHICS, None
+
+    @staticmethod
+    async def get_year_level_demographics_async(params) -> list[dict[str, str]]:
         """
         Retrieve the student count grouped by year level, optionally filtered by program or college.
 
@@ -217,18 +350,12 @@ class StudentRepository:
             ValueError: If both "program_code" and "college_code" are provided simultaneously.
         """
 
-        db = current_app.extensions['db']
+        async_db = current_app.extensions['async_db']
 
-        if params["program_code"]:
-            return db.fetch_all(StudentQueries.GET_YEAR_LEVEL_DEMOGRAPHICS_FROM_PROGRAM_CODE, (params["program_code"], ))
-        
-        elif params["college_code"]:
-            return db.fetch_all(StudentQueries.GET_YEAR_LEVEL_DEMOGRAPHICS_FROM_COLLEGE_CODE, (params["college_code"], ))
-        
-        return db.fetch_all(StudentQueries.GET_YEAR_LEVEL_DEMOGRAPHICS)
+        return await async_db.fetch_all(*StudentRepository._build_year_level_demographics_query(params))
     
     @staticmethod
-    def get_gender_demographics(params) -> list[dict[str, str]]:
+    async def get_gender_demographics_async(params) -> list[dict[str, str]]:
         """
         Retrieve the student count grouped by gender, optionally filtered by program or college.
 
@@ -249,16 +376,79 @@ class StudentRepository:
             ValueError: If both "program_code" and "college_code" are provided simultaneously.
         """
 
-        db = current_app.extensions['db']
-        
-        if params["program_code"]:
-            return db.fetch_all(StudentQueries.GET_GENDER_DEMOGRAPHICS_FROM_PROGRAM_CODE, (params["program_code"], ))
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*StudentRepository._build_gender_demographics_query(params))
+
+    @staticmethod
+    def _build_statistics_query(params) -> tuple[str, tuple | None]:
+        """Build the query and its parameters used by get_statistics_async."""
+
+        if params["group_by"] == "program":
+            return StudentQueries.GET_STATISTICS_BY_PROGRAM, None
+
+        elif params["group_by"] == "college":
+            return StudentQueries.GET_STATISTICS_BY_COLLEGE, None
+
+        elif params["program_code"]:
+            return StudentQueries.GET_STATISTICS_FROM_PROGRAM_CODE, (params["program_code"], )
         
         elif params["college_code"]:
-            return db.fetch_all(StudentQueries.GET_GENDER_DEMOGRAPHICS_FROM_COLLEGE_CODE, (params["college_code"], ))
+            return StudentQueries.GET_STATISTICS_FROM_COLLEGE_CODE, (params["college_code"], )
 
-        return db.fetch_all(StudentQueries.GET_GENDER_DEMOGRAPHICS)
+        return StudentQueries.GET_STATISTICS, None
+
+    @staticmethod
+    async def get_statistics_async(params) -> list[dict[str, str | int | None]]:
+        """
+        Retrieve the total, year level and gender student counts in a single GROUPING SETS query.
+
+        Args:
+            params (dict): A dictionary of filter parameters. Expected keys include:
+                - "program_code" (str | None): The program code to filter by.
+                - "college_code" (str | None): The college code to filter by.
+                - "group_by" (str | None): "program" or "college" to compute the counts of every program or college at once.
+
+        Returns:
+            list[dict]: One row per grouping set, each including:
+                - "group_code" (str | None): The program or college code, only present when grouping.
+                - "year_level" (str | None): The year level of the row, None outside the year level set.
+                - "gender" (str | None): The gender of the row, None outside the gender set.
+                - "count" (int): The number of students in the set.
+                - "grouping_set" (int): The GROUPING() bitmask identifying the set of the row.
+        """
+
+        async_db = current_app.extensions['async_db']
+
+        return await async_db.fetch_all(*StudentRepository._build_statistics_query(params))
     
+    @staticmethod
+    @contextmanager
+    def delete_students_in_transaction(id_numbers: list[str]) -> Iterator[list[dict[str, str | None]]]:
+        """
+        Delete student records in a transaction that stays open for the duration of the with block.
+
+        The deleted students are read with a single ANY(...) query before the delete. The delete commits when 
+        the block exits, or rolls back if the block raises, so work done in the block (like removing avatars 
+        from storage) decides whether the delete goes through.
+
+        Args:
+            id_numbers (list[str]): A list of unique ID numbers of the students to delete.
+
+        Yields:
+            list[dict]: The "id_number" and "avatar_url" of every student that was found and deleted.
+        """
+
+        db = current_app.extensions['db']
+
+        with db.transaction() as cur:
+            cur.execute(StudentQueries.GET_AVATAR_URLS_FOR_DELETE, (id_numbers, ))
+            deleted_students = cur.fetchall()
+
+            cur.execute(CommonQueries.DELETE_BY_ID.format(table="students", pk="id_number"), (id_numbers, ))
+
+            yield deleted_students
+
     @staticmethod
     def get_avatar_url(id_number) -> dict[str, str]:
         """
@@ -269,8 +459,9 @@ class StudentRepository:
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
 
-        return db.fetch_one(CommonQueries.GET_COLUMN_BY_PK.format(column="avatar_url", table="students", pk="id_number"), (id_number,))
+        return db.fetch_one(queries.get(CommonQueries.GET_COLUMN_BY_PK, column="avatar_url", table="students", pk="id_number"), (id_number,), prepare=True)
     
     @staticmethod
     def update_avatar_url(id_number, avatar_url) -> None:
@@ -286,3 +477,121 @@ class StudentRepository:
 
         db.execute_query(CommonQueries.UPDATE_BY_ID.format(table="students", set_clause="avatar_url = %s", pk="id_number"),
                          (avatar_url, id_number))
+
+    @staticmethod
+    def replace_avatar_url(id_number: str, avatar_url: str) -> dict[str, str | None] | None:
+        """
+        Set the avatar_url of a student, returning the avatar_url it replaced.
+
+        Args:
+            id_number (str): The ID number of the student.
+            avatar_url (str): The URL of the new avatar of the student.
+
+        Returns:
+            dict | None: A dictionary with the "previous_avatar_url" key, or None if the student does not exist.
+        """
+
+        db = current_app.extensions['db']
+
+        return db.fetch_one(StudentQueries.REPLACE_AVATAR_URL, (avatar_url, id_number))
+
+    @staticmethod
+    def import_students(rows: Iterable[tuple]) -> tuple[int, list[dict[str, str | int]]]:
+        """
+        Bulk insert students by streaming them through COPY into a staging table, then merging the rows
+        that pass the primary key, unique full name and program foreign key checks. 
+
+        Everything runs in one transaction, so the import either merges every valid row or nothing.
+
+        Args:
+            rows (Iterable[tuple]): The (row_number, id_number, first_name, last_name, year_level, gender, program_code)
+                tuples to import. It is consumed lazily while the COPY is in progress.
+
+        Returns:
+            tuple[int, list[dict]]: The number of inserted students, and the rows that were rejected by the database
+                checks, each including "row_number", "id_number", "first_name", "last_name", "program_code" and "error".
+        """
+
+        db = current_app.extensions['db']
+
+        with db.transaction() as cur:
+            cur.execute(StudentQueries.CREATE_IMPORT_STAGING)
+
+            with cur.copy(StudentQueries.COPY_IMPORT_STAGING) as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+            cur.execute(StudentQueries.LOCK_STUDENTS_FOR_IMPORT)
+            cur.execute(StudentQueries.ANALYZE_IMPORT_STAGING)
+
+            cur.execute(StudentQueries.MARK_IMPORT_EXISTING_ID_NUMBERS)
+            cur.execute(StudentQueries.MARK_IMPORT_EXISTING_FULL_NAMES)
+            cur.execute(StudentQueries.MARK_IMPORT_MISSING_PROGRAMS)
+            StudentRepository._mark_import_duplicates(cur)
+
+            cur.execute(StudentQueries.MERGE_IMPORT_STAGING)
+
+            inserted_count = cur.rowcount
+
+            cur.execute(StudentQueries.GET_IMPORT_ERRORS)
+            rejected_rows = cur.fetchall()
+
+        return inserted_count, rejected_rows
+
+    @staticmethod
+    def _mark_import_duplicates(cur: Cursor) -> None:
+        """
+        Mark the staged rows that repeat the id number or full name of an earlier row that is inserted.
+
+        The checks run in rounds until one changes no row. A file without duplicates is decided by its first
+        round, and every row whose fate depends on an earlier duplicate, e.g. a row that shares an id number
+        only with a row that loses its full name, adds another.
+
+        Args:
+            cur (Cursor): A cursor in the transaction holding the student_import staging table.
+        """
+
+        while True:
+            changed_rows = 0
+
+            for query in (StudentQueries.MARK_IMPORT_DUPLICATE_ID_NUMBERS, 
+                          StudentQueries.MARK_IMPORT_DUPLICATE_FULL_NAMES, 
+                          StudentQueries.ACCEPT_IMPORT_ROWS):
+                cur.execute(query)
+                changed_rows += cur.rowcount
+
+            if not changed_rows:
+                return
+
+    @staticmethod
+    def _build_students_export_query(params) -> tuple[Query, tuple]:
+        """Build the query and its parameters used by stream_students."""
+
+        conditions, values = StudentRepository._build_student_conditions(params)
+        sort_order, _ = build_sort_order(params["sort_order"])
+
+        return (sql.SQL(CommonQueries.GET_ALL_SORTED)
+                .format(table=sql.Identifier("students"),
+                        where_clause=build_where_clause(conditions),
+                        sort_field=sql.Identifier(STUDENT_COLUMNS.column(params["sort_field"])),
+                        pk=sql.Identifier("id_number"),
+                        sort_order=sort_order),
+                tuple(values))
+
+    @staticmethod
+    def stream_students(params) -> Iterator[dict[str, str]]:
+        """
+        Lazily retrieve every student matching the search filters, in sort order, through a server-side cursor.
+
+        The query is built right away, so invalid parameters raise here rather than part way through the stream.
+
+        Args:
+            params (dict): The same search and sort keys as get_many_students, without the pagination keys.
+
+        Returns:
+            Iterator[dict]: The matching student rows.
+        """
+
+        db = current_app.extensions['db']
+
+        return db.stream(*StudentRepository._build_students_export_query(params))
@@ -3,15 +3,18 @@ from .controllers import StudentController
 
 from flask_jwt_extended import jwt_required
 
+from app.utils import etag_from_table_versions
+
 student_bp = Blueprint("student_bp", __name__)
 
 @student_bp.route("/<string:id_number>", methods=["GET"])
 @jwt_required()
+@etag_from_table_versions("students")
 def get_student_details(id_number: str) -> tuple[Response, int]:
     """
     Retrieve detailed information about a specific student.
 
-    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns information about a student based on the provided ID number.
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns information about a student based on the provided ID number. The response carries an ETag, and a request whose If-None-Match matches it gets a 304 without the query being run.
 
     Request parameters:
 
@@ -46,7 +49,7 @@ def get_student_details(id_number: str) -> tuple[Response, int]:
 
 @student_bp.route("/total-count", methods=["GET"])
 @jwt_required()
-def get_total_student_count() -> tuple[Response, int]:
+async def get_total_student_count() -> tuple[Response, int]:
     """
     Retrieve the total number of students based on optional search filters.
 
@@ -73,15 +76,16 @@ def get_total_student_count() -> tuple[Response, int]:
         500 if an unexpected error occurs during processing.
     """
 
-    return StudentController.get_total_student_count_controller()
+    return await StudentController.get_total_student_count_controller()
 
 @student_bp.route("/", methods=["GET"])
 @jwt_required()
-def get_many_students() -> tuple[Response, int]:
+@etag_from_table_versions("programs", "students")
+async def get_many_students() -> tuple[Response, int]:
     """
     Retrieve details of different students based on pagination, optional search and sort filters.
 
-    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns the details of different students, filtered by pagination and optionally by search and sort. 
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). It returns the details of different students, filtered by pagination and optionally by search and sort. The response carries an ETag, and a request whose If-None-Match matches it gets a 304 without the query being run.
 
     Query parameters:
 
@@ -99,6 +103,12 @@ def get_many_students() -> tuple[Response, int]:
 
         sortOrder: The order of sort to perform, such as "Ascending", and "Descending".
 
+        cursor: Opts into keyset pagination when present, replacing pageNumber (optional). Pass an empty value for the first page, then the nextCursor of the previous response.
+
+        includeTotalCount: If "true", totalCount is returned along with the page in a single query (optional, cannot be combined with cursor).
+
+        estimateCount: If "true" together with includeTotalCount, totalCount comes from planner statistics when no search or filter is applied (optional).
+
     Request body:
 
         None. This endpoint does not require any input data.
@@ -119,12 +129,63 @@ def get_many_students() -> tuple[Response, int]:
 
             programCode: The identifier of the program in which this student belongs to.
 
+        nextCursor: The cursor of the next page, or null on the last page. Only included when cursor is provided.
+
+        totalCount: The total number of matching records. Only included when includeTotalCount is "true".
+
     Possible errors:
 
+        400 if cursor is malformed or was issued for a different sortField or sortOrder.
+
+        400 if both cursor and includeTotalCount are provided.
+
         500 if an unexpected error occurs during processing.
     """
 
-    return StudentController.get_many_students_controller()
+    return await StudentController.get_many_students_controller()
+
+@student_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_students() -> tuple[Response, int]:
+    """
+    Export every student matching optional search and sort filters.
+
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). Rows are read through a 
+    server-side cursor and streamed to the client as they are fetched, so the whole table is never held in memory.
+
+    Query parameters:
+
+        format: "csv" (default) or "ndjson".
+
+        searchValue: The value to search for (optional).
+
+        searchBy: The field to search by, required with searchValue. One of ['ID Number', 'First Name', 'Last Name', 'Year Level', 'Gender', 'Program Code'].
+
+        searchType: "Starts With", "Contains" or "Ends With", required with searchValue.
+
+        filterByGender: Only export students of this gender (optional).
+
+        filterByYearLevel: Only export students in this year level (optional).
+
+        filterByProgramCode: Only export students in this program (optional).
+
+        sortField: The field to sort by (default: "ID Number").
+
+        sortOrder: "Ascending" (default) or "Descending".
+
+    Response:
+
+        A file download. CSV exports start with a header row of camelCase column names, which the import accepts 
+        as is. NDJSON exports contain one JSON object per line.
+
+    Possible errors:
+
+        400 if a query parameter is invalid.
+
+        500 if an unexpected error occurs before the export starts.
+    """
+
+    return StudentController.export_students_controller()
 
 @student_bp.route("/", methods=["POST"])
 @jwt_required()
@@ -165,6 +226,47 @@ def create_student() -> tuple[Response, int]:
 
     return StudentController.create_student_controller()
 
+@student_bp.route("/import", methods=["POST"])
+@jwt_required()
+def import_students() -> tuple[Response, int]:
+    """
+    Bulk import students from a CSV file.
+
+    This endpoint requires authentication via a valid access token (HTTP-only cookie). The CSV is streamed into the
+    database with COPY, so large enrollment lists can be imported in one request. Valid rows are inserted and 
+    invalid rows are skipped and reported; the import never fails half-way because of a bad row.
+
+    Request body:
+
+        Either a multipart form with the CSV in the 'file' field, or the CSV itself with a text/csv content type.
+        The header row must contain the columns:
+
+            idNumber, firstName, lastName, yearLevel, gender, programCode (snake_case names are accepted too).
+
+    Response JSON:
+
+        insertedCount: The number of students inserted.
+
+        errorCount: The number of rows that were skipped.
+
+        errors: Up to the first 1000 skipped rows, in file order. Each object contains:
+
+            row: The line number of the row in the CSV file.
+
+            idNumber: The ID number of the row.
+
+            error: Why the row was skipped, e.g., a validation error, "ID number already exists.", 
+            "Name combination already exists." or a missing program.
+
+    Possible errors:
+
+        400 if no CSV is provided, it is not UTF-8, or its header is missing a column.
+
+        500 if an unexpected error occurs during processing.
+    """
+
+    return StudentController.import_students_controller()
+
 @student_bp.route("/", methods=["DELETE"])
 @jwt_required()
 def delete_students() -> tuple[Response, int]:
@@ -235,7 +337,7 @@ def edit_student_details(id_number: str) -> tuple[Response, int]:
 
 @student_bp.route("/year-level-demographics", methods=["GET"])
 @jwt_required()
-def get_year_level_demographics() -> tuple[Response, int]:
+async def get_year_level_demographics() -> tuple[Response, int]:
     """
     Retrieve student year-level demographics.
 
@@ -268,11 +370,11 @@ def get_year_level_demographics() -> tuple[Response, int]:
         500 if an unexpected error occurs during processing.
     """
 
-    return StudentController.get_year_level_demographics_controller()
+    return await StudentController.get_year_level_demographics_controller()
 
 @student_bp.route("/gender-demographics", methods=["GET"])
 @jwt_required()
-def get_gender_demographics() -> tuple[Response, int]:
+async def get_gender_demographics() -> tuple[Response, int]:
     """
     Retrieve student gender demographics.
 
@@ -305,4 +407,51 @@ def get_gender_demographics() -> tuple[Response, int]:
         500 if an unexpected error occurs during processing.
     """
 
-    return StudentController.get_gender_demographics_controller()
+    return await StudentController.get_gender_demographics_controller()
+
+@student_bp.route("/statistics", methods=["GET"])
+@jwt_required()
+async def get_statistics() -> tuple[Response, int]:
+    """
+    Retrieve the student statistics shown on the statistics page in a single request.
+
+    This endpoint requires authentication via a valid access token (HTTP-only cookie).
+    It returns the total number of students together with the year-level and gender breakdowns, 
+    computed in one query. The counts can be scoped to a program or college, or broken down for 
+    every program or every college at once. Only one of the query parameters should be provided at a time.
+
+    Query parameters:
+
+        programCode: The code of the program to filter by (optional).
+
+        collegeCode: The code of the college to filter by (optional).
+
+        groupBy: "program" or "college" to include the breakdown of every program or college (optional).
+
+    Request body:
+
+        None. This endpoint does not require any input data.
+
+    Response JSON:
+
+        An object containing:
+
+            totalCount: The number of students.
+
+            yearLevels: An object mapping each year level (e.g., "1st", "4th+") to its number of students.
+
+            genders: An object mapping each gender (e.g., "male", "others") to its number of students.
+
+            programs / colleges: Only when groupBy is provided, an object mapping each program or college code 
+            to its own totalCount, yearLevels and genders. Students without a program or college are under "N/A".
+
+    Possible errors:
+
+        400 if more than one of programCode, collegeCode and groupBy is provided, or groupBy is invalid.
+
+        400 if the program or college does not exist.
+
+        500 if an unexpected error occurs during processing.
+    """
+
+    return await StudentController.get_statistics_controller()
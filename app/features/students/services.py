@@ -4,11 +4,44 @@ from .repository import StudentRepository
 
 from app.features.common.dataclasses import Student
 
-from app.utils import to_camel_case, upload_images_to_bucket, delete_images_from_bucket
+from app.utils import to_camel_case, encode_cursor, validate_id_number, validate_name, validate_year_level, validate_gender, validate_program_code, stream_export
+from app.utils.entity_validators import ALLOWED_YEAR_LEVELS, ALLOWED_GENDERS
 
-from app.exceptions.custom_exceptions import EntityNotFoundError
+from app.exceptions.custom_exceptions import EntityNotFoundError, PartialDeleteError, ValidationError
 
-from supabase import create_client, Client
+from app.storage import AvatarStorage
+from app.jobs import JobQueue
+
+from typing import IO, Iterator
+
+import csv
+import io
+import tempfile
+
+# CSV columns of a student import, accepted either in snake_case or in the camelCase used by the API
+IMPORT_COLUMNS = ("id_number", "first_name", "last_name", "year_level", "gender", "program_code")
+
+# Messages for the rows rejected by the database checks of StudentRepository.import_students
+IMPORT_ERROR_MESSAGES = {
+    "duplicate_id_number": "ID number appears more than once in the file.",
+    "duplicate_full_name": "Name combination appears more than once in the file.",
+    "students_pkey": "ID number already exists.",
+    "unique_full_name": "Name combination already exists.",
+}
+
+# Kinds of the background jobs of students, see StudentServices.register_jobs
+UPLOAD_AVATAR_JOB = "students.upload_avatar"
+DELETE_AVATARS_JOB = "students.delete_avatars"
+GENERATE_AVATAR_THUMBNAILS_JOB = "students.generate_avatar_thumbnails"
+
+# Queued avatars up to this size are held in memory, larger ones are spooled to a temporary file, in bytes
+AVATAR_SPOOL_MEMORY_SIZE = 256 * 1024
+
+# Only the first rejected rows are returned, so a bad file cannot produce an unbounded response
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
+# Columns of the student export, in order
+STUDENT_EXPORT_COLUMNS = ("id_number", "first_name", "last_name", "year_level", "gender", "program_code", "avatar_url")
 
 class StudentServices:
 
@@ -24,15 +57,15 @@ class StudentServices:
             Student: A Student dataclass instance if a student has the given id_number, otherwise None.
         """
     
-        row = StudentRepository.get_student_by_id(id_number)
+        student = StudentRepository.get_student_by_id(id_number)
 
-        if not row:
+        if not student:
             raise EntityNotFoundError(f"Student with the id_number '{id_number}' does not exist.")
 
-        return Student(**row)
+        return student
     
     @staticmethod
-    def get_total_student_count_service(params) -> int:
+    async def get_total_student_count_service(params) -> int:
         """
         Retrieve the total student count, with optional search filters.
 
@@ -47,10 +80,10 @@ class StudentServices:
             int: The total student count, with search filters being optionally applied.
         """
 
-        return StudentRepository.get_total_student_count(params)["count"]
+        return (await StudentRepository.get_total_student_count_async(params))["count"]
 
     @staticmethod
-    def get_many_students_service(params) -> list[Student]:
+    async def get_many_students_service(params) -> list[Student]:
         """
         Retrieve details of different students based on pagination, optional search and sort filters.
         
@@ -69,19 +102,64 @@ class StudentServices:
             list[Student]: A list of Student dataclass instances representing rowsPerPage students.
         """
 
-        students = StudentRepository.get_many_students(params)
+        return await StudentRepository.get_many_students_async(params)
+
+    @staticmethod
+    async def get_many_students_with_count_service(params) -> tuple[list[Student], int]:
+        """
+        Retrieve a page of students together with the total number of matching students in a single query.
+
+        Args:
+            params (dict): The same keys as get_many_students_service, plus:
+                - "estimate_count" (bool): Use the planner's row estimate instead of an exact count when no search or filter is applied.
+
+        Returns:
+            tuple[list[Student], int]: The student dataclass instances of the page, and the total student count.
+        """
+
+        # The planner estimate only stands in for the count when nothing is filtered out
+        estimate_count = params["estimate_count"] and not (params["search_value"] or params["filter_by_gender"] or params["filter_by_year_level"] or params["filter_by_program_code"])
+
+        rows = await StudentRepository.get_many_students_with_count_async(params, estimate_count)
+
+        if rows and rows[0][1] is not None:
+            total_count = rows[0][1]
+
+        else:
+            # Past the last page, or no planner statistics yet, so count exactly using the first row instead
+            first_row = await StudentRepository.get_many_students_with_count_async({**params, "page_number": 1, "rows_per_page": 1})
+
+            total_count = first_row[0][1] if first_row else 0
+
+        return [student for student, _ in rows], total_count
+
+    @staticmethod
+    async def get_many_students_by_cursor_service(params) -> tuple[list[Student], str | None]:
+        """
+        Retrieve a page of students using keyset (cursor) pagination.
+
+        Args:
+            params (dict): The same keys as get_many_students_service, with "cursor" (list | None) in place of "page_number".
+
+        Returns:
+            tuple[list[Student], str | None]: The student dataclass instances of the page, and the cursor of the 
+            next page (None if this is the last page).
+        """
+
+        rows = await StudentRepository.get_many_students_by_cursor_async(params)
 
-        student_dataclasses = []
+        has_next_page = len(rows) > params["rows_per_page"]
 
-        for student in students:
-            student['gender'] = student['gender'].capitalize()
+        rows = rows[:params["rows_per_page"]]
 
-            if not student['program_code']:
-                student['program_code'] = 'N/A'
+        next_cursor = None
 
-            student_dataclasses.append(Student(**student))
+        if has_next_page and rows:
+            # The raw sort value is used (the student itself is formatted for display) so the next page can seek on it
+            last_student, last_sort_value = rows[-1]
+            next_cursor = encode_cursor(params["sort_field"], params["sort_order"], [last_sort_value or "", last_student.id_number])
 
-        return student_dataclasses
+        return [student for student, _ in rows], next_cursor
 
     @staticmethod
     def create_student_service(student_data, student_avatar) -> None:
@@ -102,52 +180,45 @@ class StudentServices:
 
         StudentRepository.create_student(student_data=student_data)
 
-        id_number = student_data['id_number']
+        StudentServices.invalidate_demographics_cache()
 
         if student_avatar:
-
-            supabase: Client = create_client(
-                current_app.config.get("SUPABASE_URL", ""),
-                current_app.config.get("SUPABASE_SERVICE_KEY", ""),
-            )
-
-            bucket_name = current_app.config.get("SUPABASE_BUCKET_NAME", "avatars")
-
-            avatar_url = upload_images_to_bucket(
-                supabase, student_avatar, bucket_name
-            )
-
-            StudentRepository.update_avatar_url(id_number, avatar_url)
+            StudentServices.queue_avatar_upload(student_data['id_number'], student_avatar)
             
 
     @staticmethod
     def delete_students_service(id_numbers: list[str]) -> None:
         """
-        Delete student records and avatars by its id_number.
+        Delete student records by its id_number, and queue the removal of their avatars.
+
+        The students are looked up and deleted in one transaction. Their avatars are removed from the storage
+        by a background job once it commits, which is retried on failure and dead-lettered if it keeps failing.
 
         Args:
             id_numbers (list[str]): A list of id_numbers of the student(s) to be deleted.
+
+        Raises:
+            EntityNotFoundError: If any of the id_numbers does not belong to a student, in which case nothing is deleted.
         """
 
-        supabase: Client = create_client(
-            current_app.config.get("SUPABASE_URL", ""),
-            current_app.config.get("SUPABASE_SERVICE_KEY", ""),
-        )
+        with StudentRepository.delete_students_in_transaction(id_numbers) as deleted_students:
 
-        bucket_name = current_app.config.get("SUPABASE_BUCKET_NAME", "avatars")
+            missing_id_numbers = set(id_numbers) - {student["id_number"] for student in deleted_students}
 
-        for id_number in id_numbers:
-            current_avatar_url = StudentRepository.get_avatar_url(id_number)['avatar_url']
+            if missing_id_numbers:
+                raise EntityNotFoundError(f"Student(s) with the id_number(s) {sorted(missing_id_numbers)} do not exist.")
 
-            if current_avatar_url:
-                delete_images_from_bucket(supabase, bucket_name, current_app.config.get("SUPABASE_URL", ""), current_avatar_url)
+            avatar_urls = [student["avatar_url"] for student in deleted_students if student["avatar_url"]]
+
+        StudentServices.invalidate_demographics_cache()
 
-        StudentRepository.delete_students(id_numbers=id_numbers)
+        if avatar_urls:
+            current_app.extensions['job_queue'].enqueue(DELETE_AVATARS_JOB, {"avatar_urls": avatar_urls})
 
     @staticmethod
     def edit_student_details_service(id_number: str, new_student_data, new_student_avatar) -> None:
         """
-        Edit the details and avatar of an existing student.
+        Edit the details of an existing student, and queue the upload or removal of their avatar.
         
         Args:
             id_number (str): The current unique code identifying the student to be updated.
@@ -163,36 +234,122 @@ class StudentServices:
 
         StudentRepository.edit_student_details(id_number=id_number, new_student_data=new_student_data)
 
+        StudentServices.invalidate_demographics_cache()
+
         id_number = new_student_data['id_number']
 
-        supabase: Client = create_client(
-                current_app.config.get("SUPABASE_URL", ""),
-                current_app.config.get("SUPABASE_SERVICE_KEY", ""),
-            )
+        if new_student_avatar:
 
-        bucket_name = current_app.config.get("SUPABASE_BUCKET_NAME", "avatars")
+            # The upload job replaces the current avatar once the new one is stored
+            StudentServices.queue_avatar_upload(id_number, new_student_avatar)
 
-        current_avatar_url = StudentRepository.get_avatar_url(id_number)['avatar_url']
+        elif not new_student_avatar and not new_student_data["existing_avatar_url"]:
 
-        if new_student_avatar:
+            current_avatar_url = StudentRepository.get_avatar_url(id_number)['avatar_url']
 
-            delete_images_from_bucket(supabase, bucket_name, current_app.config.get("SUPABASE_URL", ""), current_avatar_url)
+            StudentRepository.update_avatar_url(id_number, None)
 
-            avatar_url = upload_images_to_bucket(
-                supabase, new_student_avatar, bucket_name
-            )
+            if current_avatar_url:
+                current_app.extensions['job_queue'].enqueue(DELETE_AVATARS_JOB, {"avatar_urls": [current_avatar_url]})
 
-            StudentRepository.update_avatar_url(id_number, avatar_url)
+    @staticmethod
+    def queue_avatar_upload(id_number: str, avatar) -> None:
+        """
+        Read an uploaded avatar and queue the job that stores it as the avatar of a student.
 
-        elif not new_student_avatar and not new_student_data["existing_avatar_url"]:
+        The avatar is read in chunks, stopping as soon as it goes over AVATAR_MAX_SIZE, into a spooled
+        temporary file that holds it until the jobs are done with it, since the upload stream is closed once
+        the request returns. Avatars over AVATAR_SPOOL_MEMORY_SIZE are kept on disk rather than in memory,
+        and the file is removed once no queued job references it.
 
-            delete_images_from_bucket(supabase, bucket_name, current_app.config.get("SUPABASE_URL", ""), current_avatar_url)
+        Args:
+            id_number (str): The ID number of the student.
+            avatar (FileStorage): The uploaded avatar image file.
 
-            StudentRepository.update_avatar_url(id_number, None)
+        Raises:
+            ValidationError: If the avatar is larger than AVATAR_MAX_SIZE.
+        """
+
+        storage: AvatarStorage = current_app.extensions['storage']
+
+        spool = tempfile.SpooledTemporaryFile(max_size=AVATAR_SPOOL_MEMORY_SIZE)
 
+        for chunk in storage.iter_chunks(avatar.stream):
+            spool.write(chunk)
+
+        current_app.extensions['job_queue'].enqueue(UPLOAD_AVATAR_JOB, 
+                                                    {"id_number": id_number, "content_type": avatar.content_type}, 
+                                                    spool)
 
     @staticmethod
-    def get_year_level_demographics_service(params) -> list[dict[str, str]]:
+    def upload_avatar_job(payload: dict[str, str], data: IO[bytes]) -> None:
+        """
+        Store an avatar and make it the avatar of a student, then queue the removal of the avatar it replaced
+        and the generation of its thumbnails.
+
+        If the student was deleted or renamed before the job ran, the stored avatar is removed again.
+        """
+
+        storage: AvatarStorage = current_app.extensions['storage']
+        job_queue = current_app.extensions['job_queue']
+
+        data.seek(0)
+        avatar_url = storage.upload(data, payload["content_type"])
+
+        replaced = StudentRepository.replace_avatar_url(payload["id_number"], avatar_url)
+
+        if replaced is None:
+            storage.delete(avatar_url)
+            return
+
+        if replaced["previous_avatar_url"]:
+            job_queue.enqueue(DELETE_AVATARS_JOB, {"avatar_urls": [replaced["previous_avatar_url"]]})
+
+        if current_app.extensions['avatar_thumbnailer']:
+            job_queue.enqueue(GENERATE_AVATAR_THUMBNAILS_JOB, {"avatar_url": avatar_url}, data)
+
+    @staticmethod
+    def delete_avatars_job(payload: dict[str, list[str]], data: None) -> None:
+        """
+        Remove avatars and their thumbnails from the storage.
+
+        If the removal fails part way, the payload is narrowed to the avatars that are left, so that the retry 
+        and the dead letter only hold those rather than the ones already removed.
+        """
+
+        storage: AvatarStorage = current_app.extensions['storage']
+
+        try:
+            storage.delete_many(payload["avatar_urls"])
+
+        except PartialDeleteError as e:
+            print(f"Avatars left to delete: {e.avatar_urls}")
+
+            payload["avatar_urls"] = e.avatar_urls
+            raise
+
+    @staticmethod
+    def generate_avatar_thumbnails_job(payload: dict[str, str], data: IO[bytes] | None) -> None:
+        """Generate and store the thumbnails of an avatar."""
+
+        current_app.extensions['avatar_thumbnailer'].generate(payload["avatar_url"], data)
+
+    @staticmethod
+    def register_jobs(job_queue: JobQueue) -> None:
+        """Register the handlers of the background jobs of students."""
+
+        job_queue.register(UPLOAD_AVATAR_JOB, StudentServices.upload_avatar_job)
+        job_queue.register(DELETE_AVATARS_JOB, StudentServices.delete_avatars_job)
+        job_queue.register(GENERATE_AVATAR_THUMBNAILS_JOB, StudentServices.generate_avatar_thumbnails_job)
+
+    @staticmethod
+    def invalidate_demographics_cache() -> None:
+        """Drop the cached demographics after a write that can change them."""
+
+        current_app.extensions['demographics_cache'].invalidate()
+
+    @staticmethod
+    async def get_year_level_demographics_service(params) -> list[dict[str, str]]:
         """
         Retrieve student year-level demographics.
         
@@ -208,14 +365,22 @@ class StudentServices:
                 - "year_level" (str): The name or label of the year level.
         """
 
-        year_level_demographics = StudentRepository.get_year_level_demographics(params)
+        cache = current_app.extensions['demographics_cache']
+        cache_key = ("year_level", params["program_code"], params["college_code"])
+
+        formatted_year_level_demographics = cache.get(cache_key)
+
+        if formatted_year_level_demographics is None:
+            year_level_demographics = await StudentRepository.get_year_level_demographics_async(params)
 
-        formatted_year_level_demographics = [{to_camel_case(k): v for k, v in year_level_demographic.items()} for year_level_demographic in year_level_demographics]
+            formatted_year_level_demographics = [{to_camel_case(k): v for k, v in year_level_demographic.items()} for year_level_demographic in year_level_demographics]
+
+            cache.set(cache_key, formatted_year_level_demographics)
 
         return formatted_year_level_demographics
     
     @staticmethod
-    def get_gender_demographics_service(params) -> list[dict[str, str]]:
+    async def get_gender_demographics_service(params) -> list[dict[str, str]]:
         """
         Retrieve student gender demographics.
         
@@ -231,9 +396,206 @@ class StudentServices:
                 - "gender" (str): The name or label of the gender.
         """
 
-        gender_demographics = StudentRepository.get_gender_demographics(params)
+        cache = current_app.extensions['demographics_cache']
+        cache_key = ("gender", params["program_code"], params["college_code"])
+
+        formatted_gender_demographics = cache.get(cache_key)
 
-        formatted_gender_demographics = [{to_camel_case(k): v for k, v in gender_demographic.items()} for gender_demographic in gender_demographics]
+        if formatted_gender_demographics is None:
+            gender_demographics = await StudentRepository.get_gender_demographics_async(params)
+
+            formatted_gender_demographics = [{to_camel_case(k): v for k, v in gender_demographic.items()} for gender_demographic in gender_demographics]
+
+            cache.set(cache_key, formatted_gender_demographics)
 
         return formatted_gender_demographics
-    
\ No newline at end of file
+
+    @staticmethod
+    def _empty_statistics() -> dict[str, int | dict[str, int]]:
+        # Year levels and genders without students are reported as 0 rather than left out
+        return {
+            "totalCount": 0,
+            "yearLevels": dict.fromkeys(sorted(ALLOWED_YEAR_LEVELS), 0),
+            "genders": dict.fromkeys(sorted(ALLOWED_GENDERS), 0),
+        }
+
+    @staticmethod
+    async def get_statistics_service(params) -> dict[str, int | dict]:
+        """
+        Retrieve the total, year level and gender student counts for the statistics page in one query.
+        
+        Args:
+            params (dict): A dictionary containing the filters.
+                Expected keys include:
+                    - "program_code" (str): The code of the program to filter by (optional).
+                    - "college_code" (str): The code of the college to filter by (optional).
+                    - "group_by" (str): "program" or "college" to also break the counts down per program or college (optional).
+
+        Returns:
+            dict: A dictionary containing:
+                - "totalCount" (int): The number of students.
+                - "yearLevels" (dict[str, int]): The number of students per year level.
+                - "genders" (dict[str, int]): The number of students per gender.
+                - "programs" / "colleges" (dict[str, dict]): Only when grouping, the same three keys per program 
+                  or college code. Students without a program or college are listed under "N/A".
+        """
+
+        cache = current_app.extensions['demographics_cache']
+        cache_key = ("statistics", params["program_code"], params["college_code"], params["group_by"])
+
+        statistics = cache.get(cache_key)
+
+        if statistics is not None:
+            return statistics
+
+        rows = await StudentRepository.get_statistics_async(params)
+
+        statistics = StudentServices._empty_statistics()
+        groups: dict[str, dict] = {}
+
+        # Ungrouped queries do not select group_code, so every row falls into the overall statistics
+        grouped_offset = 4 if params["group_by"] else 0
+
+        for row in rows:
+            grouping_set = row["grouping_set"]
+
+            if grouping_set >= grouped_offset:
+                target = statistics
+                grouping_set -= grouped_offset
+            else:
+                group_code = row["group_code"] or "N/A"
+                target = groups.setdefault(group_code, StudentServices._empty_statistics())
+
+            if grouping_set == 3:
+                target["totalCount"] = row["count"]
+
+            # Programs or colleges without students come back with a NULL year level or gender
+            elif grouping_set == 1 and row["year_level"]:
+                target["yearLevels"][row["year_level"]] = row["count"]
+
+            elif grouping_set == 2 and row["gender"]:
+                target["genders"][row["gender"]] = row["count"]
+
+        if params["group_by"]:
+            statistics[f"{params["group_by"]}s"] = groups
+
+        cache.set(cache_key, statistics)
+
+        return statistics
+
+    @staticmethod
+    def _read_student_import(csv_file: IO[bytes], errors: list[dict[str, str | int]]) -> Iterator[tuple]:
+        """
+        Lazily parse and validate the rows of a student import CSV.
+
+        Valid rows are yielded as normalized tuples in the column order of the staging table. Rows that fail the 
+        entity validators are appended to errors instead, so the whole file is read in a single pass.
+        """
+
+        reader = csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8-sig", newline=""))
+
+        header = next(reader, None)
+
+        if not header:
+            raise ValidationError("The CSV file is empty.")
+
+        normalized_header = [column.strip().replace(" ", "_") for column in header]
+        column_positions = {}
+
+        for column in IMPORT_COLUMNS:
+            camel_column = to_camel_case(column)
+
+            if column in normalized_header:
+                column_positions[column] = normalized_header.index(column)
+            elif camel_column in normalized_header:
+                column_positions[column] = normalized_header.index(camel_column)
+            else:
+                raise ValidationError(f"The CSV file is missing the '{camel_column}' column.")
+
+        for row in reader:
+
+            # Skip blank lines
+            if not any(value.strip() for value in row):
+                continue
+
+            values = {column: row[position] if position < len(row) else "" for column, position in column_positions.items()}
+
+            try:
+                validate_id_number(values["id_number"])
+                validate_name(values["first_name"], "First")
+                validate_name(values["last_name"], "Last")
+                validate_year_level(values["year_level"])
+                validate_gender(values["gender"])
+                validate_program_code(values["program_code"])
+
+            except ValidationError as e:
+                errors.append({"row": reader.line_num, "idNumber": values["id_number"], "error": str(e)})
+                continue
+
+            yield (reader.line_num,
+                   values["id_number"].strip(),
+                   values["first_name"].strip(),
+                   values["last_name"].strip(),
+                   values["year_level"].strip(),
+                   values["gender"].strip().lower(),
+                   values["program_code"].strip().upper())
+
+    @staticmethod
+    def import_students_service(csv_file: IO[bytes]) -> dict[str, int | list[dict[str, str | int]]]:
+        """
+        Bulk import students from a CSV file.
+
+        The file is read as a stream and its rows are loaded with COPY, so memory use does not grow with the 
+        file size. Rows failing validation or the database checks are skipped and reported, the rest are inserted.
+
+        Args:
+            csv_file (IO[bytes]): The uploaded CSV file. The header must contain the idNumber, firstName, lastName,
+                yearLevel, gender and programCode columns (snake_case names are accepted too).
+
+        Returns:
+            dict: A dictionary containing:
+                - "insertedCount" (int): The number of students inserted.
+                - "errorCount" (int): The number of rows that were skipped.
+                - "errors" (list[dict]): Up to MAX_REPORTED_IMPORT_ERRORS of the skipped rows, in file order, each 
+                  with its "row" (line number in the file), "idNumber" and "error" message.
+        """
+
+        validation_errors: list[dict[str, str | int]] = []
+
+        inserted_count, rejected_rows = StudentRepository.import_students(StudentServices._read_student_import(csv_file, validation_errors))
+
+        if inserted_count:
+            StudentServices.invalidate_demographics_cache()
+
+        database_errors = [
+            {
+                "row": rejected_row["row_number"],
+                "idNumber": rejected_row["id_number"],
+                "error": IMPORT_ERROR_MESSAGES.get(rejected_row["error"], 
+                                                   f"The program_code '{rejected_row["program_code"]}' doesn't exist in the 'programs' table.")
+            }
+            for rejected_row in rejected_rows
+        ]
+
+        errors = sorted(validation_errors + database_errors, key=lambda error: error["row"])
+
+        return {
+            "insertedCount": inserted_count,
+            "errorCount": len(errors),
+            "errors": errors[:MAX_REPORTED_IMPORT_ERRORS],
+        }
+
+    @staticmethod
+    def export_students_service(params, export_format: str) -> Iterator[str]:
+        """
+        Export every student matching the search filters, in sort order, as a stream of CSV or NDJSON chunks.
+
+        Args:
+            params (dict): The same search and sort keys as get_many_students_service, without the pagination keys.
+            export_format (str): "csv" or "ndjson".
+
+        Returns:
+            Iterator[str]: The chunks of the export. Values are exported as stored, not as formatted for display.
+        """
+
+        return stream_export(StudentRepository.stream_students(params), STUDENT_EXPORT_COLUMNS, export_format)
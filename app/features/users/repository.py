@@ -1,11 +1,17 @@
 from app.db.queries.common import CommonQueries
+from app.db.row_factories import entity_row
+
+from app.features.common.dataclasses import User
 
 from flask import current_app
 
+# user_id is a UUID column, but the app passes it around (e.g. as the JWT identity) as a string
+USER_ROW = entity_row(User, {"user_id": str})
+
 class UserRepository:
 
     @staticmethod
-    def get_user_by_email(email: str) -> dict[str, str] | None:
+    def get_user_by_email(email: str) -> User | None:
         """
         Retrieve a user record from the database by email.
 
@@ -13,12 +19,13 @@ class UserRepository:
             email (str): The email address of the user to retrieve.
 
         Returns:
-            dict: A dictionary containing the user's details if found, otherwise None.
+            User | None: The user if found, otherwise None.
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
 
-        return db.fetch_one(CommonQueries.GET_BY_SPECIFIC_COLUMN.format(table="users", column="email"), (email, ))
+        return db.fetch_one(queries.get(CommonQueries.GET_BY_SPECIFIC_COLUMN, table="users", column="email"), (email, ), USER_ROW, prepare=True)
 
     @staticmethod
     def user_signup(user_id, username, email, password_hash) -> None:
@@ -53,8 +60,9 @@ class UserRepository:
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
 
-        return db.fetch_one(CommonQueries.GET_COLUMN_BY_PK.format(column="username", table="users", pk="user_id"), (user_id, ))
+        return db.fetch_one(queries.get(CommonQueries.GET_COLUMN_BY_PK, column="username", table="users", pk="user_id"), (user_id, ), prepare=True)
     
     @staticmethod
     def check_email_if_it_exists(email) -> dict[str, bool]:
@@ -70,8 +78,9 @@ class UserRepository:
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
 
-        return db.fetch_one(CommonQueries.CHECK_IF_EXISTS.format(table="users", column="email"), (email, ))
+        return db.fetch_one(queries.get(CommonQueries.CHECK_IF_EXISTS, table="users", column="email"), (email, ), prepare=True)
     
     @staticmethod
     def check_username_if_it_exists(username) -> dict[str, bool]:
@@ -87,6 +96,7 @@ class UserRepository:
         """
 
         db = current_app.extensions['db']
+        queries = current_app.extensions['query_registry']
 
-        return db.fetch_one(CommonQueries.CHECK_IF_EXISTS.format(table="users", column="username"), (username, ))
+        return db.fetch_one(queries.get(CommonQueries.CHECK_IF_EXISTS, table="users", column="username"), (username, ), prepare=True)
         
\ No newline at end of file
@@ -28,14 +28,9 @@ class UserServices:
         if not user:
             return None
 
-        user["user_id"] = str(user["user_id"])
-
-        # Convert dict to dataclass
-        user_dataclass = User(**user)
-
         # Verify password
-        if user_dataclass.check_password(password):
-            return user_dataclass
+        if user.check_password(password):
+            return user
         
         return None
     
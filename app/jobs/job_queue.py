@@ -0,0 +1,273 @@
+from flask import Flask
+from psycopg.types.json import Jsonb
+
+from dataclasses import dataclass, field
+from itertools import count
+from threading import Condition, RLock, Thread
+from typing import IO, Any, Callable
+
+import heapq
+import time
+import traceback
+
+from app.db.queries.jobs import JobQueries
+from app.exceptions.custom_exceptions import PermanentJobError
+
+# A job handler receives the JSON payload and the optional binary data the job was enqueued with
+JobHandler = Callable[[dict[str, Any], bytes | IO[bytes] | None], None]
+
+@dataclass(order=True)
+class Job:
+    """A unit of background work, ordered by the time it is due and then by the order it was enqueued in."""
+
+    run_at: float
+    sequence: int
+    kind: str = field(compare=False)
+    payload: dict[str, Any] = field(compare=False)
+    data: bytes | IO[bytes] | None = field(default=None, compare=False)
+    attempts: int = field(default=0, compare=False)
+
+class JobQueue:
+    """
+    In-process queue of background jobs, run by a fixed number of worker threads.
+
+    A job that raises is retried with exponential backoff, and after max_attempts it is written to the
+    job_dead_letters table together with its last error, so that it can be inspected and replayed.
+    A handler raises PermanentJobError when a retry cannot succeed, e.g. for an upload that is not an
+    image, which dead-letters the job right away and without its binary data. A handler that gets part
+    of the way can narrow its payload before raising, so that the retry and the dead letter only hold the rest.
+    Jobs are held in memory, so the ones still queued when the process stops are dead-lettered by shutdown().
+
+    Handlers run inside an app context, so they can use the repositories and services like a request does.
+    """
+
+    def __init__(self, app: Flask, workers: int = 2, max_attempts: int = 5, backoff: float = 1, max_size: int = 1000) -> None:
+        """
+        Args:
+            app (Flask): The app whose context the handlers run in.
+            workers (int): The number of worker threads.
+            max_attempts (int): The number of times a job is run before it is dead-lettered.
+            backoff (float): The delay before the first retry of a job, doubled for every later retry, in seconds.
+            max_size (int): The number of jobs held before enqueue() runs new jobs in the calling thread instead.
+        """
+
+        self.app = app
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_size = max_size
+
+        self._handlers: dict[str, JobHandler] = {}
+        self._jobs: list[Job] = []
+        self._sequence = count()
+        # Both conditions share a lock, so that waiting for the queue to go idle never takes a wake-up meant for a worker
+        lock = RLock()
+        self._condition = Condition(lock)
+        self._idle = Condition(lock)
+        self._closed = False
+
+        self._running = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.ran_inline = 0
+
+        self._workers = [Thread(target=self._work, name=f"job-worker-{index}", daemon=True) for index in range(workers)]
+
+        for worker in self._workers:
+            worker.start()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the handler that runs the jobs of a kind."""
+
+        self._handlers[kind] = handler
+
+    def enqueue(self, kind: str, payload: dict[str, Any], data: bytes | IO[bytes] | None = None) -> None:
+        """
+        Queue a job to run on a worker thread as soon as one is free.
+
+        If the queue already holds max_size jobs, the job runs in the calling thread instead, so that a
+        backed up storage slows requests down rather than growing the queue without bound.
+
+        Args:
+            kind (str): The kind of the job, as passed to register().
+            payload (dict): The JSON serializable arguments of the job.
+            data (bytes | IO[bytes] | None): Binary data of the job, e.g. an uploaded file. A file, such as a
+                tempfile.SpooledTemporaryFile, keeps large data out of memory while the job is queued. Handlers
+                rewind it before reading, since a retry gets it back where the failed attempt left it.
+
+        Raises:
+            KeyError: If no handler is registered for the kind.
+        """
+
+        if kind not in self._handlers:
+            raise KeyError(f"No handler is registered for '{kind}' jobs.")
+
+        job = Job(time.monotonic(), next(self._sequence), kind, payload, data)
+
+        with self._condition:
+            if not self._closed and len(self._jobs) < self.max_size:
+                heapq.heappush(self._jobs, job)
+                self._condition.notify()
+                return
+
+            self.ran_inline += 1
+
+        self._run(job)
+
+    def _work(self) -> None:
+        """Run due jobs until the queue is shut down."""
+
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+
+                    now = time.monotonic()
+
+                    if self._jobs and self._jobs[0].run_at <= now:
+                        job = heapq.heappop(self._jobs)
+                        self._running += 1
+                        break
+
+                    # Sleep until the next retry is due, or until a job is enqueued
+                    self._condition.wait(self._jobs[0].run_at - now if self._jobs else None)
+
+            try:
+                self._run(job)
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    self._condition.notify_all()
+                    self._idle.notify_all()
+
+            # Release the job, and a file it holds, instead of keeping it until the worker picks the next one
+            del job
+
+    def _run(self, job: Job) -> None:
+        """Run a job once, scheduling a retry or dead-lettering it if it fails."""
+
+        job.attempts += 1
+
+        try:
+            with self.app.app_context():
+                self._handlers[job.kind](job.payload, job.data)
+
+        except PermanentJobError as e:
+            traceback.print_exc()
+
+            # Replaying the job would fail the same way, so its data is not kept
+            job.data = None
+            self._dead_letter(job, e)
+
+            return
+
+        except Exception as e:
+            traceback.print_exc()
+
+            if job.attempts >= self.max_attempts or not self._schedule_retry(job):
+                self._dead_letter(job, e)
+
+            return
+
+        with self._condition:
+            self.completed += 1
+
+    def _schedule_retry(self, job: Job) -> bool:
+        """Queue a failed job again after its backoff, unless the queue is shut down."""
+
+        with self._condition:
+            if self._closed:
+                return False
+
+            job.run_at = time.monotonic() + self.backoff * 2 ** (job.attempts - 1)
+
+            heapq.heappush(self._jobs, job)
+            self.retried += 1
+            self._condition.notify()
+
+            return True
+
+    def _dead_letter(self, job: Job, error: Exception) -> None:
+        """Write a job that will not be retried to the job_dead_letters table."""
+
+        try:
+            with self.app.app_context():
+                db = self.app.extensions['db']
+                db.execute_query(JobQueries.INSERT_DEAD_LETTER, (job.kind, Jsonb(job.payload), self._read_data(job), repr(error), job.attempts))
+
+        except Exception:
+            # Nothing else can hold the job, so at least leave it in the logs
+            print(f"Could not dead-letter '{job.kind}' job {job.payload}:")
+            traceback.print_exc()
+
+        with self._condition:
+            self.dead_lettered += 1
+
+    @staticmethod
+    def _read_data(job: Job) -> bytes | None:
+        """Return the data of a job as bytes, reading it from its start if it is a file."""
+
+        if job.data is None or isinstance(job.data, bytes):
+            return job.data
+
+        job.data.seek(0)
+        return job.data.read()
+
+    def wait_until_idle(self, timeout: float | None = None) -> bool:
+        """
+        Block until no job is queued, waiting for a retry or running, e.g. before a CLI command that queued jobs exits.
+
+        Args:
+            timeout (float | None): How long to wait at most, in seconds.
+
+        Returns:
+            bool: Whether the queue went idle before the timeout.
+        """
+
+        with self._idle:
+            return self._idle.wait_for(lambda: self._closed or (not self._jobs and not self._running), timeout)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the depth of the queue and the counters of the jobs run so far."""
+
+        with self._condition:
+            now = time.monotonic()
+            ready = sum(1 for job in self._jobs if job.run_at <= now)
+
+            return {
+                "queued": ready,
+                "scheduled_retries": len(self._jobs) - ready,
+                "running": self._running,
+                "workers": len(self._workers),
+                "max_size": self.max_size,
+                "completed": self.completed,
+                "retried": self.retried,
+                "dead_lettered": self.dead_lettered,
+                "ran_inline": self.ran_inline,
+            }
+
+    def shutdown(self, timeout: float | None = 10) -> None:
+        """
+        Stop the worker threads after their current job, and dead-letter the jobs that have not run yet.
+
+        Args:
+            timeout (float | None): How long to wait for each worker to finish its current job, in seconds.
+        """
+
+        with self._condition:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._condition.notify_all()
+            self._idle.notify_all()
+
+        for worker in self._workers:
+            worker.join(timeout)
+
+        with self._condition:
+            pending_jobs, self._jobs = self._jobs, []
+
+        for job in pending_jobs:
+            self._dead_letter(job, RuntimeError("The job queue was shut down before the job ran."))
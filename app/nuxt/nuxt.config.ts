@@ -6,6 +6,8 @@ export default defineNuxtConfig({
 
   nitro: {
     preset: 'static',
+    // Writes .br and .gz copies of the public assets, which Flask serves to clients that accept them
+    compressPublicAssets: true,
     output: {
       dir: 'nuxt_dist', 
       },
@@ -0,0 +1,5 @@
+from .base import AvatarStorage
+from .supabase_storage import SupabaseAvatarStorage
+from .local_storage import LocalAvatarStorage
+from .factory import create_avatar_storage
+from .thumbnails import AvatarThumbnailer, parse_ipx_size
@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+from functools import wraps
+from typing import IO, Any, Callable, Iterator
+
+from app.exceptions.custom_exceptions import ValidationError
+from app.utils.metrics import Histogram
+
+import time
+
+# The operations of every backend whose duration is recorded in its call_durations histogram
+TIMED_OPERATIONS = ("upload", "read", "upload_thumbnail", "thumbnail_exists", "delete", "delete_many")
+
+def _timed_operation(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a storage operation so that its duration and outcome are recorded in call_durations."""
+
+    @wraps(method)
+    def timed(self: "AvatarStorage", *args: Any, **kwargs: Any) -> Any:
+        started_at = time.perf_counter()
+        outcome = "error"
+
+        try:
+            result = method(self, *args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            self.call_durations.observe(time.perf_counter() - started_at, self.backend, method.__name__, outcome)
+
+    return timed
+
+class AvatarStorage(ABC):
+    """
+    Interface of the storage backends that hold student avatars and their thumbnails.
+
+    Uploads are read from the stream in chunks and handed to the backend as they arrive, so an
+    avatar is never read into memory as a whole or copied to a temporary file first.
+
+    Each avatar can have square WebP thumbnails, one per size in thumbnail_sizes, stored next to it
+    as "<name>_<size>.webp". Deleting an avatar also deletes its thumbnails.
+
+    The duration of every operation in TIMED_OPERATIONS that a backend implements is recorded in
+    call_durations, whether it runs in a request or in a background job.
+    """
+
+    # The name of the backend, as the "backend" label of call_durations
+    backend = "unknown"
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        for operation in TIMED_OPERATIONS:
+            if operation in cls.__dict__:
+                setattr(cls, operation, _timed_operation(cls.__dict__[operation]))
+
+    def __init__(self, public_url_prefix: str, max_size: int, chunk_size: int = 64 * 1024,
+                 thumbnail_sizes: tuple[int, ...] = ()) -> None:
+        self.public_url_prefix = public_url_prefix
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.thumbnail_sizes = tuple(sorted(thumbnail_sizes))
+
+        self.call_durations = Histogram("storage_call_duration_seconds", "Duration of avatar storage operations, in seconds.",
+                                        ("backend", "operation", "outcome"))
+
+    def iter_chunks(self, stream: IO[bytes]) -> Iterator[bytes]:
+        """
+        Read a stream in chunks of chunk_size bytes.
+
+        Raises:
+            ValidationError: As soon as more than max_size bytes have been read.
+        """
+
+        total_size = 0
+
+        while chunk := stream.read(self.chunk_size):
+            total_size += len(chunk)
+
+            if total_size > self.max_size:
+                raise ValidationError(f"Avatar must not be larger than {self.max_size // 1024} KB.")
+
+            yield chunk
+
+    def file_name(self, avatar_url: str) -> str:
+        """Return the name an avatar is stored under, given its public URL."""
+
+        return avatar_url.replace(self.public_url_prefix, "")
+
+    def find_avatar_url(self, source: str) -> str | None:
+        """
+        Resolve an image source, such as the source part of an /_ipx/ URL, to the public URL of an avatar.
+
+        Repeated slashes are ignored, since the "//" after the scheme of an absolute URL is often merged
+        on its way through a proxy.
+
+        Returns:
+            str | None: The public URL of the avatar, or None if the source is not one of this storage's avatars.
+        """
+
+        def merge_slashes(url: str) -> str:
+            return "/".join(part for part in url.split("/") if part)
+
+        file_name = source.rstrip("/").rsplit("/", 1)[-1]
+        avatar_url = f"{self.public_url_prefix}{file_name}"
+
+        if not file_name or not f"/{merge_slashes(source)}".endswith(f"/{merge_slashes(avatar_url)}"):
+            return None
+
+        return avatar_url
+
+    def thumbnail_file_name(self, avatar_url: str, size: int) -> str:
+        """Return the name the thumbnail of an avatar is stored under."""
+
+        return f"{self.file_name(avatar_url).rsplit('.', 1)[0]}_{size}.webp"
+
+    def thumbnail_url(self, avatar_url: str, size: int) -> str:
+        """Return the public URL of the thumbnail of an avatar."""
+
+        return f"{self.public_url_prefix}{self.thumbnail_file_name(avatar_url, size)}"
+
+    def best_thumbnail_size(self, requested_size: int) -> int | None:
+        """Return the smallest thumbnail size covering the requested size, or None if every thumbnail is smaller."""
+
+        return next((size for size in self.thumbnail_sizes if size >= requested_size), None)
+
+    @abstractmethod
+    def upload(self, stream: IO[bytes], content_type: str) -> str:
+        """
+        Store an avatar under a new unique name.
+
+        Args:
+            stream (IO[bytes]): The stream to read the avatar from, e.g. the stream of a werkzeug FileStorage.
+            content_type (str): The MIME type of the avatar.
+
+        Returns:
+            str: The public URL of the stored avatar.
+        """
+
+    @abstractmethod
+    def read(self, avatar_url: str) -> bytes:
+        """Return the content of a stored avatar."""
+
+    @abstractmethod
+    def upload_thumbnail(self, avatar_url: str, size: int, data: bytes) -> None:
+        """Store the WebP thumbnail of an avatar, replacing any previous one of the same size."""
+
+    @abstractmethod
+    def thumbnail_exists(self, avatar_url: str, size: int) -> bool:
+        """Return whether the thumbnail of an avatar has been stored."""
+
+    @abstractmethod
+    def delete(self, avatar_url: str | None) -> None:
+        """Delete an avatar and its thumbnails by the avatar's public URL. Does nothing if the URL is empty."""
+
+    @abstractmethod
+    def delete_many(self, avatar_urls: list[str]) -> None:
+        """
+        Delete many avatars and their thumbnails, batching the removals where the backend allows it.
+
+        Raises:
+            PartialDeleteError: If the removal fails part way, with the avatars that were not deleted yet.
+        """
@@ -0,0 +1,55 @@
+from flask import Flask
+
+import os
+
+from app.utils import create_storage_http_client, create_storage_client
+
+from .base import AvatarStorage
+from .local_storage import LocalAvatarStorage
+from .supabase_storage import SupabaseAvatarStorage
+
+def create_avatar_storage(app: Flask) -> AvatarStorage | None:
+    """
+    Creates the avatar storage backend selected by the STORAGE_BACKEND setting.
+
+    Args:
+        app (Flask): The app whose config holds the storage settings.
+
+    Returns:
+        AvatarStorage | None: The storage backend, or None for the "supabase" backend without credentials,
+            since avatars are optional and the app still starts without them.
+
+    Raises:
+        ValueError: If STORAGE_BACKEND is neither "supabase" nor "local".
+    """
+
+    config = app.config
+    backend = config["STORAGE_BACKEND"]
+
+    if backend == "local":
+        return LocalAvatarStorage(config["LOCAL_STORAGE_DIR"] or os.path.join(app.instance_path, "avatars"),
+                                  config["LOCAL_STORAGE_URL"],
+                                  max_size=config["AVATAR_MAX_SIZE"],
+                                  chunk_size=config["STORAGE_CHUNK_SIZE"],
+                                  thumbnail_sizes=config["AVATAR_THUMBNAIL_SIZES"])
+
+    if backend != "supabase":
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}', must be 'supabase' or 'local'.")
+
+    if not (config["SUPABASE_URL"] and config["SUPABASE_SERVICE_KEY"]):
+        return None
+
+    http_client = create_storage_http_client(timeout=config["SUPABASE_TIMEOUT"],
+                                             max_connections=config["SUPABASE_MAX_CONNECTIONS"],
+                                             retries=config["SUPABASE_RETRIES"])
+
+    return SupabaseAvatarStorage(create_storage_client(config["SUPABASE_URL"], config["SUPABASE_SERVICE_KEY"], http_client),
+                                 http_client,
+                                 config["SUPABASE_URL"],
+                                 config["SUPABASE_SERVICE_KEY"],
+                                 config["SUPABASE_BUCKET_NAME"],
+                                 max_size=config["AVATAR_MAX_SIZE"],
+                                 chunk_size=config["STORAGE_CHUNK_SIZE"],
+                                 retries=config["SUPABASE_RETRIES"],
+                                 thumbnail_sizes=config["AVATAR_THUMBNAIL_SIZES"],
+                                 thumbnail_miss_ttl=config["AVATAR_THUMBNAIL_MISS_TTL"])
@@ -0,0 +1,110 @@
+from typing import IO, Iterable
+from uuid import uuid4
+
+import mimetypes
+import os
+
+from .base import AvatarStorage
+
+from app.exceptions.custom_exceptions import PartialDeleteError
+
+class LocalAvatarStorage(AvatarStorage):
+    """
+    Stores avatars as files in a local directory, served by the app under base_url.
+
+    Meant for development and offline testing, where no Supabase project is available.
+    """
+
+    backend = "local"
+
+    def __init__(self, root_dir: str, base_url: str, max_size: int, chunk_size: int = 64 * 1024,
+                 thumbnail_sizes: tuple[int, ...] = ()) -> None:
+        """
+        Args:
+            root_dir (str): The directory the avatars are written to. It is created if missing.
+            base_url (str): The URL path the directory is served under, e.g. "/avatars".
+            max_size (int): The largest avatar accepted, in bytes.
+            chunk_size (int): The size of the chunks an upload is written in, in bytes.
+            thumbnail_sizes (tuple[int, ...]): The sizes of the square thumbnails kept for each avatar, in pixels.
+        """
+
+        self.base_url = base_url.rstrip("/")
+
+        super().__init__(f"{self.base_url}/", max_size, chunk_size, thumbnail_sizes)
+
+        self.root_dir = root_dir
+
+        os.makedirs(root_dir, exist_ok=True)
+
+    def upload(self, stream: IO[bytes], content_type: str) -> str:
+        """Write an avatar to the directory chunk by chunk."""
+
+        # Keep the extension so that the file is served with the right content type
+        extension = mimetypes.guess_extension(content_type or "") or ""
+        file_name = f"{uuid4()}{extension}"
+
+        self._write(file_name, self.iter_chunks(stream))
+
+        return f"{self.public_url_prefix}{file_name}"
+
+    def file_name(self, avatar_url: str) -> str:
+
+        # basename() keeps a crafted URL from reaching outside the directory
+        return os.path.basename(super().file_name(avatar_url))
+
+    def _write(self, file_name: str, chunks: Iterable[bytes]) -> None:
+        """
+        Write a file to the directory chunk by chunk.
+
+        The file is written under a partial name and renamed once complete, so a rejected or
+        interrupted write never leaves a servable file behind.
+        """
+
+        file_path = os.path.join(self.root_dir, file_name)
+        partial_path = f"{file_path}.part"
+
+        try:
+            with open(partial_path, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+
+            os.replace(partial_path, file_path)
+
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+    def read(self, avatar_url: str) -> bytes:
+
+        with open(os.path.join(self.root_dir, self.file_name(avatar_url)), "rb") as file:
+            return file.read()
+
+    def upload_thumbnail(self, avatar_url: str, size: int, data: bytes) -> None:
+
+        self._write(self.thumbnail_file_name(avatar_url, size), [data])
+
+    def thumbnail_exists(self, avatar_url: str, size: int) -> bool:
+
+        return os.path.exists(os.path.join(self.root_dir, self.thumbnail_file_name(avatar_url, size)))
+
+    def delete(self, avatar_url: str | None) -> None:
+
+        if not avatar_url or not avatar_url.startswith(self.public_url_prefix):
+            return
+
+        file_names = [self.file_name(avatar_url)] + [self.thumbnail_file_name(avatar_url, size) for size in self.thumbnail_sizes]
+
+        for file_name in file_names:
+            try:
+                os.remove(os.path.join(self.root_dir, file_name))
+            except FileNotFoundError:
+                pass
+
+    def delete_many(self, avatar_urls: list[str]) -> None:
+
+        for index, avatar_url in enumerate(avatar_urls):
+            try:
+                self.delete(avatar_url)
+            except OSError as e:
+                raise PartialDeleteError(f"{len(avatar_urls) - index} of {len(avatar_urls)} avatars were not deleted.", avatar_urls[index:]) from e
@@ -0,0 +1,167 @@
+from typing import IO, Iterable
+from uuid import uuid4
+
+import httpx
+
+from supabase import Client
+
+from app.exceptions.custom_exceptions import PartialDeleteError
+from app.utils import TTLCache, with_storage_retries
+
+from .base import AvatarStorage
+
+class SupabaseAvatarStorage(AvatarStorage):
+    """Stores avatars in a public Supabase storage bucket."""
+
+    backend = "supabase"
+
+    def __init__(
+        self,
+        client: Client,
+        http_client: httpx.Client,
+        supabase_url: str,
+        supabase_key: str,
+        bucket_name: str,
+        max_size: int,
+        chunk_size: int = 64 * 1024,
+        retries: int = 2,
+        thumbnail_sizes: tuple[int, ...] = (),
+        thumbnail_miss_ttl: float = 60,
+    ) -> None:
+        """
+        Args:
+            client (Client): The shared Supabase client, used to build public URLs, download and remove avatars.
+            http_client (httpx.Client): The httpx client backing the Supabase client, used to stream uploads.
+            supabase_url (str): The URL of the Supabase project.
+            supabase_key (str): The service key of the Supabase project.
+            bucket_name (str): The bucket holding the avatars.
+            max_size (int): The largest avatar accepted, in bytes.
+            chunk_size (int): The size of the chunks an upload is streamed in, in bytes.
+            retries (int): The number of times a storage call that failed on the network is retried.
+            thumbnail_sizes (tuple[int, ...]): The sizes of the square thumbnails kept for each avatar, in pixels.
+            thumbnail_miss_ttl (float): How long a thumbnail found missing is remembered as such, in seconds.
+        """
+
+        self.supabase_url = supabase_url.rstrip("/")
+
+        super().__init__(f"{self.supabase_url}/storage/v1/object/public/{bucket_name}/", max_size, chunk_size, thumbnail_sizes)
+
+        self.client = client
+        self.http_client = http_client
+        self.supabase_key = supabase_key
+        self.bucket_name = bucket_name
+        self.retries = retries
+
+        # Thumbnails known to exist, so that serving one does not cost a HEAD request each time.
+        # Avatar names are never reused, so an entry cannot go stale in a way that matters.
+        self._known_thumbnails = TTLCache(max_size=4096, ttl=3600)
+
+        # Thumbnails found missing, e.g. of an avatar uploaded before thumbnails existed, are only asked for again
+        # after a short while, since the thumbnail job or the generate-avatar-thumbnails command may store them
+        self._missing_thumbnails = TTLCache(max_size=4096, ttl=thumbnail_miss_ttl)
+
+    def _post_object(self, file_path: str, content: bytes | Iterable[bytes], content_type: str) -> None:
+        """Upload an object to the bucket, overwriting any object with the same name."""
+
+        response = self.http_client.post(
+            f"{self.supabase_url}/storage/v1/object/{self.bucket_name}/{file_path}",
+            content=content,
+            headers={
+                "Authorization": f"Bearer {self.supabase_key}",
+                "apikey": self.supabase_key,
+                "Content-Type": content_type or "application/octet-stream",
+                "Cache-Control": "max-age=3600",
+                "x-upsert": "true",
+            },
+        )
+        response.raise_for_status()
+
+    def upload(self, stream: IO[bytes], content_type: str) -> str:
+        """
+        Stream an avatar to the bucket with a chunked request body.
+
+        storage3 only uploads from bytes or from a file on disk, so the request is sent through the shared
+        httpx client instead. The upload is retried only if the stream can be rewound to its start.
+        """
+
+        file_path = f"{uuid4()}"
+
+        start = stream.tell() if stream.seekable() else None
+
+        def send() -> None:
+            if start is not None:
+                stream.seek(start)
+
+            self._post_object(file_path, self.iter_chunks(stream), content_type)
+
+        with_storage_retries(send, self.retries if start is not None else 0)
+
+        return self.client.storage.from_(self.bucket_name).get_public_url(file_path)
+
+    def read(self, avatar_url: str) -> bytes:
+
+        return with_storage_retries(lambda: self.client.storage.from_(self.bucket_name).download(self.file_name(avatar_url)),
+                                    self.retries)
+
+    def upload_thumbnail(self, avatar_url: str, size: int, data: bytes) -> None:
+
+        with_storage_retries(lambda: self._post_object(self.thumbnail_file_name(avatar_url, size), data, "image/webp"),
+                             self.retries)
+
+        self._known_thumbnails.set((avatar_url, size), True)
+
+    def thumbnail_exists(self, avatar_url: str, size: int) -> bool:
+        """
+        Return whether the thumbnail of an avatar has been stored, asking the bucket with a HEAD request unless it is cached.
+
+        This runs inside /_ipx/ requests, so the HEAD request is sent once instead of through with_storage_retries, 
+        and one that fails counts as a missing thumbnail.
+        """
+
+        if self._known_thumbnails.get((avatar_url, size)):
+            return True
+
+        if self._missing_thumbnails.get((avatar_url, size)):
+            return False
+
+        try:
+            response = self.http_client.head(self.thumbnail_url(avatar_url, size))
+        except httpx.HTTPError:
+            response = None
+
+        if response is None or response.status_code != 200:
+            self._missing_thumbnails.set((avatar_url, size), True)
+            return False
+
+        self._known_thumbnails.set((avatar_url, size), True)
+
+        return True
+
+    def _file_names_with_thumbnails(self, avatar_url: str) -> list[str]:
+        """Return the name of an avatar followed by the names of its thumbnails."""
+
+        return [self.file_name(avatar_url)] + [self.thumbnail_file_name(avatar_url, size) for size in self.thumbnail_sizes]
+
+    def delete(self, avatar_url: str | None) -> None:
+
+        # If there's a current avatar, delete in bucket
+        if avatar_url:
+            file_paths = self._file_names_with_thumbnails(avatar_url)
+            with_storage_retries(lambda: self.client.storage.from_(self.bucket_name).remove(file_paths), self.retries)
+
+    def delete_many(self, avatar_urls: list[str], batch_size: int = 1000) -> None:
+        """Delete many avatars and their thumbnails from the bucket, with one remove call per batch of up to batch_size objects."""
+
+        avatar_urls = [avatar_url for avatar_url in avatar_urls if avatar_url]
+
+        # An avatar and its thumbnails go in the same batch, so a failed batch leaves whole avatars to delete
+        avatars_per_batch = max(1, batch_size // (1 + len(self.thumbnail_sizes)))
+
+        for start in range(0, len(avatar_urls), avatars_per_batch):
+            batch = [file_path for avatar_url in avatar_urls[start:start + avatars_per_batch]
+                     for file_path in self._file_names_with_thumbnails(avatar_url)]
+
+            try:
+                with_storage_retries(lambda: self.client.storage.from_(self.bucket_name).remove(batch), self.retries)
+            except Exception as e:
+                raise PartialDeleteError(f"{len(avatar_urls) - start} of {len(avatar_urls)} avatars were not deleted.", avatar_urls[start:]) from e
@@ -0,0 +1,96 @@
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from typing import IO
+
+import io
+
+from .base import AvatarStorage
+
+from app.exceptions.custom_exceptions import PermanentJobError
+
+class AvatarThumbnailer:
+    """
+    Generates the WebP thumbnails of uploaded avatars.
+
+    Thumbnails are generated by a background job after the upload request has returned, so until they
+    are stored the /_ipx/ route falls back to the original avatar.
+    """
+
+    def __init__(self, storage: AvatarStorage, quality: int = 80) -> None:
+        """
+        Args:
+            storage (AvatarStorage): The storage holding the avatars, which also receives the thumbnails.
+            quality (int): The WebP quality of the thumbnails, from 0 to 100.
+        """
+
+        self.storage = storage
+        self.quality = quality
+
+    def generate(self, avatar_url: str, data: bytes | IO[bytes] | None = None) -> None:
+        """
+        Generate and store every thumbnail of an avatar.
+
+        The avatar is decoded once, rotated upright from its EXIF orientation, then center-cropped
+        and downscaled to each size, largest first so that each thumbnail is resized from the previous one.
+
+        Args:
+            avatar_url (str): The public URL of the avatar.
+            data (bytes | IO[bytes] | None): The content of the avatar, or a file holding it, read from the storage if not given.
+
+        Raises:
+            PermanentJobError: If the avatar is not an image that can be decoded, which no retry can change.
+        """
+
+        if data is None:
+            data = self.storage.read(avatar_url)
+
+        if isinstance(data, bytes):
+            data = io.BytesIO(data)
+        else:
+            data.seek(0)
+
+        # Decoded up front, so a file that is not an image, or is truncated, fails before any thumbnail is stored.
+        # The data is local, so an OSError here comes from decoding it
+        try:
+            image = Image.open(data)
+            image.load()
+
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+            raise PermanentJobError(f"The avatar '{avatar_url}' is not an image that can be decoded.") from e
+
+        with image:
+            image = ImageOps.exif_transpose(image)
+
+            # WebP has no palette or CMYK mode
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+            for size in sorted(self.storage.thumbnail_sizes, reverse=True):
+                image = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+
+                buffer = io.BytesIO()
+                image.save(buffer, format="WEBP", quality=self.quality, method=4)
+
+                self.storage.upload_thumbnail(avatar_url, size, buffer.getvalue())
+
+def parse_ipx_size(modifiers: str) -> int | None:
+    """
+    Parse the size requested by the modifiers segment of an IPX URL, e.g. "s_96x96" or "f_webp&w_48".
+
+    Returns:
+        int | None: The larger of the requested width and height, or None if no size is requested.
+    """
+
+    sizes = []
+
+    for modifier in modifiers.replace(",", "&").split("&"):
+        name, _, value = modifier.partition("_")
+
+        if name in ("s", "resize"):
+            sizes.extend(value.split("x"))
+        elif name in ("w", "width", "h", "height"):
+            sizes.append(value)
+
+    sizes = [int(size) for size in sizes if size.isdigit()]
+
+    return max(sizes) if sizes else None
@@ -1,5 +1,14 @@
 from .camel_case_converter import to_camel_case, dict_keys_to_camel
 from .get_cookie_max_age import get_cookie_max_age, get_refresh_cookie_max_age
 from .user_validators import validate_email_format, validate_username_format, validate_password
-from .entity_validators import validate_college_code, validate_college_name, validate_program_code, validate_program_name, validate_id_number, validate_name, validate_gender, validate_year_level
-from .supabase import upload_images_to_bucket, delete_images_from_bucket
\ No newline at end of file
+from .entity_validators import validate_college_code, validate_college_name, validate_program_code, validate_program_name, validate_id_number, validate_name, validate_gender, validate_year_level, validate_avatar_size, validate_avatar_image
+from .supabase import create_storage_http_client, create_storage_client, with_storage_retries
+from .cursor_pagination import encode_cursor, decode_cursor
+from .ttl_cache import TTLCache
+from .export_stream import EXPORT_FORMATS, stream_export
+from .static_assets import InMemoryPage, send_static_asset
+from .compression import compress_response
+from .server_timing import add_server_timing
+from .entity_serializer import EntitySerializer
+from .json_provider import init_json_provider
+from .conditional_requests import etag_from_table_versions
@@ -0,0 +1,90 @@
+from flask import Request, Response
+
+import gzip
+
+# Brotli is optional, responses are only gzipped without it
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types worth compressing, binary formats such as images are already compressed
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"}
+
+def choose_encoding(request: Request) -> str | None:
+    """
+    Pick the content encoding of a response from the Accept-Encoding header of its request.
+
+    Brotli is preferred over gzip when both are accepted with the same quality, since it produces
+    smaller JSON at a similar CPU cost on the quality levels used here.
+
+    Returns:
+        str | None: "br", "gzip", or None if the client accepts neither.
+    """
+
+    accepted = request.accept_encodings
+
+    gzip_quality = accepted["gzip"]
+    brotli_quality = accepted["br"] if brotli is not None else 0
+
+    if brotli_quality and brotli_quality >= gzip_quality:
+        return "br"
+
+    if gzip_quality:
+        return "gzip"
+
+    return None
+
+def compress(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """Compress a response body with gzip or brotli."""
+
+    if encoding == "br":
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=brotli_quality)
+
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+def compress_response(request: Request, response: Response, min_size: int = 1024,
+                      gzip_level: int = 6, brotli_quality: int = 4) -> Response:
+    """
+    Compress the body of a response with the encoding negotiated from its request.
+
+    Streamed responses (e.g. the exports), responses that are already encoded or marked no-transform,
+    and bodies under min_size bytes, which would gain less than the header overhead, are left as they are.
+
+    Args:
+        request (Request): The request being answered.
+        response (Response): The response to compress.
+        min_size (int): The smallest body compressed, in bytes.
+        gzip_level (int): The gzip compression level, from 1 (fastest) to 9 (smallest).
+        brotli_quality (int): The brotli quality, from 0 (fastest) to 11 (smallest).
+
+    Returns:
+        Response: The same response, compressed in place if it was eligible.
+    """
+
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough or response.is_streamed
+            or response.content_encoding
+            or response.cache_control.no_transform):
+        return response
+
+    # The body depends on Accept-Encoding from here on, even when it ends up not being compressed
+    response.vary.add("Accept-Encoding")
+
+    encoding = choose_encoding(request)
+
+    if encoding is None or (response.content_length or 0) < min_size:
+        return response
+
+    response.set_data(compress(response.get_data(), encoding, gzip_level, brotli_quality))
+    response.content_encoding = encoding
+
+    # Each encoding of a body is a different representation, and needs its own ETag
+    etag, weak = response.get_etag()
+
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+
+    return response
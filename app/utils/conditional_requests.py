@@ -0,0 +1,87 @@
+from flask import Response, current_app, make_response, request
+
+from functools import wraps
+from typing import Any, Callable
+
+import hashlib
+import inspect
+
+from app.db.queries.table_versions import TableVersionQueries
+
+# Suffixes app.utils.compression appends to the ETag of a compressed response
+ENCODING_ETAG_SUFFIXES = ("", "-gzip", "-br")
+
+def build_table_version_etag(versions: list[dict[str, Any]]) -> str:
+    """
+    Build the ETag of a response from the versions of the tables it reads and from the request URL.
+
+    The path and the sorted query string identify the result, so every page, search and sort gets its
+    own ETag, while the versions change it whenever one of the tables is written to.
+    """
+
+    version_key = ",".join(f"{row['table_name']}:{row['version']}" for row in sorted(versions, key=lambda row: row["table_name"]))
+    query_key = "&".join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+
+    return hashlib.sha1(f"{version_key}|{request.path}?{query_key}".encode()).hexdigest()
+
+def _not_modified(etag: str) -> Response | None:
+    """Return a 304 response if the client already holds any encoding of the response with this ETag."""
+
+    for suffix in ENCODING_ETAG_SUFFIXES:
+        if request.if_none_match.contains(f"{etag}{suffix}"):
+            response = Response(status=304)
+            response.set_etag(f"{etag}{suffix}")
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+
+    return None
+
+def _with_etag(rv: Any, etag: str) -> Response:
+    """Set the ETag on a successful view response, so that the client can revalidate it later."""
+
+    response = make_response(rv)
+
+    if response.status_code == 200:
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+
+    return response
+
+def etag_from_table_versions(*tables: str) -> Callable:
+    """
+    Decorate a GET view to answer with a 304 when none of the tables it reads changed since the client's copy.
+
+    The versions of the tables are read with one primary key lookup on table_versions. If the If-None-Match
+    header holds the resulting ETag, the view is not run at all, otherwise its response gets the ETag.
+    Must be applied below @jwt_required(), so that authentication is checked first.
+
+    Args:
+        *tables (str): The tables the response is read from.
+    """
+
+    table_names = sorted(tables)
+
+    def decorator(view: Callable) -> Callable:
+
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                versions = await current_app.extensions['async_db'].fetch_all(TableVersionQueries.GET_VERSIONS, (table_names,))
+                etag = build_table_version_etag(versions)
+
+                return _not_modified(etag) or _with_etag(await view(*args, **kwargs), etag)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = current_app.extensions['db'].fetch_all(TableVersionQueries.GET_VERSIONS, (table_names,))
+            etag = build_table_version_etag(versions)
+
+            return _not_modified(etag) or _with_etag(view(*args, **kwargs), etag)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,59 @@
+import base64
+import binascii
+import json
+
+from typing import Any
+
+from app.exceptions.custom_exceptions import InvalidParameterError
+
+from .entity_validators import ALLOWED_GENDERS, ALLOWED_YEAR_LEVELS
+
+# Sort columns of an enum type, which Postgres only compares with one of their labels
+ENUM_SORT_COLUMNS = {
+    "year_level": ALLOWED_YEAR_LEVELS,
+    "gender": ALLOWED_GENDERS,
+}
+
+def encode_cursor(sort_field: str, sort_order: str, last_values: list[Any]) -> str:
+    """Encodes the sort key and primary key of the last row of a page into an opaque cursor."""
+
+    payload = json.dumps({"f": sort_field, "o": sort_order, "k": last_values}, separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_field: str, sort_order: str) -> list[Any] | None:
+    """
+    Decodes a cursor created by encode_cursor into the [sort_value, primary_key] pair to seek after.
+
+    An empty cursor requests the first page and returns None. A cursor that cannot be decoded, that holds
+    a value the sort column or primary key cannot be compared with, or that was issued for a different sort
+    field or sort order, raises InvalidParameterError.
+    """
+
+    if not cursor:
+        return None
+
+    try:
+        padded_cursor = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded_cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidParameterError("Invalid 'cursor' value.")
+
+    if not isinstance(payload, dict) or not isinstance(payload.get("k"), list) or len(payload["k"]) != 2:
+        raise InvalidParameterError("Invalid 'cursor' value.")
+
+    if payload.get("f") != sort_field or payload.get("o") != sort_order:
+        raise InvalidParameterError("The 'cursor' was issued for a different 'sortField' or 'sortOrder'.")
+
+    sort_value, primary_key = payload["k"]
+
+    # Every sort column and primary key is text or an enum, and Postgres rejects text holding a NUL character
+    if not all(isinstance(value, str) and "\x00" not in value for value in (sort_value, primary_key)):
+        raise InvalidParameterError("Invalid 'cursor' value.")
+
+    allowed_labels = ENUM_SORT_COLUMNS.get(sort_field.lower().replace(' ', '_'))
+
+    if allowed_labels is not None and sort_value not in allowed_labels:
+        raise InvalidParameterError("Invalid 'cursor' value.")
+
+    return payload["k"]
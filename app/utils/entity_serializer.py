@@ -0,0 +1,38 @@
+from dataclasses import fields
+from operator import attrgetter
+from typing import Any, Iterable
+
+from .camel_case_converter import to_camel_case
+
+class EntitySerializer:
+    """
+    Serializes the entities of one dataclass to dicts with camelCase keys.
+
+    The field names and their camelCase keys are computed once, so serializing an entity is one attrgetter
+    call and one dict(zip(...)), instead of asdict() (which deep-copies every value) followed by a regex
+    split per key per entity.
+    """
+
+    def __init__(self, entity_class: type) -> None:
+        field_names = tuple(field.name for field in fields(entity_class))
+
+        self.entity_class = entity_class
+        self.keys = tuple(to_camel_case(field_name) for field_name in field_names)
+
+        getter = attrgetter(*field_names)
+
+        # attrgetter returns a bare value instead of a tuple when it gets a single name
+        self._values = getter if len(field_names) > 1 else lambda entity: (getter(entity),)
+
+    def serialize(self, entity: Any) -> dict[str, Any]:
+        """Serialize one entity."""
+
+        return dict(zip(self.keys, self._values(entity)))
+
+    def serialize_many(self, entities: Iterable[Any]) -> list[dict[str, Any]]:
+        """Serialize a list of entities."""
+
+        keys = self.keys
+        values = self._values
+
+        return [dict(zip(keys, values(entity))) for entity in entities]
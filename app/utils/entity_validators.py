@@ -1,4 +1,5 @@
 import re
+from PIL import Image, UnidentifiedImageError
 from app.exceptions.custom_exceptions import ValidationError
 
 COLLEGE_CODE_REGEX = r"^[A-Z-]{2,}$"
@@ -140,4 +141,50 @@ def validate_gender(gender: str) -> None:
     gender = gender.strip().lower()
     
     if not gender in ALLOWED_GENDERS:
-        raise ValidationError(f"Invalid 'gender' value: '{gender}'. Must be one of: ['male', 'female', 'others', 'prefer not to say'].")
\ No newline at end of file
+        raise ValidationError(f"Invalid 'gender' value: '{gender}'. Must be one of: ['male', 'female', 'others', 'prefer not to say'].")
+
+def validate_avatar_size(avatar, max_size: int) -> None:
+    """
+    Validates the size of an uploaded avatar against max_size, in bytes.
+
+    The size is taken by seeking the upload stream, so nothing is read. Streams that cannot seek are
+    left to the storage backend, which stops reading them once they go over max_size.
+    """
+
+    stream = avatar.stream
+
+    if not stream.seekable():
+        return
+
+    start = stream.tell()
+    size = stream.seek(0, 2) - start
+    stream.seek(start)
+
+    if size > max_size:
+        raise ValidationError(f"Avatar must not be larger than {max_size // 1024} KB.")
+
+def validate_avatar_image(avatar) -> None:
+    """
+    Validates that an uploaded avatar is an image, by checking its header and structure without decoding it.
+
+    The upload stream is rewound afterwards, so the avatar is still stored from its start. Streams that
+    cannot seek are left to the thumbnail job, which rejects what it cannot decode.
+    """
+
+    stream = avatar.stream
+
+    if not stream.seekable():
+        return
+
+    start = stream.tell()
+
+    try:
+        with Image.open(stream) as image:
+            image.verify()
+
+    # Pillow reports broken files with SyntaxError as well
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        raise ValidationError("Avatar must be an image file.")
+
+    finally:
+        stream.seek(start)
@@ -0,0 +1,59 @@
+from typing import Any, Iterable, Iterator
+
+from .camel_case_converter import to_camel_case
+
+import csv
+import io
+import json
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def stream_export(rows: Iterable[dict[str, Any]], columns: tuple[str, ...], export_format: str, batch_size: int = 500) -> Iterator[str]:
+    """
+    Serialize rows into CSV or NDJSON chunks for a streaming response.
+
+    Rows are consumed lazily and written batch_size rows per chunk, so memory use stays flat however
+    many rows there are. Column names are written in camelCase, the same names the import accepts.
+
+    Args:
+        rows (Iterable[dict]): The rows to export, usually from Database.stream.
+        columns (tuple[str, ...]): The snake_case columns to export, in order.
+        export_format (str): "csv" or "ndjson".
+        batch_size (int): The number of rows per yielded chunk.
+
+    Yields:
+        str: The next chunk of the export.
+    """
+
+    camel_columns = [to_camel_case(column) for column in columns]
+    buffer = io.StringIO()
+
+    writer = csv.writer(buffer)
+
+    if export_format == "csv":
+        writer.writerow(camel_columns)
+
+    batched_rows = 0
+
+    for row in rows:
+        values = [row[column] for column in columns]
+
+        if export_format == "csv":
+            writer.writerow(["" if value is None else value for value in values])
+        else:
+            buffer.write(json.dumps(dict(zip(camel_columns, values))) + "\n")
+
+        batched_rows += 1
+
+        if batched_rows == batch_size:
+            yield buffer.getvalue()
+
+            buffer.seek(0)
+            buffer.truncate()
+            batched_rows = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,58 @@
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+from typing import Any
+
+# orjson is optional, Flask's json module is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson, producing the same output as Flask's default provider.
+
+    Keys are sorted like the default provider does, and dates, decimals, UUIDs and dataclasses are passed
+    to DefaultJSONProvider.default, so that they keep Flask's formats (e.g. HTTP dates instead of ISO 8601).
+    Decoding still goes through the json module, since request bodies are small.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        super().__init__(app)
+
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _dumps_bytes(self, obj: Any) -> bytes:
+        """Encode obj to JSON bytes."""
+
+        options = self._options
+
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+
+        if self._app.debug if self.compact is None else not self.compact:
+            options |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+
+        # Arguments meant for json.dumps (e.g. indent) are only honored by the default provider
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+
+        return self._dumps_bytes(obj).decode()
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+
+        # Skips the bytes -> str -> bytes round trip of encoding through dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+
+        return self._app.response_class(self._dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+def init_json_provider(app: Flask) -> None:
+    """Switch the app to the orjson provider if JSON_USE_ORJSON is set and orjson is installed."""
+
+    if app.config["JSON_USE_ORJSON"] and orjson is not None:
+        app.json = OrjsonProvider(app)
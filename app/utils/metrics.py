@@ -0,0 +1,170 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Iterable
+
+import math
+
+# Latency buckets in seconds, from a cached lookup up to a slow export or storage call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The content type of the Prometheus text exposition format
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@dataclass(slots=True)
+class MetricFamily:
+    """
+    A metric in the text exposition format, with all of its samples.
+
+    Each sample is a (suffix, labels, value) tuple, where the suffix is appended to the name of the family,
+    e.g. "_bucket" for the buckets of a histogram, and is empty for counters and gauges.
+    """
+
+    name: str
+    type: str
+    documentation: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels: str) -> "MetricFamily":
+        self.samples.append((suffix, labels, value))
+        return self
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+def render_families(families: Iterable[MetricFamily]) -> str:
+    """Render metric families in the Prometheus text exposition format."""
+
+    lines = []
+
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.documentation}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+
+        for suffix, labels, value in family.samples:
+            if labels:
+                label_pairs = ",".join(f'{name}="{_escape_label_value(label)}"' for name, label in labels.items())
+                lines.append(f"{family.name}{suffix}{{{label_pairs}}} {_format_value(value)}")
+            else:
+                lines.append(f"{family.name}{suffix} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+class Counter:
+    """A thread-safe count per combination of label values, which only goes up."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Add amount to the count of the label values, given in the order of labelnames."""
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "counter", self.documentation)
+
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                family.add(value, **dict(zip(self.labelnames, label_values)))
+
+        return family
+
+class Histogram:
+    """
+    A thread-safe distribution of observed values per combination of label values.
+
+    Observations are counted in the first bucket whose upper bound they do not exceed, and rendered
+    cumulatively, as the exposition format expects.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+
+        # Per label values: the count of each bucket plus one for +Inf, then the sum of the observations
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record an observation for the label values, given in the order of labelnames."""
+
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            values = self._values.get(label_values)
+
+            if values is None:
+                values = self._values[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+
+            counts, total = values
+            counts[index] += 1
+            total[0] += value
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "histogram", self.documentation)
+
+        with self._lock:
+            for label_values, (counts, total) in sorted(self._values.items()):
+                labels = dict(zip(self.labelnames, label_values))
+                cumulative = 0
+
+                for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                    cumulative += count
+                    family.add(cumulative, "_bucket", **labels, le=_format_value(upper_bound))
+
+                family.add(total[0], "_sum", **labels)
+                family.add(cumulative, "_count", **labels)
+
+        return family
+
+class MetricsRegistry:
+    """
+    The metrics of the process, rendered on every scrape of /metrics.
+
+    Counters and histograms are updated as requests are served. Values that already exist elsewhere,
+    such as the pool stats or cache hit counters, are read by collectors when the metrics are scraped.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, metric: Counter | Histogram) -> Counter | Histogram:
+        """Add a counter or histogram to the metrics, returning it."""
+
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Add a function returning metric families built at scrape time."""
+
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+
+        families = [metric.collect() for metric in self._metrics]
+
+        for collector in self._collectors:
+            families.extend(collector())
+
+        return render_families(families)
@@ -0,0 +1,26 @@
+from flask import Response
+
+def add_server_timing(response: Response, db_ms: float, query_count: int, total_ms: float) -> Response:
+    """
+    Add a Server-Timing header splitting the time spent on a request between the database and the app.
+
+    Browsers show it in the timing tab of the request in their dev tools. With queries awaited
+    concurrently, db_ms can exceed the wall time they took, so the app time is never below 0.
+
+    Args:
+        response (Response): The response to add the header to.
+        db_ms (float): The time spent in queries, in milliseconds.
+        query_count (int): The number of queries.
+        total_ms (float): The time the request took so far, in milliseconds.
+
+    Returns:
+        Response: The same response.
+    """
+
+    app_ms = max(total_ms - db_ms, 0.0)
+    queries = "1 query" if query_count == 1 else f"{query_count} queries"
+
+    response.headers["Server-Timing"] = (f'db;dur={db_ms:.2f};desc="{queries}", '
+                                         f'app;dur={app_ms:.2f}, total;dur={total_ms:.2f}')
+
+    return response
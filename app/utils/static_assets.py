@@ -0,0 +1,115 @@
+from flask import Response, render_template, request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+from threading import Lock
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+# Precompressed copies looked up next to a static file, in order of preference. Nuxt writes them
+# at build time when nitro.compressPublicAssets is enabled.
+SIDECAR_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# One year, the longest max-age browsers honor
+IMMUTABLE_MAX_AGE = 31536000
+
+def send_static_asset(directory: str, filename: str, immutable: bool = False) -> Response:
+    """
+    Send a static file with caching headers, preferring a precompressed sidecar the client accepts.
+
+    Every response carries an ETag and a Last-Modified date and answers conditional requests with a 304.
+    Files whose name changes whenever their content does, such as the hashed bundles in _nuxt, are cached
+    for a year without revalidation. Any other file is revalidated by the browser on every use.
+
+    Args:
+        directory (str): The directory to send the file from.
+        filename (str): The path of the file, relative to the directory.
+        immutable (bool): Whether the content behind the filename can never change.
+
+    Returns:
+        Response: The file, or a 304 response if the client's copy is current.
+
+    Raises:
+        NotFound: If the file does not exist or is outside of the directory.
+    """
+
+    path = safe_join(directory, filename)
+
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    served_path, content_encoding, has_sidecar = path, None, False
+
+    for encoding, suffix in SIDECAR_ENCODINGS:
+        if not os.path.isfile(path + suffix):
+            continue
+
+        has_sidecar = True
+
+        if content_encoding is None and request.accept_encodings[encoding]:
+            served_path, content_encoding = path + suffix, encoding
+
+    response = send_file(served_path, mimetype=mimetype, conditional=True, etag=True,
+                         max_age=IMMUTABLE_MAX_AGE if immutable else None)
+
+    if content_encoding:
+        response.content_encoding = content_encoding
+
+    if has_sidecar:
+        response.vary.add("Accept-Encoding")
+
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+
+    return response
+
+class InMemoryPage:
+    """
+    An HTML template rendered on first use and then served from memory, along with a gzipped copy.
+
+    Meant for pages that do not depend on the request, such as the index.html of the Nuxt SPA.
+    """
+
+    def __init__(self, template_name: str) -> None:
+        self.template_name = template_name
+
+        self._lock = Lock()
+        self._variants: dict[str | None, tuple[bytes, str]] | None = None
+
+    def _render(self) -> dict[str | None, tuple[bytes, str]]:
+        """Render the template once, returning its body and ETag per content encoding."""
+
+        with self._lock:
+            if self._variants is None:
+                body = render_template(self.template_name).encode()
+                etag = hashlib.sha256(body).hexdigest()[:32]
+
+                self._variants = {
+                    None: (body, etag),
+                    "gzip": (gzip.compress(body, compresslevel=9), f"{etag}-gzip"),
+                }
+
+            return self._variants
+
+    def response(self) -> Response:
+        """Build the response for the page, or a 304 if the client's copy is current."""
+
+        variants = self._render()
+        content_encoding = "gzip" if request.accept_encodings["gzip"] else None
+        body, etag = variants[content_encoding]
+
+        response = Response(body, mimetype="text/html")
+        response.content_encoding = content_encoding
+        response.vary.add("Accept-Encoding")
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+
+        return response.make_conditional(request)
@@ -1,52 +1,63 @@
-import os
-import tempfile
-
-from typing import Any
-from datetime import datetime
-
-from uuid import uuid4
-
-def upload_images_to_bucket(
-    supabase_client,
-    avatar,
-    bucket_name,
-) -> list[dict[str, Any]]:
-    
-    """Uploads image to a Supabase bucket."""
-    
-    # Create a path inside the bucket
-
-    file_path = f"{uuid4()}"
-
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        tmp.write(avatar.read())
-        tmp_path = tmp.name
-
-    # Upload directly from memory (no need to save locally)
-    supabase_client.storage.from_(bucket_name).upload(
-        file=tmp_path,
-        path=file_path,
-        file_options={
-            "cache-control": "3600",
-            "upsert": "true",
-            "content-type": avatar.content_type,
-        },
-    )
+import time
+
+import httpx
+
+from supabase import create_client, Client, ClientOptions
+
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+def create_storage_http_client(timeout: float = 10, max_connections: int = 10, retries: int = 2) -> httpx.Client:
+    """
+    Creates the httpx client shared by every storage request of the app.
 
-    os.remove(tmp_path)
+    Connections to Supabase are kept alive and reused instead of paying a new TLS handshake per request.
+    The transport also retries failed connection attempts, see with_storage_retries for the retries of 
+    whole storage calls.
 
-    # Get public URL
-    public_url = supabase_client.storage.from_(bucket_name).get_public_url(
-        file_path
+    Args:
+        timeout (float): The connect, read and write timeout of each storage request, in seconds.
+        max_connections (int): The maximum number of pooled connections, all of which are kept alive.
+        retries (int): The number of times a failed connection attempt is retried.
+
+    Returns:
+        httpx.Client: The httpx client.
+    """
+
+    return httpx.Client(
+        timeout=httpx.Timeout(timeout),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        transport=httpx.HTTPTransport(retries=retries),
     )
 
-    return public_url
+def create_storage_client(supabase_url: str, supabase_key: str, http_client: httpx.Client) -> Client:
+    """
+    Creates the Supabase client shared by every request of the app.
+
+    Args:
+        supabase_url (str): The URL of the Supabase project.
+        supabase_key (str): The service key of the Supabase project.
+        http_client (httpx.Client): The httpx client the Supabase client sends its requests with.
+
+    Returns:
+        Client: The Supabase client.
+    """
+
+    return create_client(supabase_url, supabase_key, options=ClientOptions(httpx_client=http_client))
+
+def with_storage_retries(operation: Callable[[], T], retries: int = 2, backoff: float = 0.2) -> T:
+    """
+    Runs an idempotent storage call, retrying it on timeouts and network errors with exponential backoff.
 
+    Errors returned by Supabase itself (e.g. a missing bucket) are not retried.
+    """
 
-def delete_images_from_bucket(supabase_client, bucket_name, supabase_url, current_avatar_url):
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
 
-    # If there's a current avatar, delete in bucket
-    if current_avatar_url:
-        # Extract bucket path
-        file_path = current_avatar_url.replace(f"{supabase_url}/storage/v1/object/public/{bucket_name}/", "")
-        supabase_client.storage.from_(bucket_name).remove([file_path])
+            time.sleep(backoff * 2 ** attempt)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+import time
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after a fixed time-to-live.
+
+    The cache is process-local, so each worker process keeps its own copy. Writers are expected
+    to call invalidate() after changing the data the cached values are derived from.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_size: int = 128, ttl: float = 60) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value of a key, or default if it is missing or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key, self._MISSING)
+
+            if entry is self._MISSING or entry[0] <= time.monotonic():
+                if entry is not self._MISSING:
+                    del self._entries[key]
+
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry if the cache is full."""
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached entry."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the size and hit/miss counters of the cache."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,109 @@
+"""
+Measures the bytes on the wire and the CPU cost of compressing /api/students/ pages of different sizes,
+with the encodings and levels app.utils.compression can be configured with.
+
+Pages are synthetic but shaped like the real response: {"entities": [...], "totalCount": n} with the
+camelCase student fields, serialized compactly with sorted keys like Flask's jsonify.
+
+Usage:
+    python benchmarks/compression_benchmark.py [--page-sizes 10,50,100,500,1000] [--repeat 50] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.compression import brotli, compress
+
+YEAR_LEVELS = ("1st", "2nd", "3rd", "4th", "4th+")
+GENDERS = ("male", "female", "others", "prefer not to say")
+PROGRAM_CODES = ("BSCS", "BSIT", "BSIS", "BSCE", "BSEE", "BSME", "BSA", "BSN")
+
+def build_page(page_size: int, seed: int = 0) -> bytes:
+    """Build the JSON body of a student page with page_size rows."""
+
+    rng = random.Random(seed)
+
+    def name() -> str:
+        return rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+    entities = []
+
+    for index in range(page_size):
+        has_avatar = rng.random() < 0.3
+
+        entities.append({
+            "idNumber": f"20{rng.randint(10, 25)}-{index:04d}",
+            "firstName": name(),
+            "lastName": name(),
+            "yearLevel": rng.choice(YEAR_LEVELS),
+            "gender": rng.choice(GENDERS),
+            "programCode": rng.choice(PROGRAM_CODES),
+            "avatarUrl": f"https://project.supabase.co/storage/v1/object/public/avatars/{rng.getrandbits(128):032x}" if has_avatar else None,
+        })
+
+    return json.dumps({"entities": entities, "totalCount": 10000}, separators=(",", ":"), sort_keys=True).encode()
+
+def measure(data: bytes, encoding: str, level: int, repeat: int) -> dict:
+    """Compress data repeat times, returning the compressed size and the mean CPU time per compression."""
+
+    kwargs = {"brotli_quality": level} if encoding == "br" else {"gzip_level": level}
+
+    started_at = time.process_time()
+
+    for _ in range(repeat):
+        compressed = compress(data, encoding, **kwargs)
+
+    cpu_ms = (time.process_time() - started_at) * 1000 / repeat
+
+    return {
+        "encoding": encoding,
+        "level": level,
+        "bytes": len(compressed),
+        "ratio": round(len(data) / len(compressed), 2),
+        "cpu_ms": round(cpu_ms, 3),
+        "mb_per_s": round(len(data) / 1e6 / (cpu_ms / 1000), 1) if cpu_ms else None,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", default="10,50,100,500,1000", help="Comma-separated rowsPerPage values.")
+    parser.add_argument("--gzip-levels", default="1,6,9")
+    parser.add_argument("--brotli-qualities", default="1,4,6,11")
+    parser.add_argument("--repeat", type=int, default=50, help="Compressions per measurement.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table.")
+    args = parser.parse_args()
+
+    settings = [("gzip", int(level)) for level in args.gzip_levels.split(",")]
+
+    if brotli is not None:
+        settings += [("br", int(quality)) for quality in args.brotli_qualities.split(",")]
+    else:
+        print("brotli is not installed, measuring gzip only.", file=sys.stderr)
+
+    results = []
+
+    for page_size in (int(size) for size in args.page_sizes.split(",")):
+        data = build_page(page_size)
+
+        for encoding, level in settings:
+            results.append({"page_size": page_size, "raw_bytes": len(data), **measure(data, encoding, level, args.repeat)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'rows':>6} {'raw bytes':>10} {'encoding':>8} {'level':>5} {'bytes':>9} {'ratio':>6} {'cpu ms':>8} {'MB/s':>7}")
+
+    for result in results:
+        print(f"{result['page_size']:>6} {result['raw_bytes']:>10} {result['encoding']:>8} {result['level']:>5} "
+              f"{result['bytes']:>9} {result['ratio']:>6} {result['cpu_ms']:>8} {result['mb_per_s'] or '-':>7}")
+
+if __name__ == "__main__":
+    main()
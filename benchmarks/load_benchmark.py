@@ -0,0 +1,658 @@
+"""
+Load tests the API against a database seeded with a configurable number of colleges, programs and students.
+
+`seed` recreates the schema from db/init.sql in the database configured by the DB_* variables, fills it
+with synthetic but deterministic rows through COPY, and adds the user the runs log in as.
+
+`run` drives a running server through the real endpoints (login, the lists with every search type and
+sort field, total counts, demographics, details, and student create/edit/delete) and reports the p50, p95
+and p99 latency and the throughput of each scenario. Every scenario sends --requests requests, after
+--warmup untimed ones, from --concurrency workers that each hold their own keep-alive connection and
+session cookies. --output writes the results as JSON, and --baseline compares the p95 latency of every
+scenario with such a file, failing if one got slower by more than --max-regression.
+
+The mutating scenarios only touch students they created themselves, with ID numbers from 9000-0000 up,
+which seeded students never reach, and the ones left over are deleted at the end of the run.
+
+Usage:
+    python benchmarks/load_benchmark.py seed --reset [--colleges 50] [--programs 1000] [--students 1000000]
+    python benchmarks/load_benchmark.py run [--url http://127.0.0.1:5000] [--concurrency 8] [--requests 500]
+        [--warmup 50] [--scenarios students.list,students.detail] [--output results.json]
+        [--baseline previous.json] [--max-regression 0.2] [--json]
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from threading import Lock
+from typing import Any, Callable
+from urllib.parse import quote, urlencode, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import psycopg
+
+from werkzeug.security import generate_password_hash
+
+from app.config import Config
+
+INIT_SQL = os.path.join(os.path.dirname(__file__), "..", "db", "init.sql")
+
+YEAR_LEVELS = ("1st", "2nd", "3rd", "4th", "4th+")
+GENDERS = ("male", "female", "others", "prefer not to say")
+
+FIRST_NAMES = ("James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+               "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+               "Christopher", "Nancy", "Daniel", "Lisa", "Matthew", "Betty", "Anthony", "Margaret", "Mark", "Sandra")
+LAST_NAMES = ("Garcia", "Reyes", "Santos", "Cruz", "Bautista", "Ocampo", "Mendoza", "Torres", "Flores", "Villanueva",
+              "Ramos", "Aquino", "Castillo", "Rivera", "Gonzales", "Lopez", "Hernandez", "Perez", "Dela Cruz", "Navarro",
+              "Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Wilson", "Anderson", "Taylor")
+
+# Letters appended to the last name of a student, which keeps (first_name, last_name) unique up to
+# len(LAST_NAMES) * 26 ** LAST_NAME_SUFFIX_LENGTH students
+LAST_NAME_SUFFIX_LENGTH = 4
+
+# ID numbers are YYYY-NNNN, seeded from 2000-0000 up and created by the run from 9000-0000 up
+SEEDED_ID_START = 2000 * 10000
+CREATED_ID_START = 9000 * 10000
+CREATED_ID_COUNT = 10000 * 10000 - CREATED_ID_START
+MAX_STUDENTS = min(CREATED_ID_START - SEEDED_ID_START, len(LAST_NAMES) * 26 ** LAST_NAME_SUFFIX_LENGTH)
+
+SEARCH_TYPES = ("Starts With", "Contains", "Ends With")
+
+SEARCH_FIELDS = {
+    "students": ("ID Number", "First Name", "Last Name", "Year Level", "Gender", "Program Code"),
+    "programs": ("Program Code", "Program Name", "College Code"),
+    "colleges": ("College Code", "College Name"),
+}
+
+# ------------------------------------------------------------------------------------------------
+# Seeded rows. Everything a run needs to know about them is derived from the student index or the
+# college and program codes, so the run only reads the counts and codes back from the API.
+# ------------------------------------------------------------------------------------------------
+
+def _letters(index: int, length: int) -> str:
+    """Encode index as length uppercase letters, AAA being 0."""
+
+    letters = []
+
+    for _ in range(length):
+        index, remainder = divmod(index, 26)
+        letters.append(chr(ord("A") + remainder))
+
+    return "".join(reversed(letters))
+
+def _code_length(count: int) -> int:
+    return max(2, math.ceil(math.log(max(count, 2), 26)))
+
+def college_code(index: int, count: int) -> str:
+    return "C" + _letters(index, _code_length(count))
+
+def college_name(code: str) -> str:
+    return f"College of {code[1:].title()}"
+
+def program_code(index: int, count: int) -> str:
+    return "P" + _letters(index, _code_length(count))
+
+def program_name(code: str) -> str:
+    return f"Program in {code[1:].title()}"
+
+def student_id_number(index: int) -> str:
+    number = SEEDED_ID_START + index
+    return f"{number // 10000:04d}-{number % 10000:04d}"
+
+def student_name(index: int) -> tuple[str, str]:
+    """Return the first and last name of the student at index, unique per index."""
+
+    first_name = FIRST_NAMES[index * 7 % len(FIRST_NAMES)]
+    suffix = _letters(index // len(LAST_NAMES), LAST_NAME_SUFFIX_LENGTH).lower()
+
+    return first_name, LAST_NAMES[index % len(LAST_NAMES)] + suffix
+
+def seed(args: argparse.Namespace) -> None:
+    """Recreate the schema from db/init.sql and fill it with args.colleges, args.programs and args.students rows."""
+
+    if args.students > MAX_STUDENTS:
+        raise SystemExit(f"--students must not be more than {MAX_STUDENTS}.")
+
+    rng = random.Random(args.seed)
+
+    with psycopg.connect(dbname=Config.DB_NAME, port=Config.DB_PORT, user=Config.DB_USER,
+                         password=Config.DB_PASS, host=Config.DB_HOST, autocommit=True) as conn:
+        print(f"Recreating the schema of '{Config.DB_NAME}' from db/init.sql...", file=sys.stderr)
+
+        # init.sql creates types and the users table unconditionally, so it only runs on an empty schema
+        conn.execute("DROP SCHEMA public CASCADE")
+        conn.execute("CREATE SCHEMA public")
+
+        with open(INIT_SQL, encoding="utf-8") as init_sql:
+            conn.execute(init_sql.read())
+
+        started_at = time.perf_counter()
+
+        college_codes = [college_code(index, args.colleges) for index in range(args.colleges)]
+        program_codes = [program_code(index, args.programs) for index in range(args.programs)]
+
+        with conn.transaction():
+            with conn.cursor() as cur:
+                with cur.copy("COPY colleges (college_code, college_name) FROM STDIN") as copy:
+                    for code in college_codes:
+                        copy.write_row((code, college_name(code)))
+
+                with cur.copy("COPY programs (program_code, program_name, college_code) FROM STDIN") as copy:
+                    for index, code in enumerate(program_codes):
+                        copy.write_row((code, program_name(code), college_codes[index % len(college_codes)] if college_codes else None))
+
+                with cur.copy("COPY students (id_number, first_name, last_name, year_level, gender, program_code) FROM STDIN") as copy:
+                    for index in range(args.students):
+                        # A few students without a program, like the ones whose program was deleted
+                        code = rng.choice(program_codes) if program_codes and rng.random() >= 0.02 else None
+
+                        copy.write_row((student_id_number(index), *student_name(index), rng.choice(YEAR_LEVELS), rng.choice(GENDERS), code))
+
+                        if index and index % 100_000 == 0:
+                            print(f"  {index} students", file=sys.stderr)
+
+                cur.execute("INSERT INTO users (user_id, username, email, password_hash) VALUES (%s, %s, %s, %s)",
+                            (str(uuid.uuid4()), "benchmark", args.email, generate_password_hash(args.password)))
+
+        conn.execute("ANALYZE")
+
+    print(f"Seeded {args.colleges} colleges, {args.programs} programs and {args.students} students "
+          f"in {time.perf_counter() - started_at:.1f} s, log in as {args.email}.", file=sys.stderr)
+
+# ------------------------------------------------------------------------------------------------
+# Running
+# ------------------------------------------------------------------------------------------------
+
+class Client:
+    """An HTTP/1.1 keep-alive connection to the server with its own session cookies, used by one worker at a time."""
+
+    def __init__(self, url: str, timeout: float) -> None:
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.cookies: dict[str, str] = {}
+
+    def request(self, method: str, path: str, body: bytes | None = None, content_type: str | None = None,
+                accept_encoding: str = "gzip") -> tuple[int, bytes]:
+        """Send a request, returning the status and the body as it came over the wire."""
+
+        headers = {"Accept-Encoding": accept_encoding}
+
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+
+        # Sent in case JWT_COOKIE_CSRF_PROTECT is on
+        if method != "GET" and "csrf_access_token" in self.cookies:
+            headers["X-CSRF-TOKEN"] = self.cookies["csrf_access_token"]
+
+        for attempt in range(2):
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                break
+
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed the kept-alive connection, retry once on a new one
+                self.connection.close()
+
+                if attempt:
+                    raise
+
+        for header in response.headers.get_all("Set-Cookie") or ():
+            cookie = SimpleCookie()
+            cookie.load(header)
+
+            for name, morsel in cookie.items():
+                if morsel["max-age"] == "0" or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+
+        return response.status, data
+
+    def get_json(self, path: str) -> Any:
+        status, data = self.request("GET", path, accept_encoding="identity")
+
+        if status != 200:
+            raise SystemExit(f"GET {path} returned {status}: {data[:200]!r}")
+
+        return json.loads(data)
+
+    def login(self, email: str, password: str) -> None:
+        status, data = self.request("POST", "/api/user/login", json.dumps({"email": email, "password": password}).encode(), "application/json")
+
+        if status != 200:
+            raise SystemExit(f"Logging in as {email} returned {status}: {data[:200]!r}")
+
+@dataclass
+class RunContext:
+    """What the scenarios know about the seeded database, and the students the run created."""
+
+    email: str
+    password: str
+    student_count: int
+    program_codes: list[str]
+    college_codes: list[str]
+
+    created: deque = field(default_factory=deque)
+    next_created_index: int = 0
+    lock: Lock = field(default_factory=Lock)
+
+    def create_student_form(self, rng: random.Random) -> tuple[str, dict[str, str]]:
+        """Reserve a new ID number and return it with the form creating its student."""
+
+        with self.lock:
+            index = self.next_created_index
+            self.next_created_index += 1
+
+        number = CREATED_ID_START + index
+        id_number = f"{number // 10000:04d}-{number % 10000:04d}"
+        last_name = student_name(index)[1]
+
+        self.created.append((id_number, last_name))
+
+        return id_number, student_form(rng, id_number, "Benchmark", last_name, self.program_codes)
+
+@dataclass
+class Scenario:
+    """
+    A request to time, rebuilt with random values for every call.
+
+    Attributes:
+        name (str): The name of the scenario, dotted from the entity down, e.g. "students.list.sort.last_name.desc".
+        method (str): The HTTP method.
+        build (Callable): Returns the path and the payload of the next request from the context and a Random.
+        encoding (str): How the payload is sent, "json" or "form".
+        setup (Callable | None): Runs untimed before the scenario with a logged in client, the context and the
+            number of requests it will send.
+    """
+
+    name: str
+    method: str
+    build: Callable[[RunContext, random.Random], tuple[str, dict | None]]
+    encoding: str = "json"
+    setup: Callable[[Client, RunContext, int], None] | None = None
+
+def _slug(value: str) -> str:
+    return value.lower().replace(" ", "_")
+
+def student_form(rng: random.Random, id_number: str, first_name: str, last_name: str, program_codes: list[str]) -> dict[str, str]:
+    return {
+        "idNumber": id_number,
+        "firstName": first_name,
+        "lastName": last_name,
+        "yearLevel": rng.choice(YEAR_LEVELS),
+        "gender": rng.choice(GENDERS),
+        "programCode": rng.choice(program_codes),
+    }
+
+def _field_value(context: RunContext, entity: str, search_by: str, rng: random.Random) -> str:
+    """Return the value of search_by of a random seeded row of entity."""
+
+    if entity == "students":
+        index = rng.randrange(context.student_count)
+
+        return {
+            "ID Number": lambda: student_id_number(index),
+            "First Name": lambda: student_name(index)[0],
+            "Last Name": lambda: student_name(index)[1],
+            "Year Level": lambda: rng.choice(YEAR_LEVELS),
+            "Gender": lambda: rng.choice(GENDERS),
+            "Program Code": lambda: rng.choice(context.program_codes),
+        }[search_by]()
+
+    if entity == "programs":
+        code = rng.choice(context.program_codes)
+
+        return {
+            "Program Code": code,
+            "Program Name": program_name(code),
+            "College Code": rng.choice(context.college_codes),
+        }[search_by]
+
+    code = rng.choice(context.college_codes)
+
+    return code if search_by == "College Code" else college_name(code)
+
+def _search_value(value: str, search_type: str) -> str:
+    """Cut the part of a value a user would type for a search type."""
+
+    if search_type == "Starts With":
+        return value[:3]
+
+    if search_type == "Ends With":
+        return value[-3:]
+
+    return value[1:4]
+
+def _list_path(entity: str, **params: Any) -> str:
+    return f"/api/{entity}/?" + urlencode({"rowsPerPage": 10, "pageNumber": 1, "searchValue": "", **params})
+
+def build_scenarios() -> list[Scenario]:
+    """Return every scenario, in the order they run."""
+
+    def login(context: RunContext, rng: random.Random) -> tuple[str, dict]:
+        return "/api/user/login", {"email": context.email, "password": context.password}
+
+    scenarios = [Scenario("login", "POST", login)]
+
+    for entity, fields in SEARCH_FIELDS.items():
+        for search_by in fields:
+            for search_type in SEARCH_TYPES:
+                def search(context: RunContext, rng: random.Random, entity=entity, fields=fields, search_by=search_by, search_type=search_type) -> tuple[str, None]:
+                    value = _search_value(_field_value(context, entity, search_by, rng), search_type)
+
+                    return _list_path(entity, searchValue=value, searchBy=search_by, searchType=search_type,
+                                      sortField=fields[0], sortOrder="Ascending"), None
+
+                scenarios.append(Scenario(f"{entity}.list.search.{_slug(search_by)}.{_slug(search_type)}", "GET", search))
+
+        for sort_field in fields:
+            for sort_order in ("Ascending", "Descending"):
+                def sort(context: RunContext, rng: random.Random, entity=entity, fields=fields, sort_field=sort_field, sort_order=sort_order) -> tuple[str, None]:
+                    return _list_path(entity, pageNumber=rng.randint(1, 100), searchBy=fields[0], searchType="Starts With",
+                                      sortField=sort_field, sortOrder=sort_order), None
+
+                scenarios.append(Scenario(f"{entity}.list.sort.{_slug(sort_field)}.{'asc' if sort_order == 'Ascending' else 'desc'}", "GET", sort))
+
+        def total_count(context: RunContext, rng: random.Random, entity=entity) -> tuple[str, None]:
+            return f"/api/{entity}/total-count", None
+
+        def searched_total_count(context: RunContext, rng: random.Random, entity=entity, search_by=fields[1]) -> tuple[str, None]:
+            value = _search_value(_field_value(context, entity, search_by, rng), "Contains")
+
+            return f"/api/{entity}/total-count?" + urlencode({"searchValue": value, "searchBy": search_by, "searchType": "Contains"}), None
+
+        scenarios.append(Scenario(f"{entity}.total_count", "GET", total_count))
+        scenarios.append(Scenario(f"{entity}.total_count.search", "GET", searched_total_count))
+
+    def demographics_params(context: RunContext, rng: random.Random) -> str:
+        # The whole university, one program or one college
+        choice = rng.randrange(3)
+
+        if choice == 1:
+            return "?" + urlencode({"programCode": rng.choice(context.program_codes)})
+
+        if choice == 2:
+            return "?" + urlencode({"collegeCode": rng.choice(context.college_codes)})
+
+        return ""
+
+    scenarios.extend([
+        Scenario("students.demographics.year_level", "GET",
+                 lambda context, rng: ("/api/students/year-level-demographics" + demographics_params(context, rng), None)),
+        Scenario("students.demographics.gender", "GET",
+                 lambda context, rng: ("/api/students/gender-demographics" + demographics_params(context, rng), None)),
+        Scenario("students.statistics", "GET",
+                 lambda context, rng: ("/api/students/statistics" + demographics_params(context, rng), None)),
+        Scenario("students.detail", "GET",
+                 lambda context, rng: ("/api/students/" + student_id_number(rng.randrange(context.student_count)), None)),
+        Scenario("programs.detail", "GET",
+                 lambda context, rng: ("/api/programs/" + quote(rng.choice(context.program_codes)), None)),
+        Scenario("colleges.detail", "GET",
+                 lambda context, rng: ("/api/colleges/" + quote(rng.choice(context.college_codes)), None)),
+    ])
+
+    def create(context: RunContext, rng: random.Random) -> tuple[str, dict]:
+        return "/api/students/", context.create_student_form(rng)[1]
+
+    def edit(context: RunContext, rng: random.Random) -> tuple[str, dict]:
+        id_number, last_name = rng.choice(context.created)
+
+        return f"/api/students/{id_number}", student_form(rng, id_number, "Benchmark", last_name, context.program_codes)
+
+    def delete(context: RunContext, rng: random.Random) -> tuple[str, dict]:
+        return "/api/students/", {"entityIds": [context.created.popleft()[0]]}
+
+    def ensure_created(client: Client, context: RunContext, count: int) -> None:
+        """Create students untimed until at least count of them exist."""
+
+        rng = random.Random(0)
+
+        while len(context.created) < count:
+            id_number, form = context.create_student_form(rng)
+            status, data = client.request("POST", "/api/students/", urlencode(form).encode(), "application/x-www-form-urlencoded")
+
+            if status >= 400:
+                raise SystemExit(f"Creating student {id_number} returned {status}: {data[:200]!r}")
+
+    scenarios.extend([
+        Scenario("students.create", "POST", create, encoding="form"),
+        Scenario("students.edit", "PATCH", edit, encoding="form", setup=lambda client, context, count: ensure_created(client, context, 1)),
+        Scenario("students.delete", "DELETE", delete, setup=ensure_created),
+    ])
+
+    return scenarios
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+
+    if not sorted_values:
+        return 0.0
+
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(percent / 100 * len(sorted_values)) - 1))]
+
+def run_scenario(scenario: Scenario, clients: list[Client], context: RunContext, requests: int, warmup: int, seed: int) -> dict:
+    """Send warmup and then requests requests of a scenario from one worker per client, returning its results."""
+
+    if scenario.setup is not None:
+        scenario.setup(clients[0], context, requests + warmup)
+
+    def send(client: Client, rng: random.Random) -> tuple[float, int]:
+        path, payload = scenario.build(context, rng)
+
+        if payload is None:
+            body, content_type = None, None
+        elif scenario.encoding == "form":
+            body, content_type = urlencode(payload).encode(), "application/x-www-form-urlencoded"
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+
+        started_at = time.perf_counter()
+        status, _ = client.request(scenario.method, path, body, content_type)
+
+        return (time.perf_counter() - started_at) * 1000, status
+
+    latencies_ms: list[float] = []
+    statuses: dict[int, int] = {}
+    lock = Lock()
+    remaining = [warmup, requests]
+
+    def take(phase: int) -> bool:
+        with lock:
+            if remaining[phase] <= 0:
+                return False
+
+            remaining[phase] -= 1
+            return True
+
+    def work(worker: int, phase: int) -> None:
+        client = clients[worker]
+        rng = random.Random(f"{seed}-{scenario.name}-{phase}-{worker}")
+
+        while take(phase):
+            ms, status = send(client, rng)
+
+            if phase:
+                with lock:
+                    latencies_ms.append(ms)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        list(executor.map(lambda worker: work(worker, 0), range(len(clients))))
+
+        started_at = time.perf_counter()
+        list(executor.map(lambda worker: work(worker, 1), range(len(clients))))
+        wall_s = time.perf_counter() - started_at
+
+    latencies_ms.sort()
+
+    return {
+        "scenario": scenario.name,
+        "requests": len(latencies_ms),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+        "max_ms": round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+        "requests_per_s": round(len(latencies_ms) / wall_s, 1) if wall_s else 0.0,
+    }
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    """Add the change of p95 latency and throughput against a previous --output to every result."""
+
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = {result["scenario"]: result for result in json.load(baseline_file)["results"]}
+
+    for result in results:
+        previous = baseline.get(result["scenario"])
+
+        if previous is None or not previous["p95_ms"] or not previous["requests_per_s"]:
+            continue
+
+        result["p95_change"] = round(result["p95_ms"] / previous["p95_ms"] - 1, 4)
+        result["requests_per_s_change"] = round(result["requests_per_s"] / previous["requests_per_s"] - 1, 4)
+
+def run(args: argparse.Namespace) -> None:
+    """Run the selected scenarios against args.url and report their results."""
+
+    prefixes = [prefix.strip() for prefix in args.scenarios.split(",") if prefix.strip()] if args.scenarios else []
+    scenarios = [scenario for scenario in build_scenarios()
+                 if not prefixes or any(scenario.name == prefix or scenario.name.startswith(prefix + ".") for prefix in prefixes)]
+
+    if not scenarios:
+        raise SystemExit(f"No scenario matches '{args.scenarios}'.")
+
+    clients = [Client(args.url, args.timeout) for _ in range(args.concurrency)]
+
+    for client in clients:
+        client.login(args.email, args.password)
+
+    context = RunContext(
+        email=args.email,
+        password=args.password,
+        student_count=clients[0].get_json("/api/students/total-count")["totalCount"],
+        # Grouped by college, as {"collegeCode": ..., "programCodes": [...]}
+        program_codes=[code for group in clients[0].get_json("/api/programs/identifiers") for code in group["programCodes"]],
+        college_codes=[college["collegeCode"] for college in clients[0].get_json("/api/colleges/identifiers")],
+        # Continue after the students a previous run may have left, e.g. if it was interrupted
+        next_created_index=random.Random().randrange(CREATED_ID_COUNT // 2),
+    )
+
+    if not context.student_count or not context.program_codes or not context.college_codes:
+        raise SystemExit("The database has no students, programs or colleges, seed it first.")
+
+    # Students created after seeding (e.g. by an earlier run) are not part of the seeded ID range
+    context.student_count = min(context.student_count, MAX_STUDENTS)
+
+    started_at = datetime.now(timezone.utc)
+    results = []
+
+    try:
+        for scenario in scenarios:
+            result = run_scenario(scenario, clients, context, args.requests, args.warmup, args.seed)
+            results.append(result)
+
+            print(f"{scenario.name}: p95 {result['p95_ms']} ms, {result['requests_per_s']} req/s", file=sys.stderr)
+
+    finally:
+        # Delete the students the create and edit scenarios left behind
+        while context.created:
+            batch = [context.created.popleft()[0] for _ in range(min(100, len(context.created)))]
+            clients[0].request("DELETE", "/api/students/", json.dumps({"entityIds": batch}).encode(), "application/json")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+    report = {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "students": context.student_count,
+            "programs": len(context.program_codes),
+            "colleges": len(context.college_codes),
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'scenario':<48} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} {'errors':>7} {'p95 change':>11}")
+
+        for result in results:
+            change = f"{result['p95_change']:+.1%}" if "p95_change" in result else ""
+            print(f"{result['scenario']:<48} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9} "
+                  f"{result['requests_per_s']:>8} {result['errors']:>7} {change:>11}")
+
+    regressions = [result["scenario"] for result in results if result.get("p95_change", 0) > args.max_regression]
+
+    if regressions:
+        raise SystemExit(f"p95 latency regressed by more than {args.max_regression:.0%} in: {', '.join(regressions)}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", default="benchmark@example.com", help="The user seeded and logged in as.")
+    parser.add_argument("--password", default="Benchmark-password-1")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random rows and request values.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Recreate and fill the database configured by DB_*.")
+    seed_parser.add_argument("--reset", action="store_true", help="Confirm that every table of the database is dropped.")
+    seed_parser.add_argument("--colleges", type=int, default=50)
+    seed_parser.add_argument("--programs", type=int, default=1000)
+    seed_parser.add_argument("--students", type=int, default=1_000_000)
+
+    run_parser = commands.add_parser("run", help="Load test a running server.")
+    run_parser.add_argument("--url", default="http://127.0.0.1:5000", help="Base URL of the server.")
+    run_parser.add_argument("--concurrency", type=int, default=8, help="Workers sending requests at the same time.")
+    run_parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario.")
+    run_parser.add_argument("--warmup", type=int, default=50, help="Untimed requests per scenario before the timed ones.")
+    run_parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for a response.")
+    run_parser.add_argument("--scenarios", help="Comma-separated scenario names or dotted prefixes, e.g. students.list,login.")
+    run_parser.add_argument("--output", help="Write the results as JSON to this file.")
+    run_parser.add_argument("--baseline", help="Compare the p95 latency of every scenario with a previous --output.")
+    run_parser.add_argument("--max-regression", type=float, default=0.2, help="Fail if a p95 latency grew by more than this fraction of the baseline.")
+    run_parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table.")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        if not args.reset:
+            seed_parser.error(f"seeding drops every table of '{Config.DB_NAME}', pass --reset to confirm.")
+
+        seed(args)
+    else:
+        run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Measures the time to turn a page of student rows into a JSON response, with the path the list controllers
+used before (asdict() + dict_keys_to_camel() + Flask's default JSON provider) and with the precompiled
+EntitySerializer, encoded by the default provider and by the orjson provider.
+
+Rows are synthetic but shaped like the ones the students repository returns, and each path starts from
+the rows, so building the Student dataclasses is included in every measurement.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--page-sizes 10,100,1000] [--repeat 200] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+from dataclasses import asdict
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.features.common.dataclasses import Student
+from app.utils import EntitySerializer, dict_keys_to_camel
+from app.utils.json_provider import OrjsonProvider, orjson
+
+YEAR_LEVELS = ("1st", "2nd", "3rd", "4th", "4th+")
+GENDERS = ("Male", "Female", "Others", "Prefer not to say")
+PROGRAM_CODES = ("BSCS", "BSIT", "BSIS", "BSCE", "BSEE", "BSME", "BSA", "BSN")
+
+STUDENT_SERIALIZER = EntitySerializer(Student)
+
+def build_rows(page_size: int, seed: int = 0) -> list[dict]:
+    """Build page_size student rows, as returned by the students repository."""
+
+    rng = random.Random(seed)
+
+    def name() -> str:
+        return rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+    return [{
+        "id_number": f"20{rng.randint(10, 25)}-{index:04d}",
+        "first_name": name(),
+        "last_name": name(),
+        "year_level": rng.choice(YEAR_LEVELS),
+        "gender": rng.choice(GENDERS),
+        "avatar_url": f"https://project.supabase.co/storage/v1/object/public/avatars/{rng.getrandbits(128):032x}" if rng.random() < 0.3 else None,
+        "program_code": rng.choice(PROGRAM_CODES),
+    } for index in range(page_size)]
+
+def asdict_path(provider: DefaultJSONProvider, rows: list[dict]) -> bytes:
+    students = [Student(**row) for row in rows]
+
+    return provider.response({"entities": [dict_keys_to_camel(asdict(student)) for student in students], "totalCount": 10000}).get_data()
+
+def serializer_path(provider: DefaultJSONProvider, rows: list[dict]) -> bytes:
+    students = [Student(**row) for row in rows]
+
+    return provider.response({"entities": STUDENT_SERIALIZER.serialize_many(students), "totalCount": 10000}).get_data()
+
+def measure(path, provider: DefaultJSONProvider, rows: list[dict], repeat: int) -> float:
+    """Run a path repeat times, returning the mean wall time per response in milliseconds."""
+
+    started_at = time.perf_counter()
+
+    for _ in range(repeat):
+        path(provider, rows)
+
+    return (time.perf_counter() - started_at) * 1000 / repeat
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", default="10,100,1000", help="Comma-separated rowsPerPage values.")
+    parser.add_argument("--repeat", type=int, default=200, help="Responses built per measurement.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table.")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+
+    paths = [
+        ("asdict + default", asdict_path, DefaultJSONProvider(app)),
+        ("serializer + default", serializer_path, DefaultJSONProvider(app)),
+    ]
+
+    if orjson is not None:
+        paths.append(("serializer + orjson", serializer_path, OrjsonProvider(app)))
+    else:
+        print("orjson is not installed, measuring the default provider only.", file=sys.stderr)
+
+    results = []
+
+    with app.app_context():
+        for page_size in (int(size) for size in args.page_sizes.split(",")):
+            rows = build_rows(page_size)
+
+            # Every path has to produce the same document
+            expected = json.loads(asdict_path(paths[0][2], rows))
+            baseline_ms = None
+
+            for name, path, provider in paths:
+                if json.loads(path(provider, rows)) != expected:
+                    raise AssertionError(f"'{name}' does not produce the same JSON as the current path.")
+
+                path(provider, rows)
+                ms = measure(path, provider, rows, args.repeat)
+                baseline_ms = baseline_ms or ms
+
+                results.append({
+                    "page_size": page_size,
+                    "path": name,
+                    "ms": round(ms, 4),
+                    "rows_per_s": round(page_size / (ms / 1000)),
+                    "speedup": round(baseline_ms / ms, 2),
+                })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'rows':>6} {'path':>22} {'ms':>9} {'rows/s':>10} {'speedup':>8}")
+
+    for result in results:
+        print(f"{result['page_size']:>6} {result['path']:>22} {result['ms']:>9} {result['rows_per_s']:>10} {result['speedup']:>7}x")
+
+if __name__ == "__main__":
+    main()
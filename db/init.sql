@@ -4,6 +4,10 @@ DROP TABLE IF EXISTS programs CASCADE;
 
 DROP TABLE IF EXISTS students CASCADE;
 
+DROP TABLE IF EXISTS student_demographics;
+
+DROP TABLE IF EXISTS table_versions;
+
 CREATE TYPE year_level_enum AS ENUM ('1st', '2nd', '3rd', '4th', '4th+');
 
 CREATE TYPE gender_enum AS ENUM ('male', 'female', 'others', 'prefer not to say');
@@ -37,6 +41,212 @@ CREATE TABLE users (
     password_hash TEXT NOT NULL
 );
 
+-- Background jobs (e.g. avatar uploads) that kept failing after every retry, kept for inspection and replay.
+-- data holds the binary part of a job, such as the uploaded avatar.
+
+CREATE TABLE IF NOT EXISTS job_dead_letters (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    data BYTEA,
+    error TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    failed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
 CREATE INDEX idx_programs_college ON programs (college_code);
 
-CREATE INDEX idx_students_program ON students (program_code);
\ No newline at end of file
+CREATE INDEX idx_students_program ON students (program_code);
+
+-- Student counts per (program_code, year_level, gender), kept up to date by the triggers below so the
+-- demographics endpoints read at most one row per program and group instead of scanning students.
+-- ON UPDATE CASCADE / ON DELETE SET NULL on students.program_code run as ordinary UPDATEs on students,
+-- so program renames and deletions are picked up by the same update trigger.
+
+CREATE TABLE IF NOT EXISTS student_demographics (
+    program_code TEXT,
+    year_level year_level_enum NOT NULL,
+    gender gender_enum NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0 CHECK (count >= 0),
+    CONSTRAINT unique_demographic_group UNIQUE NULLS NOT DISTINCT (program_code, year_level, gender)
+);
+
+CREATE OR REPLACE FUNCTION update_student_demographics() RETURNS TRIGGER AS $$
+BEGIN
+    -- Each statement applies one net change per group, so bulk writes touch every rollup row once
+    -- instead of once per student. Groups whose net change is 0 (e.g. avatar updates) are skipped.
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO student_demographics (program_code, year_level, gender, count)
+        SELECT program_code, year_level, gender, COUNT(*)
+        FROM new_rows
+        GROUP BY program_code, year_level, gender
+        ON CONFLICT (program_code, year_level, gender)
+        DO UPDATE SET count = student_demographics.count + EXCLUDED.count;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE student_demographics d
+        SET count = d.count - o.count
+        FROM (
+            SELECT program_code, year_level, gender, COUNT(*) AS count
+            FROM old_rows
+            GROUP BY program_code, year_level, gender
+        ) o
+        WHERE d.program_code IS NOT DISTINCT FROM o.program_code
+            AND d.year_level = o.year_level
+            AND d.gender = o.gender;
+
+    ELSE
+        -- Decrements go through UPDATE, since an upsert checks count >= 0 on the proposed row first
+        UPDATE student_demographics d
+        SET count = d.count + c.delta
+        FROM (
+            SELECT program_code, year_level, gender, SUM(delta) AS delta
+            FROM (
+                SELECT program_code, year_level, gender, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT program_code, year_level, gender, -1 AS delta FROM old_rows
+            ) changes
+            GROUP BY program_code, year_level, gender
+            HAVING SUM(delta) < 0
+        ) c
+        WHERE d.program_code IS NOT DISTINCT FROM c.program_code
+            AND d.year_level = c.year_level
+            AND d.gender = c.gender;
+
+        INSERT INTO student_demographics (program_code, year_level, gender, count)
+        SELECT program_code, year_level, gender, SUM(delta)
+        FROM (
+            SELECT program_code, year_level, gender, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT program_code, year_level, gender, -1 AS delta FROM old_rows
+        ) changes
+        GROUP BY program_code, year_level, gender
+        HAVING SUM(delta) > 0
+        ON CONFLICT (program_code, year_level, gender)
+        DO UPDATE SET count = student_demographics.count + EXCLUDED.count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION truncate_student_demographics() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM student_demographics;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_students_demographics ON students;
+
+DROP TRIGGER IF EXISTS trg_students_demographics_insert ON students;
+
+CREATE TRIGGER trg_students_demographics_insert
+    AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_student_demographics();
+
+DROP TRIGGER IF EXISTS trg_students_demographics_update ON students;
+
+CREATE TRIGGER trg_students_demographics_update
+    AFTER UPDATE ON students
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_student_demographics();
+
+DROP TRIGGER IF EXISTS trg_students_demographics_delete ON students;
+
+CREATE TRIGGER trg_students_demographics_delete
+    AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_student_demographics();
+
+DROP TRIGGER IF EXISTS trg_students_demographics_truncate ON students;
+
+CREATE TRIGGER trg_students_demographics_truncate
+    AFTER TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_student_demographics();
+
+-- Version counter per table, bumped by a statement-level trigger on every write to the table (including
+-- the writes of ON UPDATE / ON DELETE cascades, bulk imports and manual SQL). The list and detail endpoints
+-- fold the counters into their ETag, so an unchanged result is answered with a 304 from one primary key
+-- lookup instead of the query itself. The counter is bumped inside the writing transaction, so a reader
+-- never sees the new version before the new rows.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions (table_name) VALUES ('colleges'), ('programs'), ('students') ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_colleges_version ON colleges;
+
+CREATE TRIGGER trg_colleges_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON colleges
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_programs_version ON programs;
+
+CREATE TRIGGER trg_programs_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON programs
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_students_version ON students;
+
+CREATE TRIGGER trg_students_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- Search indexes. "Contains" and "Ends With" searches (ILIKE '%value%') are served by the trigram
+-- GIN indexes, "Starts With" searches (lower(column) LIKE 'value%') by the text_pattern_ops btrees.
+-- Keep these in sync with ENTITY_COLUMNS in app/db/query_builder.py.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_students_id_number_trgm ON students USING GIN ((id_number::text) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_first_name_trgm ON students USING GIN (first_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_last_name_trgm ON students USING GIN (last_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_program_code_trgm ON students USING GIN (program_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_id_number_prefix ON students (lower(id_number::text) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_first_name_prefix ON students (lower(first_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_last_name_prefix ON students (lower(last_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_program_code_prefix ON students (lower(program_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_gender ON students (gender);
+
+CREATE INDEX IF NOT EXISTS idx_students_year_level ON students (year_level);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_code_trgm ON programs USING GIN (program_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_name_trgm ON programs USING GIN (program_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_college_code_trgm ON programs USING GIN (college_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_code_prefix ON programs (lower(program_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_name_prefix ON programs (lower(program_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_college_code_prefix ON programs (lower(college_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_code_trgm ON colleges USING GIN (college_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_name_trgm ON colleges USING GIN (college_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_code_prefix ON colleges (lower(college_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_name_prefix ON colleges (lower(college_name) text_pattern_ops);
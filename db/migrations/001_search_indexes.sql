@@ -0,0 +1,48 @@
+-- Adds the search indexes to a database created before they were part of init.sql.
+-- Apply with: psql -d <database> -f db/migrations/001_search_indexes.sql
+
+-- Search indexes. "Contains" and "Ends With" searches (ILIKE '%value%') are served by the trigram
+-- GIN indexes, "Starts With" searches (lower(column) LIKE 'value%') by the text_pattern_ops btrees.
+-- Keep these in sync with ENTITY_COLUMNS in app/db/query_builder.py.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_students_id_number_trgm ON students USING GIN ((id_number::text) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_first_name_trgm ON students USING GIN (first_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_last_name_trgm ON students USING GIN (last_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_program_code_trgm ON students USING GIN (program_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_id_number_prefix ON students (lower(id_number::text) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_first_name_prefix ON students (lower(first_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_last_name_prefix ON students (lower(last_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_program_code_prefix ON students (lower(program_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_gender ON students (gender);
+
+CREATE INDEX IF NOT EXISTS idx_students_year_level ON students (year_level);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_code_trgm ON programs USING GIN (program_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_name_trgm ON programs USING GIN (program_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_college_code_trgm ON programs USING GIN (college_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_code_prefix ON programs (lower(program_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_program_name_prefix ON programs (lower(program_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_programs_college_code_prefix ON programs (lower(college_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_code_trgm ON colleges USING GIN (college_code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_name_trgm ON colleges USING GIN (college_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_code_prefix ON colleges (lower(college_code) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_college_name_prefix ON colleges (lower(college_name) text_pattern_ops);
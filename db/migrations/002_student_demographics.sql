@@ -0,0 +1,76 @@
+-- Adds the student_demographics rollup to a database created before it was part of init.sql,
+-- then fills it from the existing students.
+-- Apply with: psql -d <database> -f db/migrations/002_student_demographics.sql
+
+BEGIN;
+
+-- Student counts per (program_code, year_level, gender), kept up to date by the triggers below so the
+-- demographics endpoints read at most one row per program and group instead of scanning students.
+-- ON UPDATE CASCADE / ON DELETE SET NULL on students.program_code run as ordinary UPDATEs on students,
+-- so program renames and deletions are picked up by the same row trigger.
+
+CREATE TABLE IF NOT EXISTS student_demographics (
+    program_code TEXT,
+    year_level year_level_enum NOT NULL,
+    gender gender_enum NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0 CHECK (count >= 0),
+    CONSTRAINT unique_demographic_group UNIQUE NULLS NOT DISTINCT (program_code, year_level, gender)
+);
+
+CREATE OR REPLACE FUNCTION update_student_demographics() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+        AND OLD.program_code IS NOT DISTINCT FROM NEW.program_code
+        AND OLD.year_level = NEW.year_level
+        AND OLD.gender = NEW.gender THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE student_demographics
+        SET count = count - 1
+        WHERE program_code IS NOT DISTINCT FROM OLD.program_code
+            AND year_level = OLD.year_level
+            AND gender = OLD.gender;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO student_demographics (program_code, year_level, gender, count)
+        VALUES (NEW.program_code, NEW.year_level, NEW.gender, 1)
+        ON CONFLICT (program_code, year_level, gender)
+        DO UPDATE SET count = student_demographics.count + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION truncate_student_demographics() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM student_demographics;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_students_demographics ON students;
+
+CREATE TRIGGER trg_students_demographics
+    AFTER INSERT OR UPDATE OF program_code, year_level, gender OR DELETE ON students
+    FOR EACH ROW EXECUTE FUNCTION update_student_demographics();
+
+DROP TRIGGER IF EXISTS trg_students_demographics_truncate ON students;
+
+CREATE TRIGGER trg_students_demographics_truncate
+    AFTER TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_student_demographics();
+
+LOCK TABLE students IN SHARE MODE;
+
+DELETE FROM student_demographics;
+
+INSERT INTO student_demographics (program_code, year_level, gender, count)
+SELECT program_code, year_level, gender, COUNT(*)
+FROM students
+GROUP BY program_code, year_level, gender;
+
+COMMIT;
@@ -0,0 +1,102 @@
+-- Replaces the per-row student_demographics trigger from 002_student_demographics.sql with statement-level
+-- triggers, which keep bulk inserts such as the CSV import from updating the same rollup rows once per student.
+-- Apply with: psql -d <database> -f db/migrations/003_statement_level_demographics_triggers.sql
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION update_student_demographics() RETURNS TRIGGER AS $$
+BEGIN
+    -- Each statement applies one net change per group, so bulk writes touch every rollup row once
+    -- instead of once per student. Groups whose net change is 0 (e.g. avatar updates) are skipped.
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO student_demographics (program_code, year_level, gender, count)
+        SELECT program_code, year_level, gender, COUNT(*)
+        FROM new_rows
+        GROUP BY program_code, year_level, gender
+        ON CONFLICT (program_code, year_level, gender)
+        DO UPDATE SET count = student_demographics.count + EXCLUDED.count;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE student_demographics d
+        SET count = d.count - o.count
+        FROM (
+            SELECT program_code, year_level, gender, COUNT(*) AS count
+            FROM old_rows
+            GROUP BY program_code, year_level, gender
+        ) o
+        WHERE d.program_code IS NOT DISTINCT FROM o.program_code
+            AND d.year_level = o.year_level
+            AND d.gender = o.gender;
+
+    ELSE
+        -- Decrements go through UPDATE, since an upsert checks count >= 0 on the proposed row first
+        UPDATE student_demographics d
+        SET count = d.count + c.delta
+        FROM (
+            SELECT program_code, year_level, gender, SUM(delta) AS delta
+            FROM (
+                SELECT program_code, year_level, gender, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT program_code, year_level, gender, -1 AS delta FROM old_rows
+            ) changes
+            GROUP BY program_code, year_level, gender
+            HAVING SUM(delta) < 0
+        ) c
+        WHERE d.program_code IS NOT DISTINCT FROM c.program_code
+            AND d.year_level = c.year_level
+            AND d.gender = c.gender;
+
+        INSERT INTO student_demographics (program_code, year_level, gender, count)
+        SELECT program_code, year_level, gender, SUM(delta)
+        FROM (
+            SELECT program_code, year_level, gender, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT program_code, year_level, gender, -1 AS delta FROM old_rows
+        ) changes
+        GROUP BY program_code, year_level, gender
+        HAVING SUM(delta) > 0
+        ON CONFLICT (program_code, year_level, gender)
+        DO UPDATE SET count = student_demographics.count + EXCLUDED.count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION truncate_student_demographics() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM student_demographics;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_students_demographics ON students;
+
+DROP TRIGGER IF EXISTS trg_students_demographics_insert ON students;
+
+CREATE TRIGGER trg_students_demographics_insert
+    AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_student_demographics();
+
+DROP TRIGGER IF EXISTS trg_students_demographics_update ON students;
+
+CREATE TRIGGER trg_students_demographics_update
+    AFTER UPDATE ON students
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_student_demographics();
+
+DROP TRIGGER IF EXISTS trg_students_demographics_delete ON students;
+
+CREATE TRIGGER trg_students_demographics_delete
+    AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_student_demographics();
+
+DROP TRIGGER IF EXISTS trg_students_demographics_truncate ON students;
+
+CREATE TRIGGER trg_students_demographics_truncate
+    AFTER TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_student_demographics();
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- Adds the dead-letter table of the background job queue (app/jobs), which receives the avatar storage
+-- jobs that failed after every retry.
+-- Apply with: psql -d <database> -f db/migrations/004_job_dead_letters.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS job_dead_letters (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    data BYTEA,
+    error TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    failed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMIT;
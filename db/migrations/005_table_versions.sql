@@ -0,0 +1,39 @@
+-- Adds the per-table version counters the ETags of the list and detail endpoints are built from.
+-- Apply with: psql -d <database> -f db/migrations/005_table_versions.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions (table_name) VALUES ('colleges'), ('programs'), ('students') ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_colleges_version ON colleges;
+
+CREATE TRIGGER trg_colleges_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON colleges
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_programs_version ON programs;
+
+CREATE TRIGGER trg_programs_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON programs
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_students_version ON students;
+
+CREATE TRIGGER trg_students_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+COMMIT;
@@ -0,0 +1,77 @@
+import unittest
+
+import psycopg
+
+from app import create_app
+from app.db.queries.students import StudentQueries
+from app.features.students.repository import StudentRepository
+
+class StudentImportDuplicateTests(unittest.TestCase):
+    """
+    Runs the duplicate checks of the bulk student import against the database configured in .env.
+
+    Every test stages its rows in a transaction that is rolled back, so no student is ever written.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = create_app()
+
+        try:
+            with cls.app.app_context():
+                cls.app.extensions['db'].fetch_one("SELECT 1")
+        except psycopg.Error as e:
+            raise unittest.SkipTest(f"The database is not reachable: {e}")
+
+    def mark_duplicates(self, rows: list[tuple[str, str, str]]) -> dict[int, str | None]:
+        """
+        Stage (id_number, first_name, last_name) rows as an import file and run the duplicate checks on them.
+
+        Returns:
+            dict[int, str | None]: The error of every row by its row number, None for the rows that would be inserted.
+        """
+
+        with self.app.app_context():
+            db = self.app.extensions['db']
+
+            with db.connection() as conn:
+                with conn.transaction(force_rollback=True):
+                    with conn.cursor() as cur:
+                        cur.execute(StudentQueries.CREATE_IMPORT_STAGING)
+
+                        with cur.copy(StudentQueries.COPY_IMPORT_STAGING) as copy:
+                            for row_number, (id_number, first_name, last_name) in enumerate(rows, start=1):
+                                copy.write_row((row_number, id_number, first_name, last_name, "1st", "male", "TEST"))
+
+                        StudentRepository._mark_import_duplicates(cur)
+
+                        cur.execute("SELECT row_number, error FROM student_import ORDER BY row_number")
+
+                        return {row["row_number"]: row["error"] for row in cur.fetchall()}
+
+    def test_first_row_of_a_key_wins(self) -> None:
+        errors = self.mark_duplicates([("2099-0001", "Ana", "Cruz"),
+                                       ("2099-0001", "Ben", "Reyes"),
+                                       ("2099-0002", "Ana", "Cruz")])
+
+        self.assertEqual(errors, {1: None, 2: "duplicate_id_number", 3: "duplicate_full_name"})
+
+    def test_row_after_a_rejected_duplicate_is_kept(self) -> None:
+        # Row 2 loses its full name to row 1, so its id number is free again for row 3, as it would be with row by row inserts
+        errors = self.mark_duplicates([("2099-0001", "Ana", "Cruz"),
+                                       ("2099-0002", "Ana", "Cruz"),
+                                       ("2099-0002", "Ben", "Reyes")])
+
+        self.assertEqual(errors, {1: None, 2: "duplicate_full_name", 3: None})
+
+    def test_chained_duplicates(self) -> None:
+        errors = self.mark_duplicates([("2099-0001", "Ana", "Cruz"),
+                                       ("2099-0002", "Ana", "Cruz"),
+                                       ("2099-0002", "Ben", "Reyes"),
+                                       ("2099-0003", "Ben", "Reyes"),
+                                       ("2099-0003", "Cara", "Santos")])
+
+        self.assertEqual(errors, {1: None, 2: "duplicate_full_name", 3: None, 4: "duplicate_full_name", 5: None})
+
+if __name__ == "__main__":
+    unittest.main()